@@ -0,0 +1,62 @@
+"""add_usage_cleanup_partial_indexes
+
+Add partial indexes on usage(created_at) that only cover rows still holding
+body / compressed body / header data. The maintenance cleanup jobs filter on
+exactly these predicates, so each batch walks only rows that still need work
+and the indexes shrink as retention catches up.
+
+Revision ID: 7c1e5a9d3b24
+Revises: 0ba031f328de
+Create Date: 2026-03-04 09:00:00.000000+00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "7c1e5a9d3b24"
+down_revision = "0ba031f328de"
+branch_labels = None
+depends_on = None
+
+TABLE = "usage"
+INDEXES = {
+    "idx_usage_body_cleanup": (
+        "request_body IS NOT NULL OR response_body IS NOT NULL"
+        " OR provider_request_body IS NOT NULL OR client_response_body IS NOT NULL"
+    ),
+    "idx_usage_body_compressed_cleanup": (
+        "request_body_compressed IS NOT NULL OR response_body_compressed IS NOT NULL"
+        " OR provider_request_body_compressed IS NOT NULL"
+        " OR client_response_body_compressed IS NOT NULL"
+    ),
+    "idx_usage_header_cleanup": (
+        "request_headers IS NOT NULL OR response_headers IS NOT NULL"
+        " OR provider_request_headers IS NOT NULL"
+    ),
+}
+
+
+def _index_exists(bind: sa.engine.Connection, name: str) -> bool:
+    result = bind.execute(
+        sa.text("SELECT 1 FROM pg_indexes WHERE indexname = :name"),
+        {"name": name},
+    ).fetchone()
+    return result is not None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for name, predicate in INDEXES.items():
+        if _index_exists(bind, name):
+            continue
+        op.create_index(name, TABLE, ["created_at"], postgresql_where=sa.text(predicate))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for name in INDEXES:
+        if not _index_exists(bind, name):
+            continue
+        op.drop_index(name, table_name=TABLE)
@@ -5,7 +5,7 @@ import json
 import time
 import uuid
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, ClassVar
 
 from fastapi import HTTPException, Request
 from sqlalchemy.orm import Session
@@ -22,6 +22,9 @@ from src.utils.request_utils import get_client_ip
 class ApiRequestContext:
     """统一的API请求上下文，贯穿Pipeline与格式适配器。"""
 
+    # 类级标记，供 cache_result 等工具以一次类型属性查找识别上下文对象
+    __api_context__: ClassVar[bool] = True
+
     request: Request
     db: Session
     user: User | None
@@ -12,7 +12,7 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass, fields
 from typing import Any
 
 from sqlalchemy import tuple_
@@ -64,7 +64,7 @@ async def _set_cached_models(
     """将模型列表写入缓存"""
     cache_key = _get_cache_key(api_formats, client_format)
     try:
-        data = [asdict(m) for m in models]
+        data = [_model_info_to_dict(m) for m in models]
         await CacheService.set(cache_key, data, ttl_seconds=_CACHE_TTL)
         logger.debug(
             f"[ModelsService] 已缓存: {cache_key}, {len(models)} 个模型, TTL={_CACHE_TTL}s"
@@ -104,6 +104,15 @@ class ModelInfo:
     output_modalities: list[str] | None = None
 
 
+# ModelInfo 字段都是标量或 str 列表，且写缓存时会被 JSON 序列化，无需 asdict 的递归深拷贝；
+# 字段名只解析一次
+_MODEL_INFO_FIELDS: tuple[str, ...] = tuple(f.name for f in fields(ModelInfo))
+
+
+def _model_info_to_dict(model: ModelInfo) -> dict[str, Any]:
+    return {name: getattr(model, name) for name in _MODEL_INFO_FIELDS}
+
+
 # AccessRestrictions -- re-export from src.core.access_restrictions (see __all__)
 
 
@@ -15,6 +15,7 @@ from src.core.logger import logger
 from src.models.database import ApiKey, AuditEventType, User
 from src.services.auth.service import AuthService
 from src.services.system.audit import AuditService
+from src.services.system.audit_writer import get_audit_log_writer
 from src.services.usage.service import UsageService
 from src.utils.perf import PerfRecorder
 
@@ -33,6 +34,22 @@ QUIET_POLLING_PATHS: set[str] = {
     "/api/admin/health/status",
 }
 
+# AUDIT_TRAIL_LEVEL -> 需要记录的成功请求方法（None 表示全部记录）
+_AUDIT_SUCCESS_METHODS: dict[str, frozenset[str] | None] = {
+    "all": None,
+    "writes_only": frozenset({"POST", "PUT", "PATCH", "DELETE"}),
+    "mutations_only": frozenset({"PUT", "PATCH", "DELETE"}),
+    "deletes_only": frozenset({"DELETE"}),
+    "failures_only": frozenset(),
+}
+
+
+def _parse_bearer(header: str | None) -> str | None:
+    """解析 Bearer 令牌；只对 7 字节前缀做大小写归一，不复制整个 header"""
+    if not header or len(header) < 8 or header[:7].lower() != "bearer ":
+        return None
+    return header[7:].strip() or None
+
 
 class ApiRequestPipeline:
     """负责统一执行认证、配额校验、上下文构建等通用逻辑的管道。"""
@@ -297,12 +314,10 @@ class ApiRequestPipeline:
         self, request: Request, db: Session
     ) -> tuple[User, ManagementToken | None]:
         """管理员认证，支持 JWT 和 Management Token 两种方式"""
-        authorization = request.headers.get("authorization")
-        if not authorization or not authorization.lower().startswith("bearer "):
+        token = _parse_bearer(request.headers.get("authorization"))
+        if not token:
             raise HTTPException(status_code=401, detail="缺少管理员凭证")
 
-        token = authorization[7:].strip()
-
         # 通过钩子检查是否匹配模块注册的 token 前缀（如 ae_）
         token_auth_result = await self._try_token_prefix_auth(token, request, db)
         if token_auth_result is not None:
@@ -332,8 +347,9 @@ class ApiRequestPipeline:
         if not user_id:
             raise HTTPException(status_code=401, detail="无效的管理员令牌")
 
-        # 直接查询数据库，确保返回的是当前 Session 绑定的对象
-        user = db.query(User).filter(User.id == user_id).first()
+        # 令牌验签结果由 AuthService 按 exp 缓存；用户每次按主键从当前 Session 加载，
+        # 保证返回的是当前 Session 绑定的对象，且禁用/权限变更立即生效
+        user = db.get(User, user_id)
         if not user or not user.is_active or user.is_deleted:
             raise HTTPException(status_code=403, detail="用户不存在或已禁用")
 
@@ -352,12 +368,10 @@ class ApiRequestPipeline:
         self, request: Request, db: Session
     ) -> tuple[User, ManagementToken | None]:
         """用户认证，支持 JWT 和 Management Token 两种方式"""
-        authorization = request.headers.get("authorization")
-        if not authorization or not authorization.lower().startswith("bearer "):
+        token = _parse_bearer(request.headers.get("authorization"))
+        if not token:
             raise HTTPException(status_code=401, detail="缺少用户凭证")
 
-        token = authorization[7:].strip()
-
         # 通过钩子检查是否匹配模块注册的 token 前缀（如 ae_）
         token_auth_result = await self._try_token_prefix_auth(token, request, db)
         if token_auth_result is not None:
@@ -381,7 +395,7 @@ class ApiRequestPipeline:
         if not user_id:
             raise HTTPException(status_code=401, detail="无效的用户令牌")
 
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user or not user.is_active or user.is_deleted:
             raise HTTPException(status_code=403, detail="用户不存在或已禁用")
 
@@ -395,12 +409,10 @@ class ApiRequestPipeline:
         self, request: Request, db: Session
     ) -> tuple[User, ManagementToken]:
         """Management Token 认证"""
-        authorization = request.headers.get("authorization")
-        if not authorization or not authorization.lower().startswith("bearer "):
+        token = _parse_bearer(request.headers.get("authorization"))
+        if not token:
             raise HTTPException(status_code=401, detail="缺少 Management Token")
 
-        token = authorization[7:].strip()
-
         # 通过钩子检查是否匹配模块注册的 token 前缀
         # _try_token_prefix_auth 会在前缀匹配但认证失败时直接抛 HTTPException
         token_auth_result = await self._try_token_prefix_auth(token, request, db)
@@ -418,12 +430,13 @@ class ApiRequestPipeline:
             detail="无效的 Token 格式，需要 Management Token",
         )
 
-    def _calculate_quota_remaining(self, user: User | None) -> float | None:
-        if not user:
+    @staticmethod
+    def _calculate_quota_remaining(user: User | None) -> float | None:
+        # quota_usd 只读取一次（ORM 属性访问有描述符开销）；None/负数表示不限额，0 表示无额度
+        quota = user.quota_usd if user else None
+        if quota is None or quota < 0:
             return None
-        if user.quota_usd is None or user.quota_usd < 0:
-            return None
-        return max(float(user.quota_usd - user.used_usd), 0.0)
+        return max(float(quota - user.used_usd), 0.0)
 
     def _record_audit_event(
         self,
@@ -436,9 +449,16 @@ class ApiRequestPipeline:
     ) -> None:
         """记录审计事件
 
-        事务策略：复用请求级 Session，不单独提交。
-        审计记录随主事务一起提交，由中间件统一管理。
+        事务策略：成功事件在审计写入器运行时进入缓冲，由写入器批量提交；
+        失败/安全类事件（或写入器未运行时）复用请求级 Session，不单独提交，
+        随主事务一起由中间件统一管理，避免延迟或脱离请求事务。
         """
+        # 先按审计级别过滤，被排除的请求不构建任何审计数据
+        if success:
+            methods = _AUDIT_SUCCESS_METHODS.get(config.audit_trail_level)
+            if methods is not None and context.request.method not in methods:
+                return
+
         if not getattr(adapter, "audit_log_enabled", True):
             return
 
@@ -462,26 +482,34 @@ class ApiRequestPipeline:
             error=error,
         )
 
+        event = {
+            "event_type": event_type,
+            "description": f"{context.request.method} {context.request.url.path} via {adapter.name}",
+            "user_id": context.user.id if context.user else None,
+            "api_key_id": context.api_key.id if context.api_key else None,
+            "ip_address": context.client_ip,
+            "user_agent": context.user_agent,
+            "request_id": context.request_id,
+            "status_code": status_code,
+            "error_message": error,
+            "metadata": metadata,
+        }
+
+        # 成功事件在写入器运行时放入缓冲批量落库，请求路径不再同步 flush
+        if success and get_audit_log_writer().enqueue(event):
+            return
+
         try:
-            # 复用请求级 Session，不创建新的连接
-            # 审计记录随主事务一起提交，由中间件统一管理
-            self.audit_service.log_event(
-                db=context.db,
-                event_type=event_type,
-                description=f"{context.request.method} {context.request.url.path} via {adapter.name}",
-                user_id=context.user.id if context.user else None,
-                api_key_id=context.api_key.id if context.api_key else None,
-                ip_address=context.client_ip,
-                user_agent=context.user_agent,
-                request_id=context.request_id,
-                status_code=status_code,
-                error_message=error,
-                metadata=metadata,
-            )
+            # 失败事件或写入器未运行：复用请求级 Session，审计记录随主事务一起提交
+            self.audit_service.log_event(db=context.db, **event)
         except Exception as exc:
             # 审计失败不应影响主请求，仅记录警告
             logger.warning(f"[Audit] Failed to record event for adapter={adapter.name}: {exc}")
 
+    async def flush_audit(self) -> int:
+        """立即写入缓冲中的审计事件，返回写入的事件数"""
+        return await get_audit_log_writer().flush()
+
     def _build_audit_metadata(
         self,
         context: ApiRequestContext,
@@ -247,7 +247,10 @@ class DashboardStatsAdapter(DashboardAdapter):
 
 class AdminDashboardStatsAdapter(AdminApiAdapter):
     @cache_result(
-        key_prefix="dashboard:admin:stats", ttl=CacheTTL.DASHBOARD_STATS, user_specific=False
+        key_prefix="dashboard:admin:stats",
+        ttl=CacheTTL.DASHBOARD_STATS,
+        user_specific=False,
+        raw_json=True,
     )
     async def handle(self, context: ApiRequestContext) -> Any:  # type: ignore[override]
         """管理员仪表盘统计 - 使用预聚合数据优化性能"""
@@ -898,7 +901,9 @@ class DashboardRecentRequestsAdapter(DashboardAdapter):
 
 
 class DashboardProviderStatusAdapter(DashboardAdapter):
-    @cache_result(key_prefix="dashboard:provider:status", ttl=60, user_specific=False)
+    @cache_result(
+        key_prefix="dashboard:provider:status", ttl=60, user_specific=False, raw_json=True
+    )
     async def handle(self, context: ApiRequestContext) -> Any:  # type: ignore[override]
         db = context.db
         user = context.user
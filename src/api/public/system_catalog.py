@@ -11,17 +11,22 @@ from typing import Any
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session, selectinload
 
-from src.api.handlers.base.request_builder import PassthroughRequestBuilder
-from src.api.handlers.base.request_builder import build_test_request_body, get_provider_auth
+from src.api.handlers.base.request_builder import (
+    PassthroughRequestBuilder,
+    build_test_request_body,
+    get_provider_auth,
+)
 from src.clients.redis_client import get_redis_client
 from src.core.logger import logger
 from src.database import get_db
 from src.database.database import get_pool_status
 from src.models.database import Model, Provider, ProviderAPIKey, ProviderEndpoint
 from src.services.provider.transport import build_provider_url
+from src.services.system.cache_warmup import REPLAY_PROGRESS, WARMUP_PROGRESS, WARMUP_READY
 from src.utils.ssl_utils import get_ssl_context
 
 router = APIRouter(tags=["System Catalog"])
@@ -157,6 +162,20 @@ async def health_check() -> Any:
     }
 
 
+@router.get("/readyz")
+async def readiness_check() -> Any:
+    """就绪检查端点（无需认证）：缓存预热完成前返回 503"""
+    ready = WARMUP_READY.is_set()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "warming_up",
+            "warmup": dict(WARMUP_PROGRESS),
+            "profile_replay": dict(REPLAY_PROGRESS),
+        },
+    )
+
+
 @router.get("/")
 async def root(db: Session = Depends(get_db)) -> Any:
     """Root endpoint - 服务信息概览"""
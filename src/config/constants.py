@@ -156,8 +156,6 @@ class RPMDefaults:
     # === RPM 计数器时间窗口配置 ===
     # RPM 计数时间窗口（秒）
     RPM_BUCKET_SECONDS = 60
-    # Redis key 过期时间（秒），需覆盖当前分钟与边界
-    RPM_KEY_TTL_SECONDS = 120
     # 内存模式清理间隔（秒）
     RPM_CLEANUP_INTERVAL_SECONDS = 300
 
@@ -18,6 +18,9 @@ except ImportError:
     # 如果没有安装 python-dotenv，仍然可以从环境变量读取
     pass
 
+# AUDIT_TRAIL_LEVEL 的合法取值
+AUDIT_TRAIL_LEVELS = ("all", "writes_only", "mutations_only", "deletes_only", "failures_only")
+
 
 class Config:
     def __init__(self) -> None:
@@ -122,6 +125,11 @@ class Config:
         self.db_pool_recycle = int(os.getenv("DB_POOL_RECYCLE", "3600"))
         self.db_pool_warn_threshold = int(os.getenv("DB_POOL_WARN_THRESHOLD", "70"))
 
+        # run_in_executor 使用的 I/O 线程池大小，默认与单 Worker 可用的数据库连接数对齐
+        self.io_thread_pool_size = int(
+            os.getenv("IO_THREAD_POOL_SIZE") or max(self.db_pool_size + self.db_max_overflow, 4)
+        )
+
         # 并发控制配置
         # CACHE_RESERVATION_RATIO: 缓存用户预留比例（默认 10%，新用户可用 90%）
         self.cache_reservation_ratio = float(os.getenv("CACHE_RESERVATION_RATIO", "0.1"))
@@ -132,9 +140,6 @@ class Config:
         self.rpm_bucket_seconds = int(
             os.getenv("RPM_BUCKET_SECONDS", str(RPMDefaults.RPM_BUCKET_SECONDS))
         )
-        self.rpm_key_ttl_seconds = int(
-            os.getenv("RPM_KEY_TTL_SECONDS", str(RPMDefaults.RPM_KEY_TTL_SECONDS))
-        )
         self.rpm_cleanup_interval_seconds = int(
             os.getenv("RPM_CLEANUP_INTERVAL_SECONDS", str(RPMDefaults.RPM_CLEANUP_INTERVAL_SECONDS))
         )
@@ -211,6 +216,27 @@ class Config:
         self.usage_queue_metrics_interval_seconds = float(
             os.getenv("USAGE_QUEUE_METRICS_INTERVAL_SECONDS", "30")
         )
+        # USAGE_QUEUE_COMPRESS_PAYLOAD: 大事件 payload 是否 gzip 压缩后写入（默认关闭）
+        #   旧版本消费者无法解析压缩 payload，需全部实例升级后再开启
+        self.usage_queue_compress_payload = (
+            os.getenv("USAGE_QUEUE_COMPRESS_PAYLOAD", "false").lower() == "true"
+        )
+
+        # 审计日志级别
+        # AUDIT_TRAIL_LEVEL: 成功请求中哪些需要写入审计日志（失败请求始终记录）
+        #   all（默认）/ writes_only（POST/PUT/PATCH/DELETE）/ mutations_only（PUT/PATCH/DELETE）
+        #   / deletes_only（DELETE）/ failures_only（不记录成功请求）
+        #   未知取值（如拼写错误的 writes）回退为 all，并在启动时记录警告
+        audit_trail_level = os.getenv("AUDIT_TRAIL_LEVEL", "all").strip().lower()
+        if audit_trail_level in AUDIT_TRAIL_LEVELS:
+            self._audit_trail_level_warning = None
+        else:
+            self._audit_trail_level_warning = (
+                f"AUDIT_TRAIL_LEVEL={audit_trail_level!r} 无效，已回退为 all。"
+                f"可选值: {', '.join(AUDIT_TRAIL_LEVELS)}"
+            )
+            audit_trail_level = "all"
+        self.audit_trail_level = audit_trail_level
 
         # Admin analytics query defaults (protect DB from unbounded scans)
         # ADMIN_USAGE_DEFAULT_DAYS:
@@ -260,6 +286,20 @@ class Config:
             os.getenv("CRYPTO_DECRYPT_CACHE_TTL_SECONDS", "60.0")
         )
 
+        # 缓存预热画像配置
+        # CACHE_WARMUP_PROFILE_PATH: 热点缓存访问画像的持久化路径，默认留空（禁用）
+        #   多 worker 部署时各 worker 会覆盖同一文件（最后写入者生效），
+        #   建议放在持久化目录下，如 logs/warmup_profile.json
+        # CACHE_WARMUP_PROFILE_MAX_ENTRIES: 画像中保留的最热条目数
+        # CACHE_WARMUP_PROFILE_FLUSH_SECONDS: 画像落盘间隔（秒）
+        self.cache_warmup_profile_path = os.getenv("CACHE_WARMUP_PROFILE_PATH", "")
+        self.cache_warmup_profile_max_entries = int(
+            os.getenv("CACHE_WARMUP_PROFILE_MAX_ENTRIES", "100")
+        )
+        self.cache_warmup_profile_flush_seconds = float(
+            os.getenv("CACHE_WARMUP_PROFILE_FLUSH_SECONDS", "60.0")
+        )
+
         # 内部请求 User-Agent 配置（用于查询上游模型列表等）
         # 可通过环境变量覆盖默认值，模拟对应 CLI 客户端
         self.internal_user_agent_claude_cli = os.getenv(
@@ -436,6 +476,10 @@ class Config:
         if hasattr(self, "_pool_config_warning") and self._pool_config_warning:
             logger.warning(self._pool_config_warning)
 
+        # 审计日志级别配置警告
+        if getattr(self, "_audit_trail_level_warning", None):
+            logger.warning(self._audit_trail_level_warning)
+
         # 管理员密码检查（必须在环境变量中设置）
         if hasattr(self, "_missing_admin_password") and self._missing_admin_password:
             logger.error("必须设置 ADMIN_PASSWORD 环境变量！")
@@ -431,13 +431,17 @@ class InternalError:
         }
 
 
+# frozenset 不可变，可直接作为共享默认值，无需每次实例化都新建
+EMPTY_FEATURES: frozenset[str] = frozenset()
+
+
 @dataclass(frozen=True)
 class FormatCapabilities:
     supports_stream: bool = True
     supports_error_conversion: bool = True
     supports_tools: bool = True
     supports_images: bool = False
-    supported_features: frozenset[str] = field(default_factory=frozenset)
+    supported_features: frozenset[str] = EMPTY_FEATURES
 
 
 __all__ = [
@@ -466,4 +470,5 @@ __all__ = [
     "InternalResponse",
     "InternalError",
     "FormatCapabilities",
+    "EMPTY_FEATURES",
 ]
@@ -120,3 +120,18 @@ antigravity_degradation_total = Counter(
     "Count of Antigravity signature degradation (rectification) events",
     ["stage", "model"],
 )
+
+# ==================== 缓存预热 ====================
+
+cache_warmup_duration_seconds = Histogram(
+    "cache_warmup_duration_seconds",
+    "Duration of startup cache warmup tasks in seconds",
+    ["task"],
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30],  # 50ms 到 30s（单任务超时）
+)
+
+cache_warmup_failures_total = Counter(
+    "cache_warmup_failures_total",
+    "Total number of failed or timed out startup cache warmup tasks",
+    ["task"],
+)
@@ -160,6 +160,20 @@ async def lifespan(app: FastAPI) -> Any:
     await init_codex_quota_sync_dispatcher()
     logger.info("[OK] Codex 配额异步同步器已启动")
 
+    # 初始化请求统计异步写入器（请求路径仅投递健康度/候选状态写入）
+    logger.info("初始化请求统计异步写入器...")
+    from src.services.request.stats_writer import init_execution_stats_writer
+
+    await init_execution_stats_writer()
+    logger.info("[OK] 请求统计异步写入器已启动")
+
+    # 初始化审计日志缓冲写入器（请求路径仅缓冲审计事件，批量落库）
+    logger.info("初始化审计日志缓冲写入器...")
+    from src.services.system.audit_writer import init_audit_log_writer
+
+    await init_audit_log_writer()
+    logger.info("[OK] 审计日志缓冲写入器已启动")
+
     # 初始化 Usage 队列消费者（可选）
     if config.usage_queue_enabled:
         logger.info("初始化 Usage 队列消费者...")
@@ -306,6 +320,25 @@ async def lifespan(app: FastAPI) -> Any:
     await shutdown_codex_quota_sync_dispatcher()
     logger.info("[OK] Codex 配额异步同步器已停止")
 
+    # 停止请求统计异步写入器（停止前会 flush 待写入操作）
+    logger.info("停止请求统计异步写入器...")
+    from src.services.request.stats_writer import shutdown_execution_stats_writer
+
+    await shutdown_execution_stats_writer()
+    logger.info("[OK] 请求统计异步写入器已停止")
+
+    # 停止审计日志缓冲写入器（停止前会 flush 缓冲中的事件）
+    logger.info("停止审计日志缓冲写入器...")
+    from src.services.system.audit_writer import shutdown_audit_log_writer
+
+    await shutdown_audit_log_writer()
+    logger.info("[OK] 审计日志缓冲写入器已停止")
+
+    # 停止缓存预热画像记录（退出前保存热点画像）
+    from src.services.system.cache_warmup import stop_cache_warmup
+
+    await stop_cache_warmup()
+
     # 停止批量提交器（确保所有待提交的数据都被保存）
     logger.info("停止批量提交器...")
     from src.core.batch_committer import shutdown_batch_committer
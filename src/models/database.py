@@ -307,6 +307,32 @@ class Usage(Base):
         Index("idx_usage_provider_created", "provider_name", "created_at"),
         Index("idx_usage_model_created", "model", "created_at"),
         Index("idx_usage_provider_key", "provider_id", "provider_api_key_id"),
+        # 分级清理使用的部分索引：只覆盖仍有待清理数据的记录，随清理推进而收缩
+        Index(
+            "idx_usage_body_cleanup",
+            "created_at",
+            postgresql_where=text(
+                "request_body IS NOT NULL OR response_body IS NOT NULL"
+                " OR provider_request_body IS NOT NULL OR client_response_body IS NOT NULL"
+            ),
+        ),
+        Index(
+            "idx_usage_body_compressed_cleanup",
+            "created_at",
+            postgresql_where=text(
+                "request_body_compressed IS NOT NULL OR response_body_compressed IS NOT NULL"
+                " OR provider_request_body_compressed IS NOT NULL"
+                " OR client_response_body_compressed IS NOT NULL"
+            ),
+        ),
+        Index(
+            "idx_usage_header_cleanup",
+            "created_at",
+            postgresql_where=text(
+                "request_headers IS NOT NULL OR response_headers IS NOT NULL"
+                " OR provider_request_headers IS NOT NULL"
+            ),
+        ),
     )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()), index=True)
@@ -86,6 +86,41 @@ JWT_EXPIRATION_HOURS = config.jwt_expiration_hours
 # Refresh token 有效期设为7天
 REFRESH_TOKEN_EXPIRATION_DAYS = 7
 
+# 已验签 JWT payload 的进程内缓存：命中时跳过签名校验与解码
+# 以 token 的 SHA-256 摘要为键，最长缓存 5 分钟且不超过 token 自身的 exp
+_TOKEN_PAYLOAD_CACHE_TTL = 300  # 秒
+_TOKEN_PAYLOAD_CACHE_MAX_SIZE = 10000
+
+_token_payload_cache: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+_token_payload_lock = Lock()
+
+
+def _decode_token_cached(token: str) -> dict[str, Any]:
+    """解码并验签 JWT，结果按 exp 缓存；类型与黑名单校验由调用方每次执行"""
+    key = hashlib.sha256(token.encode()).digest()
+    now = time.time()
+
+    with _token_payload_lock:
+        cached = _token_payload_cache.get(key)
+        if cached is not None:
+            if now < cached[1]:
+                _token_payload_cache.move_to_end(key)
+                return dict(cached[0])
+            _token_payload_cache.pop(key, None)
+
+    payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    expires_at = now + _TOKEN_PAYLOAD_CACHE_TTL
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        expires_at = min(expires_at, exp)
+
+    with _token_payload_lock:
+        _token_payload_cache[key] = (dict(payload), expires_at)
+        while len(_token_payload_cache) > _TOKEN_PAYLOAD_CACHE_MAX_SIZE:
+            _token_payload_cache.popitem(last=False)
+
+    return payload
+
 
 class AuthService:
     """认证服务"""
@@ -154,7 +189,7 @@ class AuthService:
             token_type: 期望的token类型 ('access' 或 'refresh')，None表示不验证类型
         """
         try:
-            payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+            payload = _decode_token_cached(token)
 
             # 验证token类型（如果指定）
             if token_type:
@@ -2,7 +2,7 @@
 RPM 限制管理器 - 支持 Redis 或内存的 Key 级别 RPM 限制
 
 功能：
-1. ProviderAPIKey 级别的 RPM 限制（按分钟窗口计数）
+1. ProviderAPIKey 级别的 RPM 限制（Redis 下为滚动窗口，内存模式下按分钟窗口计数）
 2. 分布式环境下优先使用 Redis，多实例共享
 3. 在开发/单实例场景下自动降级为内存计数
 4. 支持缓存用户优先级（预留槽位机制）
@@ -14,6 +14,7 @@ import asyncio
 import math
 import os
 import time
+import uuid
 from contextlib import asynccontextmanager
 from typing import Any
 
@@ -22,12 +23,44 @@ import redis.asyncio as aioredis
 from src.config.constants import RPMDefaults
 from src.core.logger import logger
 
+# 滚动窗口 RPM 准入脚本（Sorted Set，score = 请求时间戳毫秒）
+# 清理窗口外的记录、计数、按缓存预留规则判断并写入在同一脚本内完成，保证原子性。
+# 返回 {admitted, count}：admitted=1 表示准入，count 为准入后（或拒绝时）的窗口内请求数。
+RPM_WINDOW_ACQUIRE_LUA = """
+local window_key = KEYS[1]
+local now_ms = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local key_max = tonumber(ARGV[3])
+local is_cached = tonumber(ARGV[4])  -- 0=新用户, 1=缓存用户
+local cache_ratio = tonumber(ARGV[5])  -- 缓存预留比例
+local member = ARGV[6]
+
+redis.call('ZREMRANGEBYSCORE', window_key, '-inf', now_ms - window_ms)
+local key_count = redis.call('ZCARD', window_key)
+
+if key_max >= 0 then
+    local limit = key_max
+    if is_cached == 0 then
+        -- 新用户：只能使用 (1 - cache_ratio) 的槽位
+        limit = math.max(1, math.floor(key_max * (1 - cache_ratio)))
+    end
+    if key_count >= limit then
+        return {0, key_count}
+    end
+end
+
+redis.call('ZADD', window_key, now_ms, member)
+redis.call('PEXPIRE', window_key, window_ms)
+return {1, key_count + 1}
+"""
+
 
 class ConcurrencyManager:
     """Key RPM 限制管理器"""
 
     _instance: ConcurrencyManager | None = None
     _redis: aioredis.Redis | None = None
+    _rpm_window_script: Any = None
 
     def __new__(cls) -> "ConcurrencyManager":
         """单例模式"""
@@ -43,10 +76,11 @@ class ConcurrencyManager:
         from src.config.settings import config
 
         self._key_rpm_bucket_seconds: int = config.rpm_bucket_seconds
-        self._key_rpm_key_ttl_seconds: int = config.rpm_key_ttl_seconds
 
         self._memory_lock: asyncio.Lock = asyncio.Lock()
         # Key RPM 计数器：{key_id: (bucket, count)}，bucket = floor(now / 60)
+        # 注意：内存模式是固定分钟窗口，与 Redis 的滚动窗口语义不同，
+        # 窗口边界前后最多可各准入一个 limit（降级期间的近似限流）
         self._memory_key_rpm_counts: dict[str, tuple[int, int]] = {}
         self._owns_redis: bool = False
         self._last_cleanup_bucket: int = 0  # 上次清理时的 bucket，用于定期清理过期数据
@@ -76,6 +110,8 @@ class ConcurrencyManager:
             self._redis = await get_redis_client(require_redis=False)
             self._owns_redis = False
             if self._redis:
+                # Script 对象使用 EVALSHA，脚本缓存丢失（如 Redis 重启）时自动重新加载
+                self._rpm_window_script = self._redis.register_script(RPM_WINDOW_ACQUIRE_LUA)
                 logger.info("[OK] ConcurrencyManager 已复用全局 Redis 客户端")
             else:
                 logger.warning(
@@ -131,6 +167,7 @@ class ConcurrencyManager:
             await self._redis.close()
             logger.info("ConcurrencyManager Redis 连接已关闭")
         self._redis = None
+        self._rpm_window_script = None
         self._owns_redis = False
 
     def _get_rpm_bucket(self, now_ts: float | None = None) -> int:
@@ -138,10 +175,13 @@ class ConcurrencyManager:
         ts = now_ts if now_ts is not None else time.time()
         return int(ts // self._key_rpm_bucket_seconds)
 
-    def _get_key_key(self, key_id: str, bucket: int | None = None) -> str:
-        """获取 ProviderAPIKey RPM 计数的 Redis Key（按分钟桶）"""
-        b = bucket if bucket is not None else self._get_rpm_bucket()
-        return f"rpm:key:{key_id}:{b}"
+    def _get_window_key(self, key_id: str) -> str:
+        """获取 ProviderAPIKey RPM 滚动窗口的 Redis Key（Sorted Set）"""
+        return f"rpm:key:{key_id}:window"
+
+    @property
+    def _rpm_window_ms(self) -> int:
+        return self._key_rpm_bucket_seconds * 1000
 
     def _get_memory_key_rpm_count(self, key_id: str, bucket: int) -> int:
         """获取内存模式下 Key 在指定 bucket 的 RPM 计数"""
@@ -248,7 +288,7 @@ class ConcurrencyManager:
             key_id: ProviderAPIKey ID
 
         Returns:
-            当前分钟窗口内的请求数
+            当前 RPM 窗口内的请求数
         """
         if self._redis is None:
             async with self._memory_lock:
@@ -258,9 +298,12 @@ class ConcurrencyManager:
                 return self._get_memory_key_rpm_count(key_id, bucket)
 
         try:
-            key_key = self._get_key_key(key_id)
-            result = await self._redis.get(key_key)
-            return int(result) if result else 0
+            now_ms = int(time.time() * 1000)
+            return int(
+                await self._redis.zcount(
+                    self._get_window_key(key_id), f"({now_ms - self._rpm_window_ms}", "+inf"
+                )
+            )
         except Exception as e:
             logger.error("获取 RPM 计数失败: {}", e)
             return 0
@@ -327,6 +370,19 @@ class ConcurrencyManager:
         - 缓存用户最多使用: 100 RPM（全部）
         - 预留的 30 RPM 专门给缓存用户，保证他们的请求优先
         """
+        acquired, _count = await self._acquire_rpm_slot_with_count(
+            key_id, key_rpm_limit, is_cached_user, cache_reservation_ratio
+        )
+        return acquired
+
+    async def _acquire_rpm_slot_with_count(
+        self,
+        key_id: str,
+        key_rpm_limit: int | None,
+        is_cached_user: bool = False,
+        cache_reservation_ratio: float | None = None,
+    ) -> tuple[bool, int | None]:
+        """获取 RPM 槽位，同时返回准入后的窗口内请求数（未知时为 None）"""
         # 从配置读取默认值
         from src.config.settings import config
 
@@ -345,76 +401,42 @@ class ConcurrencyManager:
                 if key_rpm_limit is not None:
                     if is_cached_user:
                         if key_count >= key_rpm_limit:
-                            return False
+                            return False, key_count
                     else:
                         # 新用户只能使用 (1 - cache_reservation_ratio) 的槽位
                         available_for_new = max(
                             1, math.floor(key_rpm_limit * (1 - cache_reservation_ratio))
                         )
                         if key_count >= available_for_new:
-                            return False
+                            return False, key_count
 
                 # 通过限制，更新计数
                 self._set_memory_key_rpm_count(key_id, bucket, key_count + 1)
-                return True
-
-        bucket = self._get_rpm_bucket()
-        key_key = self._get_key_key(key_id, bucket=bucket)
+                return True, key_count + 1
 
         try:
-            # 使用 Lua 脚本保证原子性（支持缓存预留逻辑）
-            lua_script = """
-            local key_key = KEYS[1]
-            local key_max = tonumber(ARGV[1])
-            local key_ttl = tonumber(ARGV[2])
-            local is_cached = tonumber(ARGV[3])  -- 0=新用户, 1=缓存用户
-            local cache_ratio = tonumber(ARGV[4])  -- 缓存预留比例
-
-            -- 获取当前值
-            local key_count = tonumber(redis.call('GET', key_key) or '0')
-
-            -- 检查 key 限制（支持缓存预留）
-            if key_max >= 0 then
-                if is_cached == 0 then
-                    -- 新用户：只能使用 (1 - cache_ratio) 的槽位
-                    local available_for_new = math.max(1, math.floor(key_max * (1 - cache_ratio)))
-                    if key_count >= available_for_new then
-                        return 0  -- 失败：新用户配额已满
-                    end
-                else
-                    -- 缓存用户：可以使用全部槽位
-                    if key_count >= key_max then
-                        return 0  -- 失败：总配额已满
-                    end
-                end
-            end
-
-            -- 增加计数
-            redis.call('INCR', key_key)
-            redis.call('EXPIRE', key_key, key_ttl)
-
-            return 1  -- 成功
-            """
-
-            # 执行脚本
-            result = await self._redis.eval(
-                lua_script,
-                1,  # 1 个 KEY
-                key_key,
-                key_rpm_limit if key_rpm_limit is not None else -1,
-                self._key_rpm_key_ttl_seconds,
-                1 if is_cached_user else 0,  # 缓存用户标志
-                cache_reservation_ratio,  # 预留比例
+            if self._rpm_window_script is None:
+                self._rpm_window_script = self._redis.register_script(RPM_WINDOW_ACQUIRE_LUA)
+
+            # 滚动窗口准入：清理、计数、判断、写入在 Lua 脚本内原子完成
+            admitted, key_count = await self._rpm_window_script(
+                keys=[self._get_window_key(key_id)],
+                args=[
+                    int(time.time() * 1000),
+                    self._rpm_window_ms,
+                    key_rpm_limit if key_rpm_limit is not None else -1,
+                    1 if is_cached_user else 0,  # 缓存用户标志
+                    cache_reservation_ratio,  # 预留比例
+                    uuid.uuid4().hex,
+                ],
             )
-
-            success = result == 1
+            success = int(admitted) == 1
+            key_count = int(key_count)
 
             if success:
                 user_type = "缓存用户" if is_cached_user else "新用户"
                 logger.debug("[OK] 获取 RPM 槽位成功: key={}, 类型={}", key_id, user_type)
             else:
-                key_count = await self.get_key_rpm_count(key_id)
-
                 # 计算新用户可用 RPM
                 if key_rpm_limit and not is_cached_user:
                     available_for_new = int(key_rpm_limit * (1 - cache_reservation_ratio))
@@ -424,7 +446,7 @@ class ConcurrencyManager:
 
                 logger.warning("[WARN] RPM 限制已达上限: key={}({})", key_id, user_info)
 
-            return success
+            return success, key_count
 
         except Exception as e:
             logger.error("获取 RPM 槽位失败，降级到内存模式: {}", e)
@@ -446,12 +468,12 @@ class ConcurrencyManager:
                         key_count,
                         fallback_rpm_limit,
                     )
-                    return False
+                    return False, key_count
 
                 # 更新内存计数
                 self._set_memory_key_rpm_count(key_id, bucket, key_count + 1)
                 logger.debug("[FALLBACK] 使用内存模式获取 RPM 槽位: key={}", key_id)
-                return True
+                return True, key_count + 1
 
     @asynccontextmanager
     async def rpm_guard(
@@ -474,16 +496,20 @@ class ConcurrencyManager:
 
         如果获取失败，会抛出 ConcurrencyLimitError 异常
 
-        注意：RPM 是按分钟窗口计数，不需要在请求结束后释放
-        """
-        # 从配置读取默认值
-        from src.config.settings import config
+        上下文返回准入后窗口内的 RPM 计数（未知时为 None），调用方无需再次查询
 
-        if cache_reservation_ratio is None:
-            cache_reservation_ratio = config.cache_reservation_ratio
+        注意：RPM 是按时间窗口计数，不需要在请求结束后释放；
+        该 guard 只做速率准入，不持有并发信号量，上游并发连接数由
+        HTTP 客户端连接池（httpx.Limits）约束。
+        key_rpm_limit 为负数表示不限制，直接放行且不写入滑动窗口；
+        None 表示自适应模式，仍需计数供 RPM 学习使用。
+        """
+        if key_rpm_limit is not None and key_rpm_limit < 0:
+            yield None
+            return
 
         # 尝试获取槽位（传递缓存用户参数）
-        acquired = await self.acquire_rpm_slot(
+        acquired, admitted_count = await self._acquire_rpm_slot_with_count(
             key_id,
             key_rpm_limit,
             is_cached_user,
@@ -503,7 +529,7 @@ class ConcurrencyManager:
         exception_occurred = False
 
         try:
-            yield  # 执行请求
+            yield admitted_count  # 执行请求
         except Exception:
             # 记录异常
             exception_occurred = True
@@ -543,7 +569,7 @@ class ConcurrencyManager:
                 # 指标记录失败不应影响业务逻辑
                 logger.debug("记录指标失败: {}", metric_error)
 
-            # 注意：RPM 计数不需要在请求结束后释放，它会在分钟窗口过期后自动重置
+            # 注意：RPM 计数不需要在请求结束后释放，它会随时间窗口滑出自动失效
 
     async def reset_key_rpm(self, key_id: str) -> None:
         """
@@ -3,14 +3,55 @@
 """
 
 import uuid
+from collections.abc import Collection
 from datetime import datetime, timezone
+from typing import Any
 
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.orm import Session
 
 from src.core.batch_committer import get_batch_committer
 from src.core.logger import logger
 from src.models.database import RequestCandidate
 
+# 高频状态更新使用预构建的 Core UPDATE，绕过 ORM 查询/变更追踪/flush
+_candidates = RequestCandidate.__table__
+
+_MARK_STARTED_STMT = (
+    update(_candidates)
+    .where(_candidates.c.id == bindparam("candidate_id"))
+    .values(status="pending", started_at=bindparam("p_started_at"))
+)
+
+_MARK_STREAMING_STMT = (
+    update(_candidates)
+    .where(_candidates.c.id == bindparam("candidate_id"))
+    .values(
+        status="streaming",
+        status_code=bindparam("p_status_code"),
+        concurrent_requests=bindparam("p_concurrent_requests"),
+    )
+)
+
+_MARK_SUCCESS_STMT = (
+    update(_candidates)
+    .where(_candidates.c.id == bindparam("candidate_id"))
+    .values(
+        status="success",
+        status_code=bindparam("p_status_code"),
+        latency_ms=bindparam("p_latency_ms"),
+        concurrent_requests=bindparam("p_concurrent_requests"),
+        finished_at=bindparam("p_finished_at"),
+        # 成功时清空错误字段（可能是整流重试后成功，之前记录过错误）
+        error_type=None,
+        error_message=None,
+    )
+)
+
+_SELECT_EXTRA_DATA_STMT = select(_candidates.c.extra_data).where(
+    _candidates.c.id == bindparam("candidate_id")
+)
+
 
 class RequestCandidateService:
     """请求候选记录服务"""
@@ -83,13 +124,15 @@ class RequestCandidateService:
             db: 数据库会话
             candidate_id: 候选ID
         """
-        candidate = db.query(RequestCandidate).filter(RequestCandidate.id == candidate_id).first()
-        if candidate:
-            candidate.status = "pending"
-            candidate.started_at = datetime.now(timezone.utc)
-            # 关键状态更新：立即提交，不使用批量提交
-            # 原因：前端需要实时看到请求开始执行
-            db.commit()
+        # 先 flush 会话中尚未写入的 ORM 变更，保证本次状态更新在其后生效
+        db.flush()
+        db.execute(
+            _MARK_STARTED_STMT,
+            {"candidate_id": candidate_id, "p_started_at": datetime.now(timezone.utc)},
+        )
+        # 关键状态更新：立即提交，不使用批量提交
+        # 原因：前端需要实时看到请求开始执行
+        db.commit()
 
     @staticmethod
     def update_candidate_status(db: Session, candidate_id: str, status: str) -> None:
@@ -116,6 +159,7 @@ class RequestCandidateService:
         candidate_id: str,
         status_code: int = 200,
         concurrent_requests: int | None = None,
+        only_if_status: Collection[str] | None = None,
     ) -> None:
         """
         标记候选为流式传输中
@@ -128,14 +172,22 @@ class RequestCandidateService:
             candidate_id: 候选ID
             status_code: HTTP 状态码（通常是 200）
             concurrent_requests: 并发请求数
+            only_if_status: 仅当候选当前处于这些状态时才更新（延迟写入时防止覆盖更新的状态）
         """
-        candidate = db.query(RequestCandidate).filter(RequestCandidate.id == candidate_id).first()
-        if candidate:
-            candidate.status = "streaming"
-            candidate.status_code = status_code
-            candidate.concurrent_requests = concurrent_requests
-            # streaming 状态不设置 finished_at，因为请求还在进行中
-            db.commit()
+        stmt = _MARK_STREAMING_STMT
+        if only_if_status is not None:
+            stmt = stmt.where(_candidates.c.status.in_(list(only_if_status)))
+        # streaming 状态不设置 finished_at，因为请求还在进行中
+        db.flush()
+        db.execute(
+            stmt,
+            {
+                "candidate_id": candidate_id,
+                "p_status_code": status_code,
+                "p_concurrent_requests": concurrent_requests,
+            },
+        )
+        db.commit()
 
     @staticmethod
     def mark_candidate_success(
@@ -145,6 +197,7 @@ class RequestCandidateService:
         latency_ms: int,
         concurrent_requests: int | None = None,
         extra_data: dict | None = None,
+        only_if_status: Collection[str] | None = None,
     ) -> None:
         """
         标记候选执行成功
@@ -156,22 +209,28 @@ class RequestCandidateService:
             latency_ms: 延迟（毫秒）
             concurrent_requests: 并发请求数
             extra_data: 额外数据
+            only_if_status: 仅当候选当前处于这些状态时才更新（延迟写入时防止覆盖更新的状态）
         """
-        candidate = db.query(RequestCandidate).filter(RequestCandidate.id == candidate_id).first()
-        if candidate:
-            candidate.status = "success"
-            candidate.status_code = status_code
-            candidate.latency_ms = latency_ms
-            candidate.concurrent_requests = concurrent_requests
-            candidate.finished_at = datetime.now(timezone.utc)
-            # 成功时清空错误字段（可能是整流重试后成功，之前记录过错误）
-            candidate.error_type = None
-            candidate.error_message = None
-            if extra_data:
-                candidate.extra_data = {**(candidate.extra_data or {}), **extra_data}
-            # 关键状态更新：立即提交，不使用批量提交
-            # 原因：前端需要实时看到请求成功/失败状态
-            db.commit()
+        params: dict[str, Any] = {
+            "candidate_id": candidate_id,
+            "p_status_code": status_code,
+            "p_latency_ms": latency_ms,
+            "p_concurrent_requests": concurrent_requests,
+            "p_finished_at": datetime.now(timezone.utc),
+        }
+        stmt = _MARK_SUCCESS_STMT
+        if only_if_status is not None:
+            stmt = stmt.where(_candidates.c.status.in_(list(only_if_status)))
+        if extra_data:
+            # JSON 列跨数据库无法原地合并，先读取现有值再整体写回
+            current = db.execute(_SELECT_EXTRA_DATA_STMT, {"candidate_id": candidate_id}).scalar()
+            stmt = stmt.values(extra_data=bindparam("p_extra_data"))
+            params["p_extra_data"] = {**(current or {}), **extra_data}
+        db.flush()
+        db.execute(stmt, params)
+        # 关键状态更新：立即提交，不使用批量提交
+        # 原因：前端需要实时看到请求成功/失败状态
+        db.commit()
 
     @staticmethod
     def mark_candidate_failed(
@@ -15,14 +15,21 @@ from sqlalchemy.orm import Session
 from src.core.api_format.signature import make_signature_key
 from src.core.exceptions import ConcurrencyLimitError
 from src.core.logger import logger
-from src.services.health.monitor import health_monitor
 from src.services.provider.format import normalize_endpoint_signature
 from src.services.rate_limit.adaptive_reservation import get_adaptive_reservation_manager
 from src.services.rate_limit.adaptive_rpm import get_adaptive_rpm_manager
 from src.services.request.candidate import RequestCandidateService
+from src.services.request.stats_writer import (
+    AdaptiveSuccess,
+    MarkCandidateStreaming,
+    MarkCandidateSuccess,
+    RecordHealthSuccess,
+    StatsOp,
+    get_execution_stats_writer,
+)
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionContext:
     candidate_id: str
     candidate_index: int
@@ -44,18 +51,25 @@ class ExecutionContext:
     reservation_load_factor: float | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionResult:
     response: Any
     context: ExecutionContext
 
 
 class ExecutionError(Exception):
+    # 消息按需由 cause 生成：并发拒绝等高频异常通常只被分类处理，无需格式化
     def __init__(self, cause: Exception, context: ExecutionContext):
-        super().__init__(str(cause))
+        super().__init__()
         self.cause = cause
         self.context = context
 
+    def __str__(self) -> str:
+        return str(self.cause)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({type(self.cause).__name__})"
+
 
 class RequestExecutor:
     def __init__(self, db: Session, concurrency_manager: Any, adaptive_manager: Any) -> None:
@@ -116,14 +130,14 @@ class RequestExecutor:
             context.rpm_current = current_key_rpm
 
             # 获取有效的 RPM 限制（自适应或固定）
-            effective_key_limit = get_adaptive_rpm_manager().get_effective_limit(key)
+            effective_key_limit: int | None = get_adaptive_rpm_manager().get_effective_limit(key)
 
             reservation_result = reservation_manager.calculate_reservation(
                 key=key,
                 current_usage=current_key_rpm,
                 effective_limit=effective_key_limit,
             )
-            dynamic_reservation_ratio = reservation_result.ratio
+            dynamic_reservation_ratio: float = reservation_result.ratio
 
             context.rpm_limit = effective_key_limit
             context.reservation_ratio = dynamic_reservation_ratio
@@ -136,12 +150,13 @@ class RequestExecutor:
                     1, math.floor(effective_key_limit * (1 - dynamic_reservation_ratio))
                 )
 
-            logger.debug(
+            # lazy=True：参数仅在有 sink 接收 DEBUG 日志时才求值
+            logger.opt(lazy=True).debug(
                 "[Executor] 动态预留: key={}..., ratio={:.0%}, phase={}, confidence={:.0%}",
-                key.id[:8],
-                dynamic_reservation_ratio,
-                reservation_result.phase,
-                reservation_result.confidence,
+                lambda: key.id[:8],
+                lambda: dynamic_reservation_ratio,
+                lambda: reservation_result.phase,
+                lambda: reservation_result.confidence,
             )
 
             async with self.concurrency_manager.rpm_guard(
@@ -149,15 +164,17 @@ class RequestExecutor:
                 key_rpm_limit=effective_key_limit,
                 is_cached_user=is_cached_user,
                 cache_reservation_ratio=dynamic_reservation_ratio,
-            ):
-                # 获取当前 RPM 计数（guard 内再次获取以获得最新值）
-                try:
-                    key_rpm_count = await self.concurrency_manager.get_key_rpm_count(
-                        key_id=key.id,
-                    )
-                except Exception as e:
-                    logger.debug("获取 RPM 计数失败（guard 内）: {}", e)
-                    key_rpm_count = None
+            ) as admitted_rpm_count:
+                # guard 准入时已返回最新 RPM 计数；未知时再查询一次
+                key_rpm_count = admitted_rpm_count
+                if key_rpm_count is None:
+                    try:
+                        key_rpm_count = await self.concurrency_manager.get_key_rpm_count(
+                            key_id=key.id,
+                        )
+                    except Exception as e:
+                        logger.debug("获取 RPM 计数失败（guard 内）: {}", e)
+                        key_rpm_count = None
 
                 if key_rpm_count is not None:
                     context.concurrent_requests = key_rpm_count  # 用于记录，实际是 RPM 计数
@@ -167,25 +184,31 @@ class RequestExecutor:
 
                 context.elapsed_ms = int((time.time() - context.start_time) * 1000)
 
+                # 健康度按 Provider 端点格式记录；端点未声明格式时才归一化客户端格式
                 fam = str(getattr(endpoint, "api_family", "")).strip().lower()
                 kind = str(getattr(endpoint, "endpoint_kind", "")).strip().lower()
-                provider_format_str = make_signature_key(fam, kind) if fam and kind else ""
-                client_format_str = normalize_endpoint_signature(api_format)
-                health_format = provider_format_str or client_format_str
+                if fam and kind:
+                    health_format = make_signature_key(fam, kind)
+                else:
+                    health_format = normalize_endpoint_signature(api_format)
 
-                health_monitor.record_success(
-                    db=self.db,
-                    key_id=key.id,
-                    api_format=health_format,
-                    response_time_ms=context.elapsed_ms,
-                )
+                stats_ops: list[StatsOp] = [
+                    RecordHealthSuccess(
+                        key_id=key.id,
+                        api_format=health_format,
+                        response_time_ms=context.elapsed_ms,
+                    )
+                ]
 
                 # 自适应模式：rpm_limit = NULL
                 if key.rpm_limit is None and key_rpm_count is not None:
-                    self.adaptive_manager.handle_success(
-                        db=self.db,
-                        key=key,
-                        current_rpm=key_rpm_count,
+                    stats_ops.append(
+                        AdaptiveSuccess(
+                            adaptive_manager=self.adaptive_manager,
+                            key=key,
+                            key_id=key.id,
+                            current_rpm=key_rpm_count,
+                        )
                     )
 
                 # 根据是否为流式请求，标记不同状态
@@ -193,11 +216,12 @@ class RequestExecutor:
                     # 流式请求：标记为 streaming 状态
                     # 此时连接已建立但流传输尚未完成
                     # success 状态会在流完成后由 _record_stream_stats 方法标记
-                    RequestCandidateService.mark_candidate_streaming(
-                        db=self.db,
-                        candidate_id=candidate_id,
-                        status_code=200,
-                        concurrent_requests=key_rpm_count,
+                    stats_ops.append(
+                        MarkCandidateStreaming(
+                            candidate_id=candidate_id,
+                            status_code=200,
+                            concurrent_requests=key_rpm_count,
+                        )
                     )
                 else:
                     # 非流式请求：标记为 success 状态
@@ -217,15 +241,19 @@ class RequestExecutor:
                     _pi = resolve_proxy_info(_eff_proxy)
                     if _pi:
                         _extra["proxy"] = _pi
-                    RequestCandidateService.mark_candidate_success(
-                        db=self.db,
-                        candidate_id=candidate_id,
-                        status_code=200,
-                        latency_ms=context.elapsed_ms,
-                        concurrent_requests=key_rpm_count,
-                        extra_data=_extra,
+                    stats_ops.append(
+                        MarkCandidateSuccess(
+                            candidate_id=candidate_id,
+                            status_code=200,
+                            latency_ms=context.elapsed_ms,
+                            concurrent_requests=key_rpm_count,
+                            extra_data=_extra,
+                        )
                     )
 
+                # 候选状态同步更新；健康度与自适应统计由后台写入器落库，不阻塞响应返回
+                get_execution_stats_writer().submit(self.db, *stats_ops)
+
                 return ExecutionResult(response=response, context=context)
         except ConcurrencyLimitError as exc:
             raise ExecutionError(exc, context) from exc
@@ -0,0 +1,326 @@
+"""
+请求执行统计异步写入器。
+
+目标：
+- 请求成功后的健康度记录与自适应 RPM 调整不再阻塞响应返回
+- 候选状态更新（streaming/success）仍在请求会话上同步执行，
+  进程崩溃或强制退出时不会让候选停留在 pending
+- 请求主路径只投递写入操作，后台按投递顺序批量落库
+- 队列有上限，满时回退为同步执行；停止时在超时内排空，超时未写入的操作计数并告警
+- 写入器未运行时（测试、脚本）回退为在请求会话上同步执行
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from src.core.logger import logger
+from src.database.database import create_session
+from src.models.database import ProviderAPIKey
+from src.services.health.monitor import health_monitor
+from src.services.request.candidate import RequestCandidateService
+
+# 延迟写入的候选状态更新仅在候选仍处于 pending 时生效，
+# 避免覆盖投递之后才同步写入的状态（如流式传输失败、流结束后的 success）
+_DEFERRABLE_CANDIDATE_STATUSES = frozenset({"pending"})
+
+# 异步队列中最多积压的操作数，超出时回退同步执行
+STATS_QUEUE_MAX_PENDING = 10000
+# 停止时排空队列的最长等待时间（秒）
+STATS_SHUTDOWN_DRAIN_TIMEOUT_SECONDS = 5.0
+
+
+@dataclass(slots=True)
+class RecordHealthSuccess:
+    key_id: str
+    api_format: str
+    response_time_ms: int | None
+
+
+@dataclass(slots=True)
+class AdaptiveSuccess:
+    adaptive_manager: Any
+    key: Any  # 请求会话中的 ProviderAPIKey，仅同步路径使用
+    key_id: str
+    current_rpm: int
+
+
+@dataclass(slots=True)
+class MarkCandidateStreaming:
+    candidate_id: str
+    status_code: int
+    concurrent_requests: int | None
+
+
+@dataclass(slots=True)
+class MarkCandidateSuccess:
+    candidate_id: str
+    status_code: int
+    latency_ms: int | None
+    concurrent_requests: int | None
+    extra_data: dict[str, Any] | None
+
+
+StatsOp = RecordHealthSuccess | AdaptiveSuccess | MarkCandidateStreaming | MarkCandidateSuccess
+
+# submit() 中始终同步执行的操作：候选状态是请求的终态记录，不能因队列丢失而悬空
+_SYNC_OPS = (MarkCandidateStreaming, MarkCandidateSuccess)
+
+
+def apply_stats_op(db: Session, op: StatsOp, *, deferred: bool = False) -> None:
+    """在给定会话上执行单个写入操作"""
+    only_if_status = _DEFERRABLE_CANDIDATE_STATUSES if deferred else None
+
+    if isinstance(op, RecordHealthSuccess):
+        health_monitor.record_success(
+            db=db,
+            key_id=op.key_id,
+            api_format=op.api_format,
+            response_time_ms=op.response_time_ms,
+        )
+    elif isinstance(op, AdaptiveSuccess):
+        key = db.get(ProviderAPIKey, op.key_id) if deferred else op.key
+        if key is not None:
+            op.adaptive_manager.handle_success(db=db, key=key, current_rpm=op.current_rpm)
+    elif isinstance(op, MarkCandidateStreaming):
+        RequestCandidateService.mark_candidate_streaming(
+            db=db,
+            candidate_id=op.candidate_id,
+            status_code=op.status_code,
+            concurrent_requests=op.concurrent_requests,
+            only_if_status=only_if_status,
+        )
+    elif isinstance(op, MarkCandidateSuccess):
+        RequestCandidateService.mark_candidate_success(
+            db=db,
+            candidate_id=op.candidate_id,
+            status_code=op.status_code,
+            latency_ms=op.latency_ms,
+            concurrent_requests=op.concurrent_requests,
+            extra_data=op.extra_data,
+            only_if_status=only_if_status,
+        )
+
+
+class ExecutionStatsWriter:
+    """请求执行统计异步写入器。"""
+
+    def __init__(
+        self,
+        flush_interval_seconds: float = 0.05,
+        max_batch_size: int = 100,
+        max_pending: int = STATS_QUEUE_MAX_PENDING,
+        shutdown_timeout_seconds: float = STATS_SHUTDOWN_DRAIN_TIMEOUT_SECONDS,
+    ) -> None:
+        self.flush_interval_seconds = max(float(flush_interval_seconds), 0.0)
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_pending = max(int(max_pending), 1)
+        self.shutdown_timeout_seconds = max(float(shutdown_timeout_seconds), 0.0)
+        # 停止时因超时未写入而丢弃的操作数
+        self.dropped_ops = 0
+        self._pending: list[StatsOp] = []
+        # 正在线程池中写入的批次，停止时等待其完成
+        self._inflight: asyncio.Future[int] | None = None
+        self._pending_lock = Lock()
+        self._event: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="execution-stats-writer")
+        self._running = True
+        logger.info(
+            "请求统计异步写入器已启动，flush_interval={}s, max_batch={}",
+            self.flush_interval_seconds,
+            self.max_batch_size,
+        )
+
+    async def stop(self) -> None:
+        if not self._running:
+            return
+
+        task = self._task
+        self._running = False
+        self._task = None
+        self._loop = None
+        self._event = None
+
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        await self._drain_on_stop()
+        logger.info("请求统计异步写入器已停止")
+
+    async def _drain_on_stop(self) -> None:
+        """等待在途批次并在超时内写入剩余操作，超时未写入的操作计入 dropped_ops"""
+        deadline = time.monotonic() + self.shutdown_timeout_seconds
+        inflight = self._inflight
+        if inflight is not None and not inflight.done():
+            try:
+                await asyncio.wait_for(
+                    asyncio.shield(inflight), timeout=self.shutdown_timeout_seconds
+                )
+            except Exception as exc:
+                logger.warning("请求统计异步写入器等待在途批次失败: {}", exc)
+
+        batch = self._drain_pending(None)
+        if not batch:
+            return
+        try:
+            await asyncio.to_thread(self._flush_batch_sync, batch, deadline)
+        except Exception as exc:
+            self.dropped_ops += len(batch)
+            logger.warning(
+                "请求统计异步写入器停止时 flush 失败，丢弃 {} 个操作: {}", len(batch), exc
+            )
+
+    def enqueue(self, *ops: StatsOp) -> bool:
+        """
+        投递写入操作（同一次调用中的操作保持顺序）。
+
+        返回:
+        - True: 已进入异步队列
+        - False: 写入器未运行（调用方应回退同步路径）
+        """
+        loop = self._loop
+        event = self._event
+        if not self._running or loop is None or event is None:
+            return False
+
+        with self._pending_lock:
+            if len(self._pending) + len(ops) > self.max_pending:
+                logger.debug("请求统计异步队列已满（{}），回退同步路径", len(self._pending))
+                return False
+            self._pending.extend(ops)
+
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError as exc:
+            with self._pending_lock:
+                for op in ops:
+                    try:
+                        self._pending.remove(op)
+                    except ValueError:
+                        pass
+            logger.warning("请求统计异步写入器投递失败，已回退同步路径: {}", exc)
+            return False
+        return True
+
+    def submit(self, db: Session, *ops: StatsOp) -> None:
+        """投递写入操作：候选状态更新同步执行，其余进入异步队列
+
+        写入器未运行或队列已满时全部在请求会话上同步执行。
+        """
+        deferred = [op for op in ops if not isinstance(op, _SYNC_OPS)]
+        queued = bool(deferred) and self.enqueue(*deferred)
+        for op in ops:
+            if queued and not isinstance(op, _SYNC_OPS):
+                continue
+            apply_stats_op(db, op)
+
+    async def _run(self) -> None:
+        assert self._event is not None
+        event = self._event
+
+        # 被取消时直接退出，剩余操作由 stop() 在超时内排空
+        while True:
+            await event.wait()
+            if self.flush_interval_seconds > 0:
+                await asyncio.sleep(self.flush_interval_seconds)
+            batch = self._drain_pending(self.max_batch_size)
+            if batch:
+                self._inflight = asyncio.ensure_future(
+                    asyncio.to_thread(self._flush_batch_sync, batch)
+                )
+                try:
+                    # 取消时写入仍在线程中继续，stop() 会等待其完成
+                    await asyncio.shield(self._inflight)
+                except Exception as exc:
+                    logger.warning("请求统计异步写入失败: ops={}, error={}", len(batch), exc)
+            with self._pending_lock:
+                if not self._pending:
+                    event.clear()
+
+    def _drain_pending(self, limit: int | None) -> list[StatsOp]:
+        with self._pending_lock:
+            if not self._pending:
+                return []
+            if limit is None or len(self._pending) <= limit:
+                batch = self._pending
+                self._pending = []
+            else:
+                batch = self._pending[:limit]
+                del self._pending[:limit]
+            return batch
+
+    def _flush_batch_sync(self, batch: list[StatsOp], deadline: float | None = None) -> int:
+        """按投递顺序落库，单个操作失败不影响其余操作，返回失败数
+
+        指定 deadline（time.monotonic）时，超时后剩余操作不再写入，计入 dropped_ops。
+        """
+        db: Session = create_session()
+        # 事务由写入器逐条提交，避免 BatchCommitter 在其他线程接管该会话
+        db.info["managed_by_middleware"] = True
+        failed = 0
+        try:
+            for index, op in enumerate(batch):
+                if deadline is not None and time.monotonic() > deadline:
+                    dropped = len(batch) - index
+                    self.dropped_ops += dropped
+                    logger.warning("请求统计异步写入器停止超时，丢弃 {} 个操作", dropped)
+                    break
+                try:
+                    apply_stats_op(db, op, deferred=True)
+                    db.commit()
+                except Exception as exc:
+                    failed += 1
+                    db.rollback()
+                    logger.debug("请求统计写入失败: op={}, error={}", type(op).__name__, exc)
+            if failed:
+                logger.warning("请求统计异步写入部分失败: ops={}, failed={}", len(batch), failed)
+            return failed
+        finally:
+            db.close()
+
+
+_writer_instance: ExecutionStatsWriter | None = None
+
+
+def get_execution_stats_writer() -> ExecutionStatsWriter:
+    global _writer_instance
+    if _writer_instance is None:
+        _writer_instance = ExecutionStatsWriter()
+    return _writer_instance
+
+
+async def init_execution_stats_writer() -> ExecutionStatsWriter:
+    writer = get_execution_stats_writer()
+    await writer.start()
+    return writer
+
+
+async def shutdown_execution_stats_writer() -> None:
+    global _writer_instance
+    if _writer_instance is None:
+        return
+    await _writer_instance.stop()
+    _writer_instance = None
@@ -60,8 +60,8 @@ class AuditService:
         Note:
             不在此方法内提交事务，由调用方或中间件统一管理。
         """
-        audit_log = AuditLog(
-            event_type=event_type.value,
+        audit_log = AuditService._build_audit_log(
+            event_type=event_type,
             description=description,
             user_id=user_id,
             api_key_id=api_key_id,
@@ -70,33 +70,94 @@ class AuditService:
             request_id=request_id,
             status_code=status_code,
             error_message=error_message,
-            event_metadata=metadata,
+            metadata=metadata,
         )
 
         db.add(audit_log)
         # 使用 flush 使记录可见但不提交事务，事务由中间件统一管理
         db.flush()
 
-        # 同时记录到系统日志
-        # 检查 metadata 中是否有 quiet_logging 标志（由高频轮询端点设置）
-        quiet_logging = metadata.get("quiet_logging", False) if metadata else False
+        AuditService._emit_system_log(event_type, description, user_id, ip_address, metadata)
+        return audit_log
+
+    @staticmethod
+    def log_events_bulk(db: Session, events: list[dict[str, Any]]) -> list[AuditLog]:
+        """
+        批量记录审计事件（一次 flush）
+
+        Args:
+            db: 数据库会话
+            events: 每项为 log_event 的关键字参数（不含 db）
 
-        if not quiet_logging:
-            log_message = (
-                f"AUDIT [{event_type.value}] - {description} | "
-                f"user_id={user_id}, ip={ip_address}"
+        Note:
+            不在此方法内提交事务，由调用方统一管理。
+        """
+        audit_logs = [AuditService._build_audit_log(**event) for event in events]
+        db.add_all(audit_logs)
+        db.flush()
+
+        for event in events:
+            AuditService._emit_system_log(
+                event["event_type"],
+                event["description"],
+                event.get("user_id"),
+                event.get("ip_address"),
+                event.get("metadata"),
             )
+        return audit_logs
 
-            if event_type in [
-                AuditEventType.UNAUTHORIZED_ACCESS,
-                AuditEventType.SUSPICIOUS_ACTIVITY,
-            ]:
-                logger.warning(log_message)
-            elif event_type in [AuditEventType.LOGIN_FAILED, AuditEventType.REQUEST_FAILED]:
-                logger.info(log_message)
-            # request_success 已由 Pipeline 日志覆盖，不再重复输出到控制台
+    @staticmethod
+    def _build_audit_log(
+        event_type: AuditEventType,
+        description: str,
+        user_id: str | None = None,
+        api_key_id: str | None = None,
+        ip_address: str | None = None,
+        user_agent: str | None = None,
+        request_id: str | None = None,
+        status_code: int | None = None,
+        error_message: str | None = None,
+        metadata: dict[str, Any] | None = None,
+    ) -> AuditLog:
+        return AuditLog(
+            event_type=event_type.value,
+            description=description,
+            user_id=user_id,
+            api_key_id=api_key_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            request_id=request_id,
+            status_code=status_code,
+            error_message=error_message,
+            event_metadata=metadata,
+        )
 
-        return audit_log
+    @staticmethod
+    def _emit_system_log(
+        event_type: AuditEventType,
+        description: str,
+        user_id: str | None,
+        ip_address: str | None,
+        metadata: dict[str, Any] | None,
+    ) -> None:
+        """同时记录到系统日志"""
+        # 检查 metadata 中是否有 quiet_logging 标志（由高频轮询端点设置）
+        quiet_logging = metadata.get("quiet_logging", False) if metadata else False
+        if quiet_logging:
+            return
+
+        log_message = (
+            f"AUDIT [{event_type.value}] - {description} | user_id={user_id}, ip={ip_address}"
+        )
+
+        if event_type in [
+            AuditEventType.UNAUTHORIZED_ACCESS,
+            AuditEventType.SUSPICIOUS_ACTIVITY,
+        ]:
+            logger.warning(log_message)
+        elif event_type in [AuditEventType.LOGIN_FAILED, AuditEventType.REQUEST_FAILED]:
+            logger.info(log_message)
+        # request_success 已由 Pipeline 日志覆盖，不再重复输出到控制台
 
     @staticmethod
     def log_login_attempt(
@@ -0,0 +1,241 @@
+"""
+审计日志缓冲写入器。
+
+目标：
+- 请求路径只把成功类审计事件放入内存缓冲，不再每个请求同步 flush 一次数据库；
+  失败/安全类事件（如 UNAUTHORIZED_ACCESS）仍在请求事务内同步写入
+- 缓冲达到 max_batch_size 或距上次写入超过 flush_interval_seconds 时批量落库
+- 写入失败的事件重新入队，超过 AUDIT_MAX_ATTEMPTS 次后写入死信日志（完整事件 JSON）
+- 写入器未运行时（测试、脚本）回退为在请求会话上同步写入
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from threading import Lock
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from src.core.logger import logger
+from src.database.database import create_session
+from src.services.system.audit import AuditService
+
+AUDIT_BUFFER_MAX_SIZE = 500
+AUDIT_FLUSH_INTERVAL_SECONDS = 5.0
+# 单个事件最多尝试写入的批次数，超过后转入死信日志
+AUDIT_MAX_ATTEMPTS = 3
+
+
+class AuditLogWriter:
+    """审计日志缓冲写入器。"""
+
+    def __init__(
+        self,
+        flush_interval_seconds: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        max_batch_size: int = AUDIT_BUFFER_MAX_SIZE,
+    ) -> None:
+        self.flush_interval_seconds = max(float(flush_interval_seconds), 0.0)
+        self.max_batch_size = max(int(max_batch_size), 1)
+        # (事件, 已失败次数)
+        self._pending: list[tuple[dict[str, Any], int]] = []
+        # 正在线程池中写入的批次，停止时等待其完成
+        self._inflight: set[asyncio.Future[int]] = set()
+        self._pending_lock = Lock()
+        self._event: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+        self._running = True
+        logger.info(
+            "审计日志缓冲写入器已启动，flush_interval={}s, max_batch={}",
+            self.flush_interval_seconds,
+            self.max_batch_size,
+        )
+
+    async def stop(self) -> None:
+        if not self._running:
+            return
+
+        task = self._task
+        self._running = False
+        self._task = None
+        self._loop = None
+        self._event = None
+
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        # 取消可能发生在线程池写入期间：等待在途批次完成，再写入剩余缓冲
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        try:
+            await self.flush()
+        except Exception as exc:
+            logger.warning("审计日志缓冲写入器停止时 flush 失败: {}", exc)
+
+        logger.info("审计日志缓冲写入器已停止")
+
+    def enqueue(self, event: dict[str, Any]) -> bool:
+        """
+        放入审计事件（AuditService.log_event 的关键字参数，不含 db）。
+
+        返回:
+        - True: 已进入缓冲
+        - False: 写入器未运行（调用方应回退同步路径）
+        """
+        loop = self._loop
+        wake = self._event
+        if not self._running or loop is None or wake is None:
+            return False
+
+        with self._pending_lock:
+            self._pending.append((event, 0))
+            full = len(self._pending) >= self.max_batch_size
+
+        if full:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError as exc:
+                # 事件循环已关闭：事件留在缓冲中，由 stop() 时的最终 flush 处理
+                logger.warning("审计日志缓冲写入器唤醒失败: {}", exc)
+        return True
+
+    async def flush(self) -> int:
+        """立即写入当前缓冲的全部事件，返回写入的事件数"""
+        batch = self._drain_pending()
+        if batch:
+            future = asyncio.ensure_future(asyncio.to_thread(self._flush_batch_sync, batch))
+            self._inflight.add(future)
+            future.add_done_callback(self._inflight.discard)
+            # 调用方被取消时写入仍在线程中继续，stop() 会等待其完成
+            await asyncio.shield(future)
+        return len(batch)
+
+    async def _run(self) -> None:
+        assert self._event is not None
+        wake = self._event
+
+        # 被取消时直接退出，最终 flush 由 stop() 在等待在途批次后执行
+        while True:
+            try:
+                # 间隔为 0 时只按数量触发
+                await asyncio.wait_for(wake.wait(), timeout=self.flush_interval_seconds or None)
+            except TimeoutError:
+                pass
+            wake.clear()
+            try:
+                await self.flush()
+            except Exception as exc:
+                logger.warning("审计日志批量写入失败: {}", exc)
+
+    def _drain_pending(self) -> list[tuple[dict[str, Any], int]]:
+        with self._pending_lock:
+            batch = self._pending
+            self._pending = []
+            return batch
+
+    def _flush_batch_sync(self, batch: list[tuple[dict[str, Any], int]]) -> int:
+        """批量落库；整批失败时逐条重试，单条失败不影响其余事件，返回失败数
+
+        失败的事件在写入器运行时重新入队，否则（或超过重试次数）写入死信日志。
+        """
+        failed: list[tuple[dict[str, Any], int]] = []
+        try:
+            db: Session = create_session()
+        except Exception as exc:
+            logger.warning("审计日志写入器创建会话失败: events={}, error={}", len(batch), exc)
+            failed = list(batch)
+        else:
+            # 事务由写入器自行提交，避免 BatchCommitter 在其他线程接管该会话
+            db.info["managed_by_middleware"] = True
+            try:
+                failed = self._write_batch(db, batch)
+            finally:
+                db.close()
+
+        if failed:
+            logger.warning("审计日志写入部分失败: events={}, failed={}", len(batch), len(failed))
+            self._retry_or_dead_letter(failed)
+        return len(failed)
+
+    @staticmethod
+    def _write_batch(
+        db: Session, batch: list[tuple[dict[str, Any], int]]
+    ) -> list[tuple[dict[str, Any], int]]:
+        """在给定会话上写入一批事件，返回失败的事件（失败次数已加一）"""
+        try:
+            AuditService.log_events_bulk(db, [event for event, _ in batch])
+            db.commit()
+            return []
+        except Exception as exc:
+            db.rollback()
+            logger.debug("审计日志批量写入失败，改为逐条写入: events={}, error={}", len(batch), exc)
+
+        failed: list[tuple[dict[str, Any], int]] = []
+        for event, attempts in batch:
+            try:
+                AuditService.log_event(db=db, **event)
+                db.commit()
+            except Exception as exc:
+                failed.append((event, attempts + 1))
+                db.rollback()
+                logger.debug("审计日志写入失败: event={}, error={}", event.get("event_type"), exc)
+        return failed
+
+    def _retry_or_dead_letter(self, failed: list[tuple[dict[str, Any], int]]) -> None:
+        """写入器运行且未超过重试次数的事件放回缓冲头部，其余写入死信日志"""
+        retry: list[tuple[dict[str, Any], int]] = []
+        for event, attempts in failed:
+            if self._running and attempts < AUDIT_MAX_ATTEMPTS:
+                retry.append((event, attempts))
+                continue
+            # 死信日志：保留完整事件，便于从错误日志中补录
+            logger.error(
+                "[audit-dlq] 审计事件写入失败已丢弃: attempts={}, event={}",
+                attempts,
+                json.dumps(event, ensure_ascii=False, default=str),
+            )
+        if retry:
+            with self._pending_lock:
+                self._pending[:0] = retry
+
+
+_writer_instance: AuditLogWriter | None = None
+
+
+def get_audit_log_writer() -> AuditLogWriter:
+    global _writer_instance
+    if _writer_instance is None:
+        _writer_instance = AuditLogWriter()
+    return _writer_instance
+
+
+async def init_audit_log_writer() -> AuditLogWriter:
+    writer = get_audit_log_writer()
+    await writer.start()
+    return writer
+
+
+async def shutdown_audit_log_writer() -> None:
+    global _writer_instance
+    if _writer_instance is None:
+        return
+    await _writer_instance.stop()
+    _writer_instance = None
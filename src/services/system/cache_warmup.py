@@ -7,87 +7,235 @@
 - 管理员仪表盘统计数据
 - 管理员热力图数据
 - 每日统计数据
+- 上次运行期间记录的热点查询（见 warmup_profile）
 """
 
 import asyncio
 import time
-from dataclasses import dataclass, field
-from typing import Any
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, ClassVar
 
 from sqlalchemy.orm import Session
 
+from src.config import config
 from src.core.logger import logger
+from src.core.metrics import cache_warmup_duration_seconds, cache_warmup_failures_total
 from src.database import create_session
+from src.services.system.warmup_profile import get_warmup_profile_recorder, suppress_recording
 
+# 单个预热任务的超时时间（秒），避免卡住的查询永久阻塞预热流程
+WARMUP_TASK_TIMEOUT = 30.0
 
-@dataclass
+# 固定预热任务完成（无论成功与否）后置位，/readyz 据此判断实例是否可以接收流量
+WARMUP_READY = asyncio.Event()
+# 固定预热任务的完成进度，供就绪探针展示
+WARMUP_PROGRESS: dict[str, int] = {"done": 0, "total": 0}
+# 热点画像重放进度（就绪后在后台执行，不影响就绪状态）
+REPLAY_PROGRESS: dict[str, int] = {"done": 0, "total": 0}
+
+
+@dataclass(slots=True)
 class WarmupContext:
     """缓存预热专用的简化 Context"""
 
+    __api_context__: ClassVar[bool] = True
+
     db: Session
     user: Any  # User model
-    audit_metadata: dict[str, Any] = field(default_factory=dict)
+    # 预热调用通常不会写入审计字段，按需创建字典
+    audit_metadata: dict[str, Any] | None = None
 
     def add_audit_metadata(self, **kwargs: Any) -> None:
         """兼容 ApiRequestContext 接口"""
+        if self.audit_metadata is None:
+            self.audit_metadata = {}
         self.audit_metadata.update(kwargs)
 
 
 class CacheWarmupService:
     """缓存预热服务"""
 
+    # 首次解析到的管理员用户 ID，后续预热直接按主键查询
+    _admin_user_id: str | None = None
+    # 就绪后在后台执行的热点画像重放任务
+    _replay_task: asyncio.Task[int] | None = None
+
     @classmethod
-    async def warmup_all(cls, delay_seconds: float = 3.0) -> None:
+    async def warmup_all(cls, delay_seconds: float = 3.0, stagger_seconds: float = 0.5) -> None:
         """
         预热所有关键缓存
 
+        各预热任务依次执行，任务之间间隔 stagger_seconds，
+        避免启动时与正常流量争抢 CPU 和数据库连接。
+        固定任务结束后（包括失败或取消）置位 WARMUP_READY；
+        热点画像重放随后作为独立后台任务执行，不阻塞就绪。
+        预热产生的查询不计入热点画像。
+
         Args:
             delay_seconds: 启动后延迟执行的秒数，确保系统完全就绪
+            stagger_seconds: 相邻预热任务之间的间隔秒数
         """
+        with suppress_recording():
+            try:
+                await cls._run_warmup(delay_seconds, stagger_seconds)
+            finally:
+                WARMUP_READY.set()
+            cls._replay_task = asyncio.create_task(
+                cls._run_profile_replay(), name="cache-warmup-profile-replay"
+            )
+
+    @classmethod
+    async def _run_warmup(cls, delay_seconds: float, stagger_seconds: float) -> None:
         await asyncio.sleep(delay_seconds)
 
         logger.info("开始预热关键缓存...")
         start_time = time.time()
 
-        results = await asyncio.gather(
-            cls._warmup_admin_dashboard_stats(),
-            cls._warmup_admin_heatmap(),
-            cls._warmup_daily_stats(),
-            return_exceptions=True,
-        )
+        admin_user = cls._load_admin_user()
+
+        tasks: list[tuple[str, Callable[[], Awaitable[bool]]]] = [
+            ("dashboard_stats", lambda: cls._warmup_admin_dashboard_stats(admin_user)),
+            ("admin_heatmap", cls._warmup_admin_heatmap),
+            ("daily_stats", lambda: cls._warmup_daily_stats(admin_user)),
+        ]
+        WARMUP_PROGRESS.update(done=0, total=len(tasks))
+        results: list[bool | BaseException] = []
+        for index, (name, task) in enumerate(tasks):
+            if index > 0 and stagger_seconds > 0:
+                await asyncio.sleep(stagger_seconds)
+            task_start = time.perf_counter()
+            try:
+                result: bool | BaseException = await asyncio.wait_for(
+                    task(), timeout=WARMUP_TASK_TIMEOUT
+                )
+            except Exception as e:
+                result = e
+            cache_warmup_duration_seconds.labels(task=name).observe(
+                time.perf_counter() - task_start
+            )
+            # 预热任务内部吞掉异常并返回 False，这里统一按非 True 计为失败
+            if result is not True:
+                cache_warmup_failures_total.labels(task=name).inc()
+            results.append(result)
+            WARMUP_PROGRESS["done"] += 1
 
         success_count = sum(1 for r in results if r is True)
         error_count = sum(1 for r in results if isinstance(r, Exception))
         elapsed = time.time() - start_time
 
+        total = len(results)
         if error_count > 0:
             logger.warning(
-                f"缓存预热完成: {success_count}/3 成功, {error_count} 失败, 耗时 {elapsed:.2f}s"
+                f"缓存预热完成: {success_count}/{total} 成功, {error_count} 失败, 耗时 {elapsed:.2f}s"
             )
         else:
-            logger.info(f"缓存预热完成: {success_count}/3 成功, 耗时 {elapsed:.2f}s")
+            logger.info(f"缓存预热完成: {success_count}/{total} 成功, 耗时 {elapsed:.2f}s")
 
     @classmethod
-    async def _warmup_admin_dashboard_stats(cls) -> bool:
+    async def _run_profile_replay(cls) -> int:
+        """后台重放热点画像，记录整体耗时并返回成功条数"""
+        with suppress_recording():
+            start = time.perf_counter()
+            replayed = await cls._replay_profile()
+            cache_warmup_duration_seconds.labels(task="profile_replay").observe(
+                time.perf_counter() - start
+            )
+        if replayed:
+            logger.info(f"缓存预热: 已重放 {replayed} 个热点查询")
+        return replayed
+
+    @classmethod
+    async def _replay_profile(cls) -> int:
+        """重放上次运行记录的热点查询，返回成功条数"""
+        recorder = get_warmup_profile_recorder()
+        if not recorder.enabled:
+            return 0
+
+        targets: list[tuple[str | None, bool]] = []
+        for entry in recorder.load():
+            if entry.get("kind") != "heatmap":
+                continue
+            params = entry["params"]
+            user_id = params.get("user_id")
+            include_actual_cost = bool(params.get("include_actual_cost"))
+            # 全局热力图已由固定预热任务覆盖
+            if user_id is None and include_actual_cost:
+                continue
+            targets.append((user_id, include_actual_cost))
+
+        REPLAY_PROGRESS.update(done=0, total=len(targets))
+        replayed = 0
+        for user_id, include_actual_cost in targets:
+            try:
+                await asyncio.wait_for(
+                    cls._replay_heatmap(user_id, include_actual_cost),
+                    timeout=WARMUP_TASK_TIMEOUT,
+                )
+                replayed += 1
+            except Exception as e:
+                cache_warmup_failures_total.labels(task="profile_replay").inc()
+                logger.debug(f"缓存预热: 重放热点查询失败 user_id={user_id}: {e}")
+            REPLAY_PROGRESS["done"] += 1
+        return replayed
+
+    @classmethod
+    async def _replay_heatmap(cls, user_id: str | None, include_actual_cost: bool) -> None:
+        from src.services.usage.service import UsageService
+
+        with create_session() as db:
+            await UsageService.get_cached_heatmap(
+                db=db,
+                user_id=user_id,
+                include_actual_cost=include_actual_cost,
+            )
+
+    @classmethod
+    def _load_admin_user(cls) -> Any | None:
+        """查询一个管理员用户供各预热任务共用（已从会话中分离）"""
+        try:
+            with create_session() as db:
+                admin_user = cls._get_admin_user(db)
+                if admin_user is not None:
+                    db.expunge(admin_user)
+                return admin_user
+        except Exception as e:
+            logger.warning(f"缓存预热: 查询管理员用户失败: {e}")
+            return None
+
+    @classmethod
+    def _get_admin_user(cls, db: Session) -> Any | None:
+        """获取管理员用户：优先按缓存的主键查询，失效时回退到按角色查找"""
+        from src.models.database import User as DBUser
+        from src.models.database import UserRole
+
+        if cls._admin_user_id is not None:
+            admin_user = db.get(DBUser, cls._admin_user_id)
+            if admin_user is not None and admin_user.role == UserRole.ADMIN:
+                return admin_user
+            cls._admin_user_id = None
+
+        admin_user = db.query(DBUser).filter(DBUser.role == "admin").first()
+        if admin_user is not None:
+            cls._admin_user_id = admin_user.id
+        return admin_user
+
+    @classmethod
+    async def _warmup_admin_dashboard_stats(cls, admin_user: Any | None) -> bool:
         """预热管理员仪表盘统计缓存"""
-        db = None
         try:
             from src.api.dashboard.routes import (  # TODO(arch): 提取 dashboard 统计计算到 services 层
                 AdminDashboardStatsAdapter,
             )
-            from src.models.database import User as DBUser
-
-            db = create_session()
 
-            # 获取一个管理员用户用于构造 context
-            admin_user = db.query(DBUser).filter(DBUser.role == "admin").first()
             if not admin_user:
                 logger.info("缓存预热: 无管理员用户，跳过仪表盘统计预热")
                 return True
 
-            context = WarmupContext(db=db, user=admin_user)
-            adapter = AdminDashboardStatsAdapter()
-            await adapter.handle(context)
+            with create_session() as db:
+                context = WarmupContext(db=db, user=db.merge(admin_user, load=False))
+                adapter = AdminDashboardStatsAdapter()
+                await adapter.handle(context)
 
             logger.debug("缓存预热: 管理员仪表盘统计已预热")
             return True
@@ -95,25 +243,20 @@ class CacheWarmupService:
         except Exception as e:
             logger.warning(f"缓存预热失败 (仪表盘统计): {e}")
             return False
-        finally:
-            if db:
-                db.close()
 
     @classmethod
     async def _warmup_admin_heatmap(cls) -> bool:
         """预热管理员热力图缓存"""
-        db = None
         try:
             from src.services.usage.service import UsageService
 
-            db = create_session()
-
-            # 预热全局热力图（管理员视角）
-            await UsageService.get_cached_heatmap(
-                db=db,
-                user_id=None,
-                include_actual_cost=True,
-            )
+            with create_session() as db:
+                # 预热全局热力图（管理员视角）
+                await UsageService.get_cached_heatmap(
+                    db=db,
+                    user_id=None,
+                    include_actual_cost=True,
+                )
 
             logger.debug("缓存预热: 管理员热力图已预热")
             return True
@@ -121,33 +264,25 @@ class CacheWarmupService:
         except Exception as e:
             logger.warning(f"缓存预热失败 (热力图): {e}")
             return False
-        finally:
-            if db:
-                db.close()
 
     @classmethod
-    async def _warmup_daily_stats(cls) -> bool:
+    async def _warmup_daily_stats(cls, admin_user: Any | None) -> bool:
         """预热每日统计缓存"""
-        db = None
         try:
             from src.api.dashboard.routes import (  # TODO(arch): 提取 dashboard 统计计算到 services 层
                 DashboardDailyStatsAdapter,
             )
-            from src.models.database import User as DBUser
 
-            db = create_session()
-
-            # 获取一个管理员用户
-            admin_user = db.query(DBUser).filter(DBUser.role == "admin").first()
             if not admin_user:
                 logger.info("缓存预热: 无管理员用户，跳过每日统计预热")
                 return True
 
-            context = WarmupContext(db=db, user=admin_user)
+            with create_session() as db:
+                context = WarmupContext(db=db, user=db.merge(admin_user, load=False))
 
-            # 预热 7 天的每日统计
-            adapter = DashboardDailyStatsAdapter(days=7)
-            await adapter.handle(context)
+                # 预热 7 天的每日统计
+                adapter = DashboardDailyStatsAdapter(days=7)
+                await adapter.handle(context)
 
             logger.debug("缓存预热: 每日统计已预热")
             return True
@@ -155,11 +290,43 @@ class CacheWarmupService:
         except Exception as e:
             logger.warning(f"缓存预热失败 (每日统计): {e}")
             return False
-        finally:
-            if db:
-                db.close()
 
 
-async def start_cache_warmup() -> None:
-    """启动缓存预热（作为后台任务）"""
-    asyncio.create_task(CacheWarmupService.warmup_all())
+_profile_flush_task: asyncio.Task | None = None
+
+
+async def start_cache_warmup(stagger_seconds: float = 0.5) -> None:
+    """启动缓存预热（作为后台任务），并开始周期性保存热点画像"""
+    global _profile_flush_task
+
+    asyncio.create_task(CacheWarmupService.warmup_all(stagger_seconds=stagger_seconds))
+
+    recorder = get_warmup_profile_recorder()
+    if recorder.enabled and _profile_flush_task is None:
+        _profile_flush_task = asyncio.create_task(
+            recorder.run_flush_loop(config.cache_warmup_profile_flush_seconds)
+        )
+
+
+async def stop_cache_warmup() -> None:
+    """停止热点画像重放与保存任务，并在退出前落盘一次"""
+    global _profile_flush_task
+
+    replay_task = CacheWarmupService._replay_task
+    CacheWarmupService._replay_task = None
+    if replay_task is not None and not replay_task.done():
+        replay_task.cancel()
+        try:
+            await replay_task
+        except asyncio.CancelledError:
+            pass
+
+    if _profile_flush_task is not None:
+        _profile_flush_task.cancel()
+        try:
+            await _profile_flush_task
+        except asyncio.CancelledError:
+            pass
+        _profile_flush_task = None
+
+    await get_warmup_profile_recorder().flush()
@@ -7,7 +7,7 @@ from __future__ import annotations
 import json
 import time
 from enum import Enum
-from typing import Any
+from typing import Any, NamedTuple
 
 from sqlalchemy.orm import Session
 
@@ -26,6 +26,14 @@ class RequestRecordLevel(str, Enum):
     FULL = "full"  # 记录完整请求和响应（包含body，敏感信息会脱敏）
 
 
+class LogFlags(NamedTuple):
+    """一次读取得到的请求记录级别及派生开关"""
+
+    level: RequestRecordLevel
+    log_headers: bool
+    log_body: bool
+
+
 # 进程内缓存 TTL（秒）- 系统配置变化不频繁，使用较长的 TTL
 _CONFIG_CACHE_TTL = 60  # 1 分钟
 
@@ -36,9 +44,18 @@ _SCHEDULING_CONFIG_CACHE_TTL = 5  # 5 秒
 # 需要跨 Worker 快速同步的调度相关配置 key
 SCHEDULING_CONFIG_KEYS = frozenset({"scheduling_mode", "provider_priority_mode"})
 
-# 进程内缓存存储: {key: (value, expire_time)}
+# 敏感请求头小写集合的派生缓存 key（随 sensitive_headers 一起失效）
+_SENSITIVE_HEADERS_LOWER_KEY = "__sensitive_headers_lower__"
+
+# 进程内缓存最大条目数，超出时先清理过期项，再淘汰最早写入的项
+_CONFIG_CACHE_MAX_SIZE = 512
+
+# 进程内缓存存储: {key: (value, expire_time)}，过期时间基于 time.monotonic()
 _config_cache: dict[str, tuple[Any, float]] = {}
 
+# 上次整表预取配置的时间；每个 TTL 周期内最多整表加载一次
+_last_prefetch_at: float = float("-inf")
+
 
 def _get_cached_config(key: str) -> tuple[bool, Any]:
     """从进程内缓存获取配置值
@@ -48,7 +65,7 @@ def _get_cached_config(key: str) -> tuple[bool, Any]:
     """
     if key in _config_cache:
         value, expire_time = _config_cache[key]
-        if time.time() < expire_time:
+        if time.monotonic() < expire_time:
             return True, value
         # 缓存过期，安全删除（避免并发时 KeyError）
         _config_cache.pop(key, None)
@@ -61,7 +78,30 @@ def _set_cached_config(key: str, value: Any) -> None:
     调度相关配置使用更短的 TTL（5秒），确保多 Worker 部署时快速收敛。
     """
     ttl = _SCHEDULING_CONFIG_CACHE_TTL if key in SCHEDULING_CONFIG_KEYS else _CONFIG_CACHE_TTL
-    _config_cache[key] = (value, time.time() + ttl)
+    now = time.monotonic()
+    if key not in _config_cache and len(_config_cache) >= _CONFIG_CACHE_MAX_SIZE:
+        _evict_config_cache(now)
+    _config_cache[key] = (value, now + ttl)
+
+
+def _evict_config_cache(now: float) -> None:
+    """缓存已满时清理过期项；仍然满则淘汰最早写入的项，保证内存有界"""
+    # 先取快照再删除，避免并发写入时迭代报错
+    entries = list(_config_cache.items())
+    for key, (_, expire_time) in entries:
+        if expire_time <= now:
+            _config_cache.pop(key, None)
+    overflow = len(_config_cache) - _CONFIG_CACHE_MAX_SIZE + 1
+    for key in list(_config_cache)[: max(overflow, 0)]:
+        _config_cache.pop(key, None)
+
+
+def _mask_header_value(value: Any) -> str:
+    """保留前后各4个字符，中间用星号替换"""
+    text = str(value)
+    if len(text) > 8:
+        return text[:4] + "****" + text[-4:]
+    return "****"
 
 
 def invalidate_config_cache(key: str | None = None) -> None:
@@ -70,11 +110,14 @@ def invalidate_config_cache(key: str | None = None) -> None:
     Args:
         key: 配置键，如果为 None 则清除所有缓存
     """
-    global _config_cache
+    global _config_cache, _last_prefetch_at
     if key is None:
         _config_cache = {}
+        _last_prefetch_at = float("-inf")
         logger.debug("已清除所有系统配置缓存")
     else:
+        if key == "sensitive_headers":
+            _config_cache.pop(_SENSITIVE_HEADERS_LOWER_KEY, None)
         # 使用 pop 安全删除，避免并发时 KeyError
         if _config_cache.pop(key, None) is not None:
             logger.debug(f"已清除系统配置缓存: {key}")
@@ -272,13 +315,19 @@ class SystemConfigService:
         if hit:
             return cached_value
 
-        # 2. 查询数据库
+        # 2. 配置表很小，缓存周期内首次未命中时整表预取，后续读取其他键不再查询
+        if time.monotonic() - _last_prefetch_at >= _CONFIG_CACHE_TTL:
+            cls.prefetch_configs(db)
+            hit, cached_value = _get_cached_config(key)
+            return cached_value if hit else default
+
+        # 3. 查询数据库
         config = db.query(SystemConfig).filter(SystemConfig.key == key).first()
         if config:
             _set_cached_config(key, config.value)
             return config.value
 
-        # 3. 如果配置不存在，使用默认值
+        # 4. 如果配置不存在，使用默认值
         if key in cls.DEFAULT_CONFIGS:
             value = cls.DEFAULT_CONFIGS[key]["value"]
             _set_cached_config(key, value)
@@ -286,10 +335,30 @@ class SystemConfigService:
 
         return default
 
+    @classmethod
+    def prefetch_configs(cls, db: Session) -> int:
+        """一次查询加载全部配置写入进程内缓存，缺失的键使用默认值
+
+        Returns:
+            数据库中的配置条数
+        """
+        global _last_prefetch_at
+        rows = db.query(SystemConfig.key, SystemConfig.value).all()
+        values = {row.key: row.value for row in rows}
+        # 兼容旧键：仅存在 request_log_level 时映射到 request_record_level
+        if REQUEST_RECORD_LEVEL_KEY not in values and _LEGACY_REQUEST_LOG_LEVEL_KEY in values:
+            values[REQUEST_RECORD_LEVEL_KEY] = values[_LEGACY_REQUEST_LOG_LEVEL_KEY]
+        for key, default_config in cls.DEFAULT_CONFIGS.items():
+            values.setdefault(key, default_config["value"])
+        for key, value in values.items():
+            _set_cached_config(key, value)
+        _last_prefetch_at = time.monotonic()
+        return len(rows)
+
     @classmethod
     def get_configs(cls, db: Session, keys: list[str]) -> dict[str, Any]:
         """
-        批量获取系统配置值
+        批量获取系统配置值（带进程内缓存，未命中的键合并为一次查询）
 
         Args:
             db: 数据库会话
@@ -298,20 +367,35 @@ class SystemConfigService:
         Returns:
             配置键值字典
         """
-        result = {}
-
-        # 一次查询获取所有配置
-        configs = db.query(SystemConfig).filter(SystemConfig.key.in_(keys)).all()
-        config_map = {c.key: c.value for c in configs}
+        result: dict[str, Any] = {}
+        missing: list[str] = []
 
-        # 填充结果，不存在的使用默认值
         for key in keys:
-            if key in config_map:
-                result[key] = config_map[key]
-            elif key in cls.DEFAULT_CONFIGS:
-                result[key] = cls.DEFAULT_CONFIGS[key]["value"]
+            if key in {REQUEST_RECORD_LEVEL_KEY, _LEGACY_REQUEST_LOG_LEVEL_KEY}:
+                result[key] = cls.get_config(db, key)
+                continue
+            hit, cached_value = _get_cached_config(key)
+            if hit:
+                result[key] = cached_value
             else:
-                result[key] = None
+                missing.append(key)
+
+        if missing:
+            # 一次查询获取所有未命中缓存的配置
+            configs = db.query(SystemConfig).filter(SystemConfig.key.in_(missing)).all()
+            config_map = {c.key: c.value for c in configs}
+
+            # 填充结果，不存在的使用默认值
+            for key in missing:
+                if key in config_map:
+                    value = config_map[key]
+                elif key in cls.DEFAULT_CONFIGS:
+                    value = cls.DEFAULT_CONFIGS[key]["value"]
+                else:
+                    result[key] = None
+                    continue
+                _set_cached_config(key, value)
+                result[key] = value
 
         return result
 
@@ -470,8 +554,9 @@ class SystemConfigService:
     @classmethod
     def init_default_configs(cls, db: Session) -> None:
         """初始化默认配置"""
+        existing = {key for (key,) in db.query(SystemConfig.key).all()}
         for key, default_config in cls.DEFAULT_CONFIGS.items():
-            if not db.query(SystemConfig).filter(SystemConfig.key == key).first():
+            if key not in existing:
                 config = SystemConfig(
                     key=key,
                     value=default_config["value"],
@@ -522,17 +607,25 @@ class SystemConfigService:
         """Deprecated: use get_request_record_level."""
         return cls.get_request_record_level(db)
 
+    @classmethod
+    def get_log_flags(cls, db: Session) -> LogFlags:
+        """读取一次记录级别，同时得到是否记录请求头/请求体"""
+        level = cls.get_request_record_level(db)
+        return LogFlags(
+            level=level,
+            log_headers=level in (RequestRecordLevel.HEADERS, RequestRecordLevel.FULL),
+            log_body=level == RequestRecordLevel.FULL,
+        )
+
     @classmethod
     def should_log_headers(cls, db: Session) -> bool:
         """是否应该记录请求头"""
-        level = cls.get_request_record_level(db)
-        return level in [RequestRecordLevel.HEADERS, RequestRecordLevel.FULL]
+        return cls.get_log_flags(db).log_headers
 
     @classmethod
     def should_log_body(cls, db: Session) -> bool:
         """是否应该记录请求体和响应体"""
-        level = cls.get_request_record_level(db)
-        return level == RequestRecordLevel.FULL
+        return cls.get_log_flags(db).log_body
 
     @classmethod
     def should_mask_sensitive_data(cls, db: Session) -> bool:
@@ -545,6 +638,18 @@ class SystemConfigService:
         """获取敏感请求头列表"""
         return cls.get_config(db, "sensitive_headers", [])
 
+    @classmethod
+    def _get_sensitive_headers_lower(cls, db: Session) -> frozenset[str]:
+        """获取小写敏感请求头集合（缓存，避免每次脱敏都重建）"""
+        hit, cached_value = _get_cached_config(_SENSITIVE_HEADERS_LOWER_KEY)
+        if hit:
+            return cached_value
+        value = frozenset(
+            h.lower() for h in cls.get_sensitive_headers(db) if isinstance(h, str) and h
+        )
+        _set_cached_config(_SENSITIVE_HEADERS_LOWER_KEY, value)
+        return value
+
     @classmethod
     def is_format_conversion_enabled(cls, db: Session) -> bool:
         """检查全局格式转换是否启用"""
@@ -561,22 +666,13 @@ class SystemConfigService:
         if not cls.should_mask_sensitive_data(db):
             return headers
 
-        sensitive_headers = cls.get_sensitive_headers(db)
-        sensitive_lower = {h.lower() for h in sensitive_headers if isinstance(h, str) and h}
-        masked_headers = {}
-
-        for key, value in headers.items():
-            if key.lower() in sensitive_lower:
-                # 保留前后各4个字符，中间用星号替换
-                if len(str(value)) > 8:
-                    masked_value = str(value)[:4] + "****" + str(value)[-4:]
-                else:
-                    masked_value = "****"
-                masked_headers[key] = masked_value
-            else:
-                masked_headers[key] = value
-
-        return masked_headers
+        sensitive_lower = cls._get_sensitive_headers_lower(db)
+        if not sensitive_lower:
+            return dict(headers)
+        return {
+            key: _mask_header_value(value) if key.lower() in sensitive_lower else value
+            for key, value in headers.items()
+        }
 
     @classmethod
     def truncate_body(cls, db: Session, body: Any, is_request: bool = True) -> Any:
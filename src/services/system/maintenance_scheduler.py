@@ -16,22 +16,173 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import datetime, timedelta, timezone
+import os
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
 from typing import Any
-
-from sqlalchemy import delete
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import (
+    Delete,
+    LargeBinary,
+    Update,
+    and_,
+    bindparam,
+    case,
+    delete,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    text,
+    union_all,
+    update,
+)
 from sqlalchemy.orm import Session
 
 from src.core.logger import logger
 from src.database import create_session
-from src.models.database import ApiKey, AuditLog, Provider, Usage
+from src.models.database import (
+    ApiKey,
+    AuditLog,
+    Provider,
+    StatsDaily,
+    StatsDailyModel,
+    StatsDailyProvider,
+    StatsSummary,
+    Usage,
+)
+from src.models.database import User as DBUser
 from src.services.provider_ops.service import ProviderOpsService
 from src.services.system.config import SystemConfigService
-from src.services.system.scheduler import get_scheduler
+from src.services.system.scheduler import APP_TIMEZONE, get_scheduler
 from src.services.system.stats_aggregator import StatsAggregatorService
+from src.services.usage.service import UsageService
 from src.services.user.apikey import ApiKeyService
+from src.utils.async_utils import run_in_executor
 from src.utils.compression import compress_json
 
+# 按时间窗口分块清理：每次处理一个小时窗口，窗口内按 batch_size 分批；
+# 单批行数另有硬上限，避免配置过大的 batch_size 让单个事务锁住过多行
+CLEANUP_TIME_CHUNK = timedelta(hours=1)
+CLEANUP_TIME_CHUNK_MAX_ROWS = 50000
+
+# body 字段与对应压缩字段
+_BODY_COMPRESSION_COLUMNS = (
+    ("request_body", "request_body_compressed"),
+    ("response_body", "response_body_compressed"),
+    ("provider_request_body", "provider_request_body_compressed"),
+    ("client_response_body", "client_response_body_compressed"),
+)
+
+# 各清理阶段的待处理条件（与 idx_usage_*_cleanup 部分索引的谓词一致）
+_BODY_PENDING = or_(*(getattr(Usage, body).isnot(None) for body, _ in _BODY_COMPRESSION_COLUMNS))
+_BODY_COMPRESSED_PENDING = or_(
+    *(getattr(Usage, compressed).isnot(None) for _, compressed in _BODY_COMPRESSION_COLUMNS)
+)
+_HEADER_PENDING = or_(
+    Usage.request_headers.isnot(None),
+    Usage.response_headers.isnot(None),
+    Usage.provider_request_headers.isnot(None),
+)
+
+# 压缩 body 的批量参数化 UPDATE（executemany）：body 置为 SQL NULL，
+# 压缩字段为 None 时保留已有值，避免覆盖之前写入的压缩数据
+_usage_table = Usage.__table__
+_BODY_COMPRESS_UPDATE_STMT = (
+    update(_usage_table)
+    .where(_usage_table.c.id == bindparam("pk"))
+    .values(
+        {
+            **{body: null() for body, _ in _BODY_COMPRESSION_COLUMNS},
+            **{
+                compressed: func.coalesce(
+                    bindparam(f"p_{compressed}", type_=LargeBinary), _usage_table.c[compressed]
+                )
+                for _, compressed in _BODY_COMPRESSION_COLUMNS
+            },
+        }
+    )
+)
+
+# 应用时区（配额重置按本地日期计算周期）
+_APP_TZ = ZoneInfo(APP_TIMEZONE)
+
+# 批量清理循环每执行多少批输出一次进度汇总日志
+CLEANUP_PROGRESS_LOG_INTERVAL = 50
+
+# body 压缩使用的工作线程数
+_COMPRESS_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def _limit_batch(
+    db: Session, stmt: Any, model: Any, conditions: tuple[Any, ...], batch_size: int
+) -> Any:
+    """为 DELETE/UPDATE 附加自限行数条件（按方言选择写法），避免先 SELECT id 再 IN 更新
+
+    进度统计直接使用 result.rowcount（单条语句即可得到准确的影响行数），
+    不使用 RETURNING id，避免把整批主键传回应用端
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = stmt.where(*conditions).with_dialect_options(mysql_limit=batch_size)
+    else:
+        victims = select(model.id).where(*conditions).limit(batch_size)
+        if dialect == "postgresql":
+            # 跳过被其他事务锁定的行，避免清理任务与业务写入互相等待
+            victims = victims.with_for_update(skip_locked=True)
+        stmt = stmt.where(model.id.in_(victims.scalar_subquery()))
+    return stmt.execution_options(synchronize_session=False)
+
+
+def _build_batch_delete(db: Session, model: Any, *conditions: Any, batch_size: int) -> Delete:
+    """构造自限行数的单条 DELETE 语句"""
+    return _limit_batch(db, delete(model), model, conditions, batch_size)
+
+
+def _build_batch_update(
+    db: Session, model: Any, *conditions: Any, values: dict[str, Any], batch_size: int
+) -> Update:
+    """构造自限行数的单条 UPDATE 语句"""
+    return _limit_batch(db, update(model).values(**values), model, conditions, batch_size)
+
+
+def _compress_body_values(records: list[Any]) -> list[dict[str, Any]]:
+    """计算每条记录的批量更新参数（pk + 各压缩字段的新值，body 为空时为 None）"""
+    rows: list[dict[str, Any]] = []
+    for r in records:
+        params: dict[str, Any] = {"pk": r.id}
+        for body, compressed in _BODY_COMPRESSION_COLUMNS:
+            value = getattr(r, body)
+            params[f"p_{compressed}"] = compress_json(value) if value else None
+        rows.append(params)
+    return rows
+
+
+async def _compress_body_rows(records: list[Any]) -> list[dict[str, Any]]:
+    """将一批记录拆分到多个工作线程中并行压缩，保持原有顺序"""
+    if not records:
+        return []
+    chunk_size = -(-len(records) // _COMPRESS_WORKERS)
+    chunks = [records[i : i + chunk_size] for i in range(0, len(records), chunk_size)]
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_compress_body_values, chunk) for chunk in chunks)
+    )
+    return [row for chunk_rows in results for row in chunk_rows]
+
+
+def _cleanup_backoff(elapsed: float, cap: float) -> float:
+    """按上一批耗时自适应计算批次间隔：数据库空闲时几乎不等待，负载高时最多等待 cap 秒"""
+    return min(cap, elapsed * 0.5)
+
+
+def _floor_to_hour(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(minute=0, second=0, microsecond=0)
+
 
 class MaintenanceScheduler:
     """系统维护任务调度器"""
@@ -422,6 +573,8 @@ class MaintenanceScheduler:
         Args:
             backfill: 是否回填历史数据（启动时检查缺失的日期）
         """
+        # locked() 检查与下方 async with 获取锁之间没有 await，
+        # 在同一事件循环内是原子的：并发触发只会有一个进入，其余直接跳过而不是排队等待
         if self._stats_aggregation_lock.locked():
             logger.info("统计聚合任务正在运行，跳过本次触发")
             return
@@ -436,17 +589,12 @@ class MaintenanceScheduler:
 
                 logger.info("开始执行统计数据聚合...")
 
-                from src.models.database import StatsDaily
-                from src.models.database import User as DBUser
-
                 # 使用 UTC 日期，定时任务在 UTC 00:05 触发，聚合 UTC 昨天
                 now_utc = datetime.now(timezone.utc)
                 today_utc = now_utc.replace(hour=0, minute=0, second=0, microsecond=0)
 
                 if backfill:
                     # 启动时检查并回填缺失的日期
-                    from src.models.database import StatsSummary
-
                     summary = db.query(StatsSummary).first()
                     if not summary:
                         # 首次运行，回填所有历史数据
@@ -461,8 +609,6 @@ class MaintenanceScheduler:
                         return
 
                     # 非首次运行，检查最近是否有缺失的日期需要回填
-                    from src.models.database import StatsDailyModel, StatsDailyProvider
-
                     yesterday_utc_date = today_utc.date() - timedelta(days=1)
                     max_backfill_days: int = (
                         SystemConfigService.get_config(db, "max_stats_backfill_days", 30) or 30
@@ -474,40 +620,11 @@ class MaintenanceScheduler:
                         check_start_date, datetime.min.time(), tzinfo=timezone.utc
                     )
 
-                    # 获取 StatsDaily 和 StatsDailyModel 中已有数据的日期集合
-                    existing_daily_dates = set()
-                    existing_model_dates = set()
-                    existing_provider_dates = set()
-
-                    daily_stats = (
-                        db.query(StatsDaily.date).filter(StatsDaily.date >= check_start_dt).all()
-                    )
-                    for (stat_date,) in daily_stats:
-                        if stat_date.tzinfo is None:
-                            stat_date = stat_date.replace(tzinfo=timezone.utc)
-                        existing_daily_dates.add(stat_date.date())
-
-                    model_stats = (
-                        db.query(StatsDailyModel.date)
-                        .filter(StatsDailyModel.date >= check_start_dt)
-                        .distinct()
-                        .all()
-                    )
-                    for (stat_date,) in model_stats:
-                        if stat_date.tzinfo is None:
-                            stat_date = stat_date.replace(tzinfo=timezone.utc)
-                        existing_model_dates.add(stat_date.date())
-
-                    provider_stats = (
-                        db.query(StatsDailyProvider.date)
-                        .filter(StatsDailyProvider.date >= check_start_dt)
-                        .distinct()
-                        .all()
-                    )
-                    for (stat_date,) in provider_stats:
-                        if stat_date.tzinfo is None:
-                            stat_date = stat_date.replace(tzinfo=timezone.utc)
-                        existing_provider_dates.add(stat_date.date())
+                    # 一次 UNION ALL 查询获取三张日统计表中已有数据的日期集合
+                    existing_dates = self._get_existing_stats_dates(db, check_start_dt)
+                    existing_daily_dates = existing_dates["daily"]
+                    existing_model_dates = existing_dates["model"]
+                    existing_provider_dates = existing_dates["provider"]
 
                     # 找出需要回填的日期
                     all_dates = set()
@@ -536,8 +653,9 @@ class MaintenanceScheduler:
                             f"StatsDailyProvider 缺失 {len(missing_provider_dates)} 天)"
                         )
 
-                        users = db.query(DBUser.id).filter(DBUser.is_active.is_(True)).all()
-                        user_ids = [user_id for (user_id,) in users]
+                        user_ids = list(
+                            db.scalars(select(DBUser.id).where(DBUser.is_active.is_(True)))
+                        )
 
                         failed_dates = 0
                         for current_date in sorted_dates:
@@ -571,8 +689,7 @@ class MaintenanceScheduler:
 
                 # 定时任务：聚合昨天 (UTC) 的数据
                 yesterday_utc = today_utc - timedelta(days=1)
-                users = db.query(DBUser.id).filter(DBUser.is_active.is_(True)).all()
-                user_ids = [user_id for (user_id,) in users]
+                user_ids = list(db.scalars(select(DBUser.id).where(DBUser.is_active.is_(True))))
 
                 StatsAggregatorService.aggregate_daily_stats_bundle(
                     db, yesterday_utc, user_ids=user_ids
@@ -591,6 +708,28 @@ class MaintenanceScheduler:
             finally:
                 db.close()
 
+    @staticmethod
+    def _get_existing_stats_dates(db: Session, since: datetime) -> dict[str, set[date]]:
+        """查询 since 之后 StatsDaily / StatsDailyModel / StatsDailyProvider 已有数据的 UTC 日期"""
+        query = union_all(
+            select(literal("daily").label("source"), StatsDaily.date.label("date")).where(
+                StatsDaily.date >= since
+            ),
+            select(literal("model"), StatsDailyModel.date)
+            .where(StatsDailyModel.date >= since)
+            .distinct(),
+            select(literal("provider"), StatsDailyProvider.date)
+            .where(StatsDailyProvider.date >= since)
+            .distinct(),
+        )
+
+        existing: dict[str, set[date]] = {"daily": set(), "model": set(), "provider": set()}
+        for source, stat_date in db.execute(query):
+            if stat_date.tzinfo is None:
+                stat_date = stat_date.replace(tzinfo=timezone.utc)
+            existing[source].add(stat_date.date())
+        return existing
+
     async def _perform_hourly_stats_aggregation(self) -> None:
         """执行小时统计聚合任务"""
         db = create_session()
@@ -616,8 +755,6 @@ class MaintenanceScheduler:
         """执行 pending 状态清理"""
         db = create_session()
         try:
-            from src.services.usage.service import UsageService
-
             # 获取配置的超时时间（默认 10 分钟）
             timeout_minutes = SystemConfigService.get_config(
                 db, "pending_request_timeout_minutes", 10
@@ -641,51 +778,36 @@ class MaintenanceScheduler:
         """执行审计日志清理任务"""
         db = create_session()
         try:
+            cfg = SystemConfigService.get_configs(
+                db, ["enable_auto_cleanup", "audit_log_retention_days", "cleanup_batch_size"]
+            )
+
             # 检查是否启用自动清理
-            if not SystemConfigService.get_config(db, "enable_auto_cleanup", True):
+            if not cfg["enable_auto_cleanup"]:
                 logger.info("自动清理已禁用，跳过审计日志清理")
                 return
 
             # 获取审计日志保留天数（默认 30 天，最少 7 天）
             audit_retention_days = max(
-                SystemConfigService.get_config(db, "audit_log_retention_days", 30),
+                cfg["audit_log_retention_days"],
                 7,  # 最少保留 7 天，防止误配置删除所有审计日志
             )
-            batch_size = SystemConfigService.get_config(db, "cleanup_batch_size", 1000)
+            batch_size = cfg["cleanup_batch_size"]
 
             cutoff_time = datetime.now(timezone.utc) - timedelta(days=audit_retention_days)
 
             logger.info(f"开始清理 {audit_retention_days} 天前的审计日志...")
 
-            total_deleted = 0
-            while True:
-                # 先查询要删除的记录 ID（分批）
-                records_to_delete = (
-                    db.query(AuditLog.id)
-                    .filter(AuditLog.created_at < cutoff_time)
-                    .limit(batch_size)
-                    .all()
-                )
-
-                if not records_to_delete:
-                    break
-
-                record_ids = [r.id for r in records_to_delete]
-
-                # 执行删除
-                result = db.execute(
-                    delete(AuditLog)
-                    .where(AuditLog.id.in_(record_ids))
-                    .execution_options(synchronize_session=False)
-                )
-
-                rows_deleted = result.rowcount
-                db.commit()
-
-                total_deleted += rows_deleted
-                logger.debug(f"已删除 {rows_deleted} 条审计日志，累计 {total_deleted} 条")
-
-                await asyncio.sleep(0.1)
+            total_deleted = await self._run_time_chunked(
+                db,
+                AuditLog.created_at,
+                cutoff_time,
+                (),
+                batch_size,
+                lambda conditions, limit: _build_batch_delete(
+                    db, AuditLog, *conditions, batch_size=limit
+                ),
+            )
 
             if total_deleted > 0:
                 logger.info(f"审计日志清理完成，共删除 {total_deleted} 条记录")
@@ -858,11 +980,7 @@ class MaintenanceScheduler:
                     if last_dt.tzinfo is None:
                         last_dt = last_dt.replace(tzinfo=timezone.utc)
 
-                    from zoneinfo import ZoneInfo
-
-                    from src.services.system.scheduler import APP_TIMEZONE
-
-                    tz = ZoneInfo(APP_TIMEZONE)
+                    tz = _APP_TZ
                     now_local = datetime.now(tz)
                     last_local_date = last_dt.astimezone(tz).date()
                     days_since_reset = (now_local.date() - last_local_date).days
@@ -879,8 +997,6 @@ class MaintenanceScheduler:
             if not should_run:
                 return
 
-            from src.models.database import User as DBUser
-
             now_utc = datetime.now(timezone.utc)
             reset_count = (
                 db.query(DBUser)
@@ -962,11 +1078,7 @@ class MaintenanceScheduler:
                     if last_dt.tzinfo is None:
                         last_dt = last_dt.replace(tzinfo=timezone.utc)
 
-                    from zoneinfo import ZoneInfo
-
-                    from src.services.system.scheduler import APP_TIMEZONE
-
-                    tz = ZoneInfo(APP_TIMEZONE)
+                    tz = _APP_TZ
                     now_local = datetime.now(tz)
                     last_local_date = last_dt.astimezone(tz).date()
                     days_since_reset = (now_local.date() - last_local_date).days
@@ -1042,50 +1154,48 @@ class MaintenanceScheduler:
         """执行清理任务"""
         db = create_session()
         try:
+            # 一次读取清理相关配置（进程内缓存未命中的键合并为一次查询）
+            cfg = SystemConfigService.get_configs(
+                db,
+                [
+                    "enable_auto_cleanup",
+                    "detail_log_retention_days",
+                    "compressed_log_retention_days",
+                    "header_retention_days",
+                    "log_retention_days",
+                    "cleanup_batch_size",
+                    "auto_delete_expired_keys",
+                ],
+            )
+
             # 检查是否启用自动清理
-            if not SystemConfigService.get_config(db, "enable_auto_cleanup", True):
+            if not cfg["enable_auto_cleanup"]:
                 logger.info("自动清理已禁用，跳过清理任务")
                 return
 
             logger.info("开始执行使用记录分级清理...")
 
-            # 获取配置参数
-            detail_retention = SystemConfigService.get_config(db, "detail_log_retention_days", 7)
-            compressed_retention = SystemConfigService.get_config(
-                db, "compressed_log_retention_days", 90
-            )
-            header_retention = SystemConfigService.get_config(db, "header_retention_days", 90)
-            log_retention = SystemConfigService.get_config(db, "log_retention_days", 365)
-            batch_size = SystemConfigService.get_config(db, "cleanup_batch_size", 1000)
+            batch_size = cfg["cleanup_batch_size"]
+            auto_delete = cfg["auto_delete_expired_keys"]
 
             now = datetime.now(timezone.utc)
-
-            # 1. 压缩详细日志 (body 字段 -> 压缩字段)
-            detail_cutoff = now - timedelta(days=detail_retention)
-            body_compressed = await self._cleanup_body_fields(db, detail_cutoff, batch_size)
-
-            # 2. 清理压缩字段（90天后）
-            compressed_cutoff = now - timedelta(days=compressed_retention)
-            compressed_cleaned = await self._cleanup_compressed_fields(
-                db, compressed_cutoff, batch_size
+            detail_cutoff = now - timedelta(days=cfg["detail_log_retention_days"])
+            compressed_cutoff = now - timedelta(days=cfg["compressed_log_retention_days"])
+            header_cutoff = now - timedelta(days=cfg["header_retention_days"])
+            log_cutoff = now - timedelta(days=cfg["log_retention_days"])
+
+            # Usage 分级清理与过期 API Keys 清理操作不同的表，并发执行；
+            # Usage 内部各步骤作用于同一批行，保持顺序执行
+            (records_deleted, fields_cleaned, body_compressed), keys_cleaned = await asyncio.gather(
+                self._cleanup_usage_records(
+                    db, detail_cutoff, compressed_cutoff, header_cutoff, log_cutoff, batch_size
+                ),
+                asyncio.to_thread(self._cleanup_expired_keys, auto_delete),
             )
 
-            # 3. 清理请求头
-            header_cutoff = now - timedelta(days=header_retention)
-            header_cleaned = await self._cleanup_header_fields(db, header_cutoff, batch_size)
-
-            # 4. 删除过期记录
-            log_cutoff = now - timedelta(days=log_retention)
-            records_deleted = await self._delete_old_records(db, log_cutoff, batch_size)
-
-            # 5. 清理过期的API Keys
-            auto_delete = SystemConfigService.get_config(db, "auto_delete_expired_keys", False)
-            keys_cleaned = ApiKeyService.cleanup_expired_keys(db, auto_delete=auto_delete)
-
             logger.info(
                 f"清理完成: 压缩 {body_compressed} 条, "
-                f"清理压缩字段 {compressed_cleaned} 条, "
-                f"清理header {header_cleaned} 条, "
+                f"清理过期字段 {fields_cleaned} 条, "
                 f"删除记录 {records_deleted} 条, "
                 f"清理过期Keys {keys_cleaned} 条"
             )
@@ -1096,336 +1206,371 @@ class MaintenanceScheduler:
         finally:
             db.close()
 
+    async def _cleanup_usage_records(
+        self,
+        db: Session,
+        detail_cutoff: datetime,
+        compressed_cutoff: datetime,
+        header_cutoff: datetime,
+        log_cutoff: datetime,
+        batch_size: int,
+    ) -> tuple[int, int, int]:
+        """按顺序执行 Usage 分级清理，返回 (删除记录数, 清理过期字段数, 压缩数)"""
+        # 1. 删除过期记录（先删除，后续步骤不再处理这些行）
+        records_deleted = await self._delete_old_records(db, log_cutoff, batch_size)
+
+        # 2. 一次扫描清理过期的压缩字段和请求头
+        fields_cleaned = await self._cleanup_expired_fields(
+            db, compressed_cutoff, header_cutoff, batch_size
+        )
+
+        # 3. 压缩详细日志 (body 字段 -> 压缩字段)，仅剩未过期压缩保留期的记录
+        body_compressed = await self._cleanup_body_fields(db, detail_cutoff, batch_size)
+
+        return records_deleted, fields_cleaned, body_compressed
+
+    @staticmethod
+    def _cleanup_expired_keys(auto_delete: bool) -> int:
+        """在独立 session 中清理过期的 API Keys（同步方法，由工作线程执行）"""
+        with create_session() as key_db:
+            try:
+                return ApiKeyService.cleanup_expired_keys(key_db, auto_delete=auto_delete)
+            except Exception as e:
+                logger.exception(f"清理过期API Keys失败: {e}")
+                key_db.rollback()
+                return 0
+
+    @staticmethod
+    def _has_usage_to_clean(db: Session, cutoff_time: datetime, pending: Any) -> bool:
+        """用一次 LIMIT 1 探测是否存在待清理记录，无数据时跳过后续会话与批处理循环"""
+        try:
+            probe = select(literal(1)).where(Usage.created_at < cutoff_time, pending).limit(1)
+            return db.execute(probe).first() is not None
+        except Exception as e:
+            logger.warning(f"清理任务探测失败，按有待清理数据处理: {e}")
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            return True
+
     async def _cleanup_body_fields(
         self, db: Session, cutoff_time: datetime, batch_size: int
     ) -> int:
         """压缩 request_body 和 response_body 字段到压缩字段
 
-        逐条处理，确保每条记录都正确更新
+        分两阶段处理：
+        1. body 已有对应压缩字段的记录，直接在数据库中批量置空 body，无需读回 Python
+        2. 仍需压缩的记录逐条读取、压缩并更新，确保每条记录都正确更新
         """
-        from sqlalchemy import null, update
+        if not self._has_usage_to_clean(db, cutoff_time, _BODY_PENDING):
+            return 0
 
-        total_compressed = 0
-        no_progress_count = 0  # 连续无进展计数
-        processed_ids: set = set()  # 记录已处理的 ID，防止重复处理
+        body_columns = [getattr(Usage, body) for body, _ in _BODY_COMPRESSION_COLUMNS]
+        compressed_columns = [
+            getattr(Usage, compressed) for _, compressed in _BODY_COMPRESSION_COLUMNS
+        ]
 
-        while True:
-            batch_db = create_session()
-            try:
-                # 1. 查询需要压缩的记录
-                # 注意：排除已经是 NULL 或 JSON null 的记录
-                records = (
-                    batch_db.query(
-                        Usage.id,
-                        Usage.request_body,
-                        Usage.response_body,
-                        Usage.provider_request_body,
-                        Usage.client_response_body,
-                    )
-                    .filter(Usage.created_at < cutoff_time)
-                    .filter(
-                        (Usage.request_body.isnot(None))
-                        | (Usage.response_body.isnot(None))
-                        | (Usage.provider_request_body.isnot(None))
-                        | (Usage.client_response_body.isnot(None))
-                    )
-                    .limit(batch_size)
-                    .all()
+        total_compressed = 0
+        try:
+            with create_session() as bulk_db:
+                total_compressed = await self._run_time_chunked(
+                    bulk_db,
+                    Usage.created_at,
+                    cutoff_time,
+                    (
+                        _BODY_PENDING,
+                        *(
+                            body.is_(None) | compressed.isnot(None)
+                            for body, compressed in zip(body_columns, compressed_columns)
+                        ),
+                    ),
+                    batch_size,
+                    lambda conditions, limit: _build_batch_update(
+                        bulk_db,
+                        Usage,
+                        *conditions,
+                        values={body: null() for body, _ in _BODY_COMPRESSION_COLUMNS},
+                        batch_size=limit,
+                    ),
                 )
+        except Exception as e:
+            logger.exception(f"清理已压缩的 body 字段失败: {e}")
 
-                if not records:
-                    break
+        needs_compression = or_(
+            *(
+                body.isnot(None) & compressed.is_(None)
+                for body, compressed in zip(body_columns, compressed_columns)
+            )
+        )
+        no_progress_count = 0  # 连续无进展计数
+        batches = 0
+        processed_ids: set = set()  # 记录已处理的 ID，防止重复处理
 
-                # 过滤掉实际值为 None 的记录（JSON null 被解析为 Python None）
-                valid_records = [
-                    r
-                    for r in records
-                    if r.request_body is not None
-                    or r.response_body is not None
-                    or r.provider_request_body is not None
-                    or r.client_response_body is not None
-                ]
-
-                if not valid_records:
-                    # 所有记录都是 JSON null，需要清理它们
-                    logger.warning(
-                        f"检测到 {len(records)} 条记录的 body 字段为 JSON null，进行清理"
-                    )
-                    for r in records:
-                        batch_db.execute(
-                            update(Usage)
-                            .where(Usage.id == r.id)
-                            .values(
-                                request_body=null(),
-                                response_body=null(),
-                                provider_request_body=null(),
-                                client_response_body=null(),
-                            )
+        batch_db = create_session()
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    # 1. 查询需要压缩的记录
+                    # 注意：排除已经是 NULL 或 JSON null 的记录
+                    records = (
+                        batch_db.query(
+                            Usage.id,
+                            Usage.request_body,
+                            Usage.response_body,
+                            Usage.provider_request_body,
+                            Usage.client_response_body,
                         )
-                    batch_db.commit()
-                    continue
-
-                # 检测是否有重复的 ID（说明更新未生效）
-                current_ids = {r.id for r in valid_records}
-                repeated_ids = current_ids & processed_ids
-                if repeated_ids:
-                    logger.error(
-                        f"检测到重复处理的记录 ID: {list(repeated_ids)[:5]}...，"
-                        "说明数据库更新未生效，终止循环"
+                        .filter(Usage.created_at < cutoff_time)
+                        .filter(needs_compression)
+                        .limit(batch_size)
+                        .all()
                     )
-                    break
 
-                batch_success = 0
+                    if not records:
+                        break
 
-                # 2. 逐条更新（确保每条都正确处理）
-                for r in valid_records:
-                    try:
-                        # 使用 null() 确保设置的是 SQL NULL 而不是 JSON null
-                        result = batch_db.execute(
-                            update(Usage)
-                            .where(Usage.id == r.id)
-                            .values(
-                                request_body=null(),
-                                response_body=null(),
-                                provider_request_body=null(),
-                                client_response_body=null(),
-                                request_body_compressed=(
-                                    compress_json(r.request_body) if r.request_body else None
-                                ),
-                                response_body_compressed=(
-                                    compress_json(r.response_body) if r.response_body else None
-                                ),
-                                provider_request_body_compressed=(
-                                    compress_json(r.provider_request_body)
-                                    if r.provider_request_body
-                                    else None
-                                ),
-                                client_response_body_compressed=(
-                                    compress_json(r.client_response_body)
-                                    if r.client_response_body
-                                    else None
-                                ),
-                            )
+                    # 过滤掉实际值为 None 的记录（JSON null 被解析为 Python None）
+                    valid_records = [
+                        r
+                        for r in records
+                        if r.request_body is not None
+                        or r.response_body is not None
+                        or r.provider_request_body is not None
+                        or r.client_response_body is not None
+                    ]
+
+                    if not valid_records:
+                        # 所有记录都是 JSON null，需要清理它们
+                        logger.warning(
+                            f"检测到 {len(records)} 条记录的 body 字段为 JSON null，进行清理"
                         )
-                        if result.rowcount > 0:
-                            batch_success += 1
-                            processed_ids.add(r.id)
-                    except Exception as e:
-                        logger.warning(f"压缩记录 {r.id} 失败: {e}")
+                        for r in records:
+                            batch_db.execute(
+                                update(Usage)
+                                .where(Usage.id == r.id)
+                                .values(
+                                    request_body=null(),
+                                    response_body=null(),
+                                    provider_request_body=null(),
+                                    client_response_body=null(),
+                                )
+                            )
+                        batch_db.commit()
                         continue
 
-                batch_db.commit()
-
-                # 3. 检查是否有实际进展
-                if batch_success == 0:
-                    no_progress_count += 1
-                    if no_progress_count >= 3:
+                    # 检测是否有重复的 ID（说明更新未生效）
+                    current_ids = {r.id for r in valid_records}
+                    repeated_ids = current_ids & processed_ids
+                    if repeated_ids:
                         logger.error(
-                            f"压缩 body 字段连续 {no_progress_count} 批无进展，"
-                            "终止循环以避免死循环"
+                            f"检测到重复处理的记录 ID: {list(repeated_ids)[:5]}...，"
+                            "说明数据库更新未生效，终止循环"
                         )
                         break
-                else:
-                    no_progress_count = 0  # 重置计数
 
-                total_compressed += batch_success
-                logger.debug(
-                    f"已压缩 {batch_success} 条记录的 body 字段，累计 {total_compressed} 条"
-                )
+                    batch_success = 0
 
-                await asyncio.sleep(0.1)
+                    # 2. 在线程池中并行压缩（gzip 压缩期间释放 GIL，且不阻塞事件循环）
+                    params = await _compress_body_rows(valid_records)
 
-            except Exception as e:
-                logger.exception(f"压缩 body 字段失败: {e}")
-                try:
-                    batch_db.rollback()
-                except Exception:
-                    pass
-                break
-            finally:
-                batch_db.close()
-
-        return total_compressed
-
-    async def _cleanup_compressed_fields(
-        self, db: Session, cutoff_time: datetime, batch_size: int
-    ) -> int:
-        """清理压缩字段（90天后删除压缩的body）
-
-        每批使用短生命周期 session，避免 ORM 缓存问题
-        """
-        from sqlalchemy import null, update
-
-        total_cleaned = 0
+                    # 3. 一次 executemany 批量更新；失败时回退逐条更新，确保每条都正确处理
+                    try:
+                        batch_db.connection().execute(_BODY_COMPRESS_UPDATE_STMT, params)
+                        batch_success = len(params)
+                        processed_ids.update(p["pk"] for p in params)
+                    except Exception as e:
+                        logger.warning(f"批量压缩更新失败，回退逐条更新: {e}")
+                        batch_db.rollback()
+                        # 每行使用 SAVEPOINT：单行失败只回滚该行，不影响同批其他行，最后统一提交
+                        for p in params:
+                            try:
+                                with batch_db.begin_nested():
+                                    result = batch_db.connection().execute(
+                                        _BODY_COMPRESS_UPDATE_STMT, p
+                                    )
+                                if result.rowcount > 0:
+                                    batch_success += 1
+                                    processed_ids.add(p["pk"])
+                            except Exception as row_err:
+                                logger.warning("压缩记录 {} 失败: {}", p["pk"], row_err)
+                                continue
 
-        while True:
-            batch_db = create_session()
-            try:
-                # 查询需要清理压缩字段的记录
-                records_to_clean = (
-                    batch_db.query(Usage.id)
-                    .filter(Usage.created_at < cutoff_time)
-                    .filter(
-                        (Usage.request_body_compressed.isnot(None))
-                        | (Usage.response_body_compressed.isnot(None))
-                        | (Usage.provider_request_body_compressed.isnot(None))
-                        | (Usage.client_response_body_compressed.isnot(None))
-                    )
-                    .limit(batch_size)
-                    .all()
-                )
+                    batch_db.commit()
 
-                if not records_to_clean:
-                    break
+                    # 4. 检查是否有实际进展
+                    if batch_success == 0:
+                        no_progress_count += 1
+                        if no_progress_count >= 3:
+                            logger.error(
+                                f"压缩 body 字段连续 {no_progress_count} 批无进展，"
+                                "终止循环以避免死循环"
+                            )
+                            break
+                    else:
+                        no_progress_count = 0  # 重置计数
 
-                record_ids = [r.id for r in records_to_clean]
-
-                # 批量更新，使用 null() 确保设置 SQL NULL
-                result = batch_db.execute(
-                    update(Usage)
-                    .where(Usage.id.in_(record_ids))
-                    .values(
-                        request_body_compressed=null(),
-                        response_body_compressed=null(),
-                        provider_request_body_compressed=null(),
-                        client_response_body_compressed=null(),
-                    )
-                )
+                    total_compressed += batch_success
+                    batches += 1
+                    if batches % CLEANUP_PROGRESS_LOG_INTERVAL == 0:
+                        logger.info(
+                            "压缩 body 字段进行中: 已处理 {} 批，累计 {} 条",
+                            batches,
+                            total_compressed,
+                        )
 
-                rows_updated = result.rowcount
-                batch_db.commit()
+                    await asyncio.sleep(_cleanup_backoff(time.perf_counter() - started, 0.1))
 
-                if rows_updated == 0:
-                    logger.warning("清理压缩字段: rowcount=0，可能存在问题")
+                except Exception as e:
+                    logger.exception(f"压缩 body 字段失败: {e}")
+                    try:
+                        batch_db.rollback()
+                    except Exception:
+                        pass
                     break
+                finally:
+                    # 清空 identity map，下一批复用同一 session，省去每批创建和关闭 session
+                    batch_db.expunge_all()
+        finally:
+            batch_db.close()
 
-                total_cleaned += rows_updated
-                logger.debug(f"已清理 {rows_updated} 条记录的压缩字段，累计 {total_cleaned} 条")
-
-                await asyncio.sleep(0.1)
-
-            except Exception as e:
-                logger.exception(f"清理压缩字段失败: {e}")
-                try:
-                    batch_db.rollback()
-                except Exception:
-                    pass
-                break
-            finally:
-                batch_db.close()
-
-        return total_cleaned
+        return total_compressed
 
-    async def _cleanup_header_fields(
-        self, db: Session, cutoff_time: datetime, batch_size: int
+    async def _cleanup_expired_fields(
+        self,
+        db: Session,
+        compressed_cutoff: datetime,
+        header_cutoff: datetime,
+        batch_size: int,
     ) -> int:
-        """清理 request_headers, response_headers 和 provider_request_headers 字段
+        """一次扫描同时清理过期的压缩 body 与 header 字段
 
-        每批使用短生命周期 session，避免 ORM 缓存问题
+        每行按各自 created_at 与两个截止时间比较，用 CASE 在同一条 UPDATE 中
+        决定置空哪些列，每个时间窗口只走一遍 created_at 索引。
+        超过压缩保留期但尚未压缩的原始 body 一并置空，省去先压缩再删除的开销。
         """
-        from sqlalchemy import null, update
-
-        total_cleaned = 0
-
-        while True:
-            batch_db = create_session()
-            try:
-                # 先查询需要清理的记录ID（分批）
-                records_to_clean = (
-                    batch_db.query(Usage.id)
-                    .filter(Usage.created_at < cutoff_time)
-                    .filter(
-                        (Usage.request_headers.isnot(None))
-                        | (Usage.response_headers.isnot(None))
-                        | (Usage.provider_request_headers.isnot(None))
-                    )
-                    .limit(batch_size)
-                    .all()
-                )
-
-                if not records_to_clean:
-                    break
-
-                record_ids = [r.id for r in records_to_clean]
+        body_expired = Usage.created_at < compressed_cutoff
+        header_expired = Usage.created_at < header_cutoff
+        pending = or_(
+            and_(body_expired, or_(_BODY_PENDING, _BODY_COMPRESSED_PENDING)),
+            and_(header_expired, _HEADER_PENDING),
+        )
+        cutoff_time = max(compressed_cutoff, header_cutoff)
+        if not self._has_usage_to_clean(db, cutoff_time, pending):
+            return 0
+
+        # 使用 null() 确保设置 SQL NULL，未过期的列保持原值
+        values: dict[str, Any] = {}
+        for body, compressed in _BODY_COMPRESSION_COLUMNS:
+            for name in (body, compressed):
+                values[name] = case((body_expired, null()), else_=getattr(Usage, name))
+        for name in ("request_headers", "response_headers", "provider_request_headers"):
+            values[name] = case((header_expired, null()), else_=getattr(Usage, name))
 
-                # 批量更新，使用 null() 确保设置 SQL NULL
-                result = batch_db.execute(
-                    update(Usage)
-                    .where(Usage.id.in_(record_ids))
-                    .values(
-                        request_headers=null(),
-                        response_headers=null(),
-                        provider_request_headers=null(),
-                    )
+        try:
+            with create_session() as batch_db:
+                return await self._run_time_chunked(
+                    batch_db,
+                    Usage.created_at,
+                    cutoff_time,
+                    (pending,),
+                    batch_size,
+                    lambda conditions, limit: _build_batch_update(
+                        batch_db, Usage, *conditions, values=values, batch_size=limit
+                    ),
                 )
-
-                rows_updated = result.rowcount
-                batch_db.commit()
-
-                if rows_updated == 0:
-                    logger.warning("清理 header 字段: rowcount=0，可能存在问题")
-                    break
-
-                total_cleaned += rows_updated
-                logger.debug(f"已清理 {rows_updated} 条记录的 header 字段，累计 {total_cleaned} 条")
-
-                await asyncio.sleep(0.1)
-
-            except Exception as e:
-                logger.exception(f"清理 header 字段失败: {e}")
-                try:
-                    batch_db.rollback()
-                except Exception:
-                    pass
-                break
-            finally:
-                batch_db.close()
-
-        return total_cleaned
+        except Exception as e:
+            logger.exception(f"清理过期字段失败: {e}")
+            return 0
 
     async def _delete_old_records(self, db: Session, cutoff_time: datetime, batch_size: int) -> int:
         """删除过期的完整记录"""
-        total_deleted = 0
-
-        while True:
+        try:
+            return await self._run_time_chunked(
+                db,
+                Usage.created_at,
+                cutoff_time,
+                (),
+                batch_size,
+                lambda conditions, limit: _build_batch_delete(
+                    db, Usage, *conditions, batch_size=limit
+                ),
+            )
+        except Exception as e:
+            logger.exception(f"删除过期记录失败: {e}")
             try:
-                # 查询要删除的记录ID（分批）
-                records_to_delete = (
-                    db.query(Usage.id)
-                    .filter(Usage.created_at < cutoff_time)
-                    .limit(batch_size)
-                    .all()
-                )
-
-                if not records_to_delete:
-                    break
-
-                record_ids = [r.id for r in records_to_delete]
-
-                # 执行删除
-                result = db.execute(
-                    delete(Usage)
-                    .where(Usage.id.in_(record_ids))
-                    .execution_options(synchronize_session=False)
-                )
+                db.rollback()
+            except Exception:
+                pass
+            return 0
+
+    async def _run_time_chunked(
+        self,
+        db: Session,
+        created_at: Any,
+        cutoff_time: datetime,
+        conditions: tuple[Any, ...],
+        batch_size: int,
+        build_stmt: Callable[[tuple[Any, ...], int], Any],
+    ) -> int:
+        """按小时时间窗口执行自限行数的 DELETE/UPDATE，返回累计影响行数
+
+        每个窗口内按 batch_size 分批（不超过 CLEANUP_TIME_CHUNK_MAX_ROWS），
+        单个事务持有的行锁数量受配置约束，批间按耗时退避。
+        遇到空窗口时重新查询下一条待处理记录的时间，跳过无数据的时间段。
+        语句直接在 Connection 上执行，跳过 ORM 的批量 DELETE/UPDATE 处理；
+        被清理的日志类表没有注册 ORM 事件监听，也没有需要 ORM 处理的级联。
+        每批的执行与提交放到线程池中运行，避免数据库往返期间阻塞事件循环。
+        """
 
-                rows_deleted = result.rowcount
-                db.commit()
+        def next_window_start(after: datetime | None) -> datetime | None:
+            query = select(func.min(created_at)).where(*conditions, created_at < cutoff_time)
+            if after is not None:
+                query = query.where(created_at >= after)
+            earliest = db.execute(query).scalar()
+            return _floor_to_hour(earliest) if earliest is not None else None
+
+        def run_batch(window: tuple[Any, ...], limit: int) -> int:
+            connection = db.connection()
+            if connection.dialect.name == "postgresql":
+                # 清理可重复执行，崩溃丢失的最后几批会在下次运行时重做，提交无需等待 WAL 刷盘
+                connection.execute(text("SET LOCAL synchronous_commit = off"))
+            rows = connection.execute(build_stmt(window, limit)).rowcount
+            db.commit()
+            return rows
 
-                total_deleted += rows_deleted
-                logger.debug(f"已删除 {rows_deleted} 条过期记录，累计 {total_deleted} 条")
+        limit = max(1, min(batch_size, CLEANUP_TIME_CHUNK_MAX_ROWS))
+        total = 0
+        batches = 0
+        window_start = await run_in_executor(next_window_start, None)
+        while window_start is not None and window_start < cutoff_time:
+            window_end = min(window_start + CLEANUP_TIME_CHUNK, cutoff_time)
+            window = (*conditions, created_at >= window_start, created_at < window_end)
 
-                await asyncio.sleep(0.1)
+            window_rows = 0
+            while True:
+                started = time.perf_counter()
+                rows = await run_in_executor(run_batch, window, limit)
+                elapsed = time.perf_counter() - started
+                window_rows += rows
+                batches += 1
+                if batches % CLEANUP_PROGRESS_LOG_INTERVAL == 0:
+                    logger.info(
+                        "清理进行中: 已执行 {} 批，累计 {} 行", batches, total + window_rows
+                    )
+                if rows < limit:
+                    break
+                await asyncio.sleep(_cleanup_backoff(elapsed, 0.05))
 
-            except Exception as e:
-                logger.exception(f"删除过期记录失败: {e}")
-                try:
-                    db.rollback()
-                except Exception:
-                    pass
-                break
+            total += window_rows
+            if window_rows:
+                window_start = window_end
+            else:
+                window_start = await run_in_executor(next_window_start, window_end)
+            await asyncio.sleep(_cleanup_backoff(elapsed, 0.05))
 
-        return total_deleted
+        return total
 
 
 # 全局单例
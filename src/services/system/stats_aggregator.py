@@ -11,7 +11,7 @@ from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta, timezone
 from typing import Any
 
-from sqlalchemy import Float, and_, case, cast, func
+from sqlalchemy import Float, and_, case, cast, func, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
@@ -643,6 +643,73 @@ class StatsAggregatorService:
             db.commit()
         return stats
 
+    @staticmethod
+    def aggregate_users_daily_stats(
+        db: Session, user_ids: list[str], date: datetime, commit: bool = True
+    ) -> list[StatsUserDaily]:
+        """批量聚合多个用户指定 UTC 日期的统计数据
+
+        一次 GROUP BY user_id 查询完成聚合，已有记录也一次性读出，
+        避免按用户逐个查询；无使用记录的用户写入全 0 统计。
+        """
+        if not user_ids:
+            return []
+
+        day_start, day_end = _get_utc_day_range(date)
+        target_ids = set(user_ids)
+
+        error_cond = (Usage.status_code >= 400) | (Usage.error_message.isnot(None))
+        rows = (
+            db.query(
+                Usage.user_id,
+                func.count(Usage.id).label("total_requests"),
+                func.sum(case((error_cond, 1), else_=0)).label("error_requests"),
+                func.sum(Usage.input_tokens).label("input_tokens"),
+                func.sum(Usage.output_tokens).label("output_tokens"),
+                func.sum(Usage.cache_creation_input_tokens).label("cache_creation_tokens"),
+                func.sum(Usage.cache_read_input_tokens).label("cache_read_tokens"),
+                func.sum(Usage.total_cost_usd).label("total_cost"),
+            )
+            .filter(and_(Usage.created_at >= day_start, Usage.created_at < day_end))
+            .filter(Usage.user_id.isnot(None))
+            .group_by(Usage.user_id)
+            .all()
+        )
+        aggregated_by_user = {row.user_id: row for row in rows if row.user_id in target_ids}
+
+        existing_by_user = {
+            record.user_id: record
+            for record in db.query(StatsUserDaily).filter(StatsUserDaily.date == day_start).all()
+            if record.user_id in target_ids
+        }
+
+        results = []
+        for user_id in user_ids:
+            existing = existing_by_user.get(user_id)
+            stats = existing or StatsUserDaily(
+                id=str(uuid.uuid4()), user_id=user_id, date=day_start
+            )
+            row = aggregated_by_user.get(user_id)
+            total_requests = int(row.total_requests or 0) if row else 0
+            error_requests = int(row.error_requests or 0) if row else 0
+
+            stats.total_requests = total_requests
+            stats.success_requests = total_requests - error_requests
+            stats.error_requests = error_requests
+            stats.input_tokens = int(row.input_tokens or 0) if row else 0
+            stats.output_tokens = int(row.output_tokens or 0) if row else 0
+            stats.cache_creation_tokens = int(row.cache_creation_tokens or 0) if row else 0
+            stats.cache_read_tokens = int(row.cache_read_tokens or 0) if row else 0
+            stats.total_cost = float(row.total_cost or 0.0) if row else 0.0
+
+            if not existing:
+                db.add(stats)
+            results.append(stats)
+
+        if commit:
+            db.commit()
+        return results
+
     @staticmethod
     def aggregate_daily_stats_bundle(
         db: Session, date: datetime, user_ids: list[str] | None = None
@@ -655,8 +722,7 @@ class StatsAggregatorService:
         StatsAggregatorService.aggregate_daily_error_stats(db, date, commit=False)
 
         if user_ids:
-            for user_id in user_ids:
-                StatsAggregatorService.aggregate_user_daily_stats(db, user_id, date, commit=False)
+            StatsAggregatorService.aggregate_users_daily_stats(db, user_ids, date, commit=False)
 
         stats.is_complete = True
         stats.aggregated_at = datetime.now(timezone.utc)
@@ -1076,9 +1142,7 @@ class StatsAggregatorService:
         )
         start_date = max(earliest_utc, today_utc - timedelta(days=days))
 
-        user_ids = [
-            user_id for (user_id,) in db.query(DBUser.id).filter(DBUser.is_active.is_(True)).all()
-        ]
+        user_ids = list(db.scalars(select(DBUser.id).where(DBUser.is_active.is_(True))))
         count = 0
         current_date = start_date
         while current_date < today_utc:
@@ -0,0 +1,151 @@
+"""
+缓存预热画像
+
+在运行期间统计热点缓存查询的访问次数，定期将最热的条目持久化到磁盘；
+下次启动时由 CacheWarmupService 读取画像并重放这些查询，
+使预热覆盖真实流量而不仅仅是固定的几项缓存。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from src.config import config
+from src.core.logger import logger
+from src.utils.async_utils import run_in_executor
+
+# 计数器容量为 max_entries 的倍数，给新出现的热点留出积累计数的空间
+PROFILE_COUNTER_CAPACITY_FACTOR = 10
+
+# 预热/重放期间置位：这些查询不是真实流量，不计入画像
+_recording_suppressed: ContextVar[bool] = ContextVar("warmup_profile_suppressed", default=False)
+
+
+@contextmanager
+def suppress_recording() -> Iterator[None]:
+    """在当前上下文（及其中创建的任务）内暂停画像记录"""
+    token = _recording_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _recording_suppressed.reset(token)
+
+
+class WarmupProfileRecorder:
+    """热点缓存访问画像记录器"""
+
+    def __init__(self, path: str | None, max_entries: int = 100) -> None:
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self._hits: Counter[str] = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @staticmethod
+    def _entry_key(kind: str, params: dict[str, Any]) -> str:
+        return json.dumps({"kind": kind, "params": params}, sort_keys=True, default=str)
+
+    def record(self, kind: str, params: dict[str, Any]) -> None:
+        """记录一次可重放的缓存查询"""
+        if self.path is None or _recording_suppressed.get():
+            return
+        self._hits[self._entry_key(kind, params)] += 1
+
+    def top(self, n: int | None = None) -> list[dict[str, Any]]:
+        """返回访问次数最多的 n 个条目（按热度降序）"""
+        entries: list[dict[str, Any]] = []
+        for key, hits in self._hits.most_common(n or self.max_entries):
+            entry = json.loads(key)
+            entry["hits"] = hits
+            entries.append(entry)
+        return entries
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """取最热条目快照；计数器超出容量时先衰减再裁剪
+
+        只能在事件循环线程调用（record() 也在事件循环中修改计数器）。
+        """
+        entries = self.top()
+        self._decay()
+        return entries
+
+    def _decay(self) -> None:
+        """计数器超过容量时整体减半并丢弃归零的条目，仍超出时裁剪到容量
+
+        减半让长期占据前列的旧热点逐步让位于新热点，同时保证计数器有界。
+        """
+        capacity = self.max_entries * PROFILE_COUNTER_CAPACITY_FACTOR
+        if len(self._hits) <= capacity:
+            return
+        self._hits = Counter({key: hits // 2 for key, hits in self._hits.items() if hits > 1})
+        if len(self._hits) > capacity:
+            self._hits = Counter(dict(self._hits.most_common(capacity)))
+
+    def write(self, entries: list[dict[str, Any]]) -> None:
+        """将快照写入画像文件（原子替换，避免读到半截文件）；可在线程池中执行"""
+        if self.path is None or not entries:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+    def dump(self) -> None:
+        """同步取快照并落盘"""
+        self.write(self.snapshot())
+
+    def load(self) -> list[dict[str, Any]]:
+        """读取上次持久化的画像，文件不存在或损坏时返回空列表"""
+        if self.path is None or not self.path.exists():
+            return []
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning("读取缓存预热画像失败: {}, error={}", self.path, e)
+            return []
+        if not isinstance(data, list):
+            return []
+        return [
+            entry
+            for entry in data[: self.max_entries]
+            if isinstance(entry, dict) and isinstance(entry.get("params"), dict)
+        ]
+
+    async def run_flush_loop(self, interval_seconds: float) -> None:
+        """周期性落盘，直到任务被取消"""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await self.flush()
+
+    async def flush(self) -> None:
+        # 快照在事件循环中生成，线程池只负责文件写入，避免与 record() 并发修改计数器
+        entries = self.snapshot()
+        try:
+            await run_in_executor(self.write, entries)
+        except Exception as e:
+            logger.warning("保存缓存预热画像失败: {}, error={}", self.path, e)
+
+
+# 全局单例
+_warmup_profile_recorder: WarmupProfileRecorder | None = None
+
+
+def get_warmup_profile_recorder() -> WarmupProfileRecorder:
+    """获取全局缓存预热画像记录器单例"""
+    global _warmup_profile_recorder
+    if _warmup_profile_recorder is None:
+        _warmup_profile_recorder = WarmupProfileRecorder(
+            path=config.cache_warmup_profile_path or None,
+            max_entries=config.cache_warmup_profile_max_entries,
+        )
+    return _warmup_profile_recorder
@@ -107,8 +107,7 @@ def build_usage_params(
     is_free_tier = cost.is_free_tier
 
     # 根据配置决定是否记录请求详情
-    should_log_headers = SystemConfigService.should_log_headers(db)
-    should_log_body = SystemConfigService.should_log_body(db)
+    _, should_log_headers, should_log_body = SystemConfigService.get_log_flags(db)
 
     # 处理请求头（可能需要脱敏）
     processed_request_headers = None
@@ -4,6 +4,8 @@ Usage 事件定义与序列化工具（用于 Redis Streams）
 
 from __future__ import annotations
 
+import base64
+import gzip
 import json
 import time
 from dataclasses import dataclass
@@ -12,6 +14,12 @@ from typing import Any
 
 USAGE_EVENT_VERSION = 1
 
+# 启用压缩且 payload 超过该字节数时 gzip 压缩后以 base64 写入（Redis 客户端按文本解码，不能直接存字节）
+# 消费端始终支持解码 enc 字段；写入端压缩由 USAGE_QUEUE_COMPRESS_PAYLOAD 控制，
+# 需在所有消费者升级到支持 enc 的版本后再开启，避免滚动发布期间旧消费者解析失败
+PAYLOAD_COMPRESS_MIN_BYTES = 1024
+PAYLOAD_ENCODING_GZIP_B64 = "gzip+b64"
+
 
 class UsageEventType(str, Enum):
     STREAMING = "streaming"
@@ -45,21 +53,42 @@ class UsageEvent:
     timestamp_ms: int
     data: dict[str, Any]
 
-    def to_stream_fields(self) -> dict[str, str]:
+    def to_stream_fields(self, compress: bool = False) -> dict[str, str]:
         payload = {
             "v": USAGE_EVENT_VERSION,
             "type": self.event_type.value,
             "request_id": self.request_id,
             "timestamp_ms": self.timestamp_ms,
-            "data": sanitize_payload(self.data),
+            "data": self.data,
         }
-        return {"payload": json.dumps(payload, ensure_ascii=False)}
+        # 快速路径：data 通常已是 JSON 安全的结构，直接序列化，省去一次完整的递归遍历；
+        # 含不可序列化的值时再回退到 sanitize_payload
+        try:
+            raw = json.dumps(payload, ensure_ascii=False)
+        except (TypeError, ValueError):
+            payload["data"] = sanitize_payload(self.data)
+            raw = json.dumps(payload, ensure_ascii=False)
+        if not compress:
+            return {"payload": raw}
+        encoded = raw.encode("utf-8")
+        if len(encoded) > PAYLOAD_COMPRESS_MIN_BYTES:
+            compressed = base64.b64encode(gzip.compress(encoded, compresslevel=3)).decode("ascii")
+            if len(compressed) < len(encoded):
+                return {"payload": compressed, "enc": PAYLOAD_ENCODING_GZIP_B64}
+        return {"payload": raw}
 
     @classmethod
     def from_stream_fields(cls, fields: dict[str, Any]) -> UsageEvent:
         raw = fields.get("payload")
         if not raw:
             raise ValueError("Missing payload field in usage event")
+        enc = fields.get("enc")
+        if isinstance(enc, bytes):
+            enc = enc.decode("ascii", errors="ignore")
+        if enc == PAYLOAD_ENCODING_GZIP_B64:
+            raw = gzip.decompress(base64.b64decode(raw))
+        elif enc:
+            raise ValueError(f"Unsupported usage event payload encoding: {enc}")
         if isinstance(raw, bytes):
             raw = raw.decode("utf-8", errors="ignore")
         payload = json.loads(raw)
@@ -43,8 +43,7 @@ class UsageLifecycleMixin:
             return existing
 
         # 根据配置决定是否记录请求详情
-        should_log_headers = SystemConfigService.should_log_headers(db)
-        should_log_body = SystemConfigService.should_log_body(db)
+        _, should_log_headers, should_log_body = SystemConfigService.get_log_flags(db)
 
         # 处理请求头
         processed_request_headers = None
@@ -264,8 +263,7 @@ class UsageLifecycleMixin:
         now = datetime.now(timezone.utc)
 
         # 处理响应头和响应体
-        should_log_headers = SystemConfigService.should_log_headers(db)
-        should_log_body = SystemConfigService.should_log_body(db)
+        _, should_log_headers, should_log_body = SystemConfigService.get_log_flags(db)
 
         processed_provider_headers = None
         if should_log_headers and provider_request_headers is not None:
@@ -527,8 +525,7 @@ class UsageLifecycleMixin:
         if status_code is not None:
             usage.status_code = status_code
 
-        should_log_headers = SystemConfigService.should_log_headers(db)
-        should_log_body = SystemConfigService.should_log_body(db)
+        _, should_log_headers, should_log_body = SystemConfigService.get_log_flags(db)
 
         if should_log_headers:
             if isinstance(request_headers, dict):
@@ -79,6 +79,11 @@ class UsageQueryMixin:
 
         from src.clients.redis_client import get_redis_client
         from src.config.constants import CacheTTL
+        from src.services.system.warmup_profile import get_warmup_profile_recorder
+
+        get_warmup_profile_recorder().record(
+            "heatmap", {"user_id": user_id, "include_actual_cost": include_actual_cost}
+        )
 
         cache_key = cls._get_heatmap_cache_key(user_id, include_actual_cost)
 
@@ -4,8 +4,10 @@ Telemetry writer abstraction for stream usage.
 
 from __future__ import annotations
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from typing import Any
 
 from src.clients.redis_client import get_redis_client
@@ -15,6 +17,113 @@ from src.services.usage.events import UsageEventType, build_usage_event
 from src.services.usage.telemetry import MessageTelemetry
 
 
+def _is_not_none(value: Any) -> bool:
+    return value is not None
+
+
+# QueueTelemetryWriter 可选字段规格: (kwarg 名, 事件字段名, 默认值, 是否写入的判断)
+_EVENT_FIELD_SPECS: tuple[tuple[str, str, Any, Callable[[Any], bool]], ...] = (
+    ("provider", "provider", None, bool),
+    ("model", "model", None, bool),
+    ("target_model", "target_model", None, bool),
+    # Token 计数
+    ("input_tokens", "input_tokens", 0, bool),
+    ("output_tokens", "output_tokens", 0, bool),
+    # 缓存 token（cache_creation_tokens -> cache_creation_input_tokens 映射）及 5m/1h 细分
+    ("cache_creation_tokens", "cache_creation_input_tokens", 0, bool),
+    ("cache_read_tokens", "cache_read_input_tokens", 0, bool),
+    ("cache_creation_tokens_5m", "cache_creation_input_tokens_5m", 0, bool),
+    ("cache_creation_tokens_1h", "cache_creation_input_tokens_1h", 0, bool),
+    # 时间指标
+    ("response_time_ms", "response_time_ms", None, _is_not_none),
+    ("first_byte_time_ms", "first_byte_time_ms", None, _is_not_none),
+    # 状态信息
+    ("status_code", "status_code", 200, lambda v: v != 200),
+    ("error_message", "error_message", None, bool),
+    # 格式信息
+    ("request_type", "request_type", "chat", lambda v: v != "chat"),
+    ("api_format", "api_format", None, bool),
+    ("api_family", "api_family", None, bool),
+    ("endpoint_kind", "endpoint_kind", None, bool),
+    ("endpoint_api_format", "endpoint_api_format", None, bool),
+    # Provider 追踪
+    ("provider_id", "provider_id", None, bool),
+    ("provider_endpoint_id", "provider_endpoint_id", None, bool),
+    ("provider_api_key_id", "provider_api_key_id", None, bool),
+    # 元数据
+    ("metadata", "metadata", None, bool),
+)
+
+
+class _UsageStreamBatcher:
+    """合并并发请求的 XADD，通过 pipeline 一次往返写入 Redis
+
+    写入进行中到达的消息在下一轮合并为一个 pipeline；调用方仍逐个等待自己那条消息的
+    写入结果，失败时照常抛出异常，以便上层回退到数据库写入。只有一条待写入时直接 XADD。
+    """
+
+    MAX_BATCH = 64
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    async def xadd(
+        self,
+        redis_client: Any,
+        stream_key: str,
+        fields: dict[str, str],
+        xadd_kwargs: dict[str, Any],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(self._queue))
+        future: asyncio.Future = loop.create_future()
+        self._queue.put_nowait((redis_client, stream_key, fields, xadd_kwargs, future))
+        await future
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        # 队列清空即退出，下一次 xadd 时按需重新启动，避免常驻后台任务
+        while not queue.empty():
+            batch = [queue.get_nowait()]
+            while len(batch) < self.MAX_BATCH and not queue.empty():
+                batch.append(queue.get_nowait())
+            by_client: dict[int, list[tuple]] = {}
+            for entry in batch:
+                by_client.setdefault(id(entry[0]), []).append(entry)
+            for entries in by_client.values():
+                await self._flush(entries)
+
+    @staticmethod
+    async def _flush(entries: list[tuple]) -> None:
+        redis_client = entries[0][0]
+        try:
+            if len(entries) == 1:
+                _, stream_key, fields, xadd_kwargs, _ = entries[0]
+                results: list[Any] = [await redis_client.xadd(stream_key, fields, **xadd_kwargs)]
+            else:
+                pipe = redis_client.pipeline(transaction=False)
+                for _, stream_key, fields, xadd_kwargs, _ in entries:
+                    pipe.xadd(stream_key, fields, **xadd_kwargs)
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as exc:
+            results = [exc] * len(entries)
+
+        for (*_, future), result in zip(entries, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+_xadd_batcher = _UsageStreamBatcher()
+
+
 class TelemetryWriter(ABC):
     @abstractmethod
     async def record_success(self, **kwargs: Any) -> None:
@@ -41,13 +150,19 @@ class DbTelemetryWriter(TelemetryWriter):
         self._telemetry = telemetry
 
     def _filter_kwargs(self, kwargs: dict[str, Any]) -> dict[str, Any]:
-        """过滤掉 MessageTelemetry 不支持的参数"""
-        out = {k: v for k, v in kwargs.items() if k not in self._IGNORED_KWARGS}
+        """过滤掉 MessageTelemetry 不支持的参数
+
+        原地修改传入的 dict（调用方均为 **kwargs 解包得到的新 dict），
+        常见情况下不含需过滤的参数，无需重建字典。
+        """
+        if not self._IGNORED_KWARGS.isdisjoint(kwargs):
+            for key in self._IGNORED_KWARGS.intersection(kwargs):
+                del kwargs[key]
         # 兼容 stream 侧传入的 metadata 字段：映射到 MessageTelemetry 的 request_metadata
-        if "metadata" in out and "request_metadata" not in out:
-            out["request_metadata"] = out.get("metadata")
-        out.pop("metadata", None)
-        return out
+        if "metadata" in kwargs:
+            metadata = kwargs.pop("metadata")
+            kwargs.setdefault("request_metadata", metadata)
+        return kwargs
 
     async def record_success(self, **kwargs: Any) -> None:
         await self._telemetry.record_success(**self._filter_kwargs(kwargs))
@@ -82,8 +197,18 @@ class QueueTelemetryWriter(TelemetryWriter):
             "cookie",
             "set-cookie",
         ]
+        # 小写集合只构建一次，脱敏时不再逐次重建
+        self._sensitive_lower = frozenset(
+            h.lower() for h in self._sensitive_headers if isinstance(h, str) and h
+        )
         self._max_request_body_size = int(max_request_body_size or 0)
         self._max_response_body_size = int(max_response_body_size or 0)
+        # 构造时绑定 stream 配置，发布事件时不再逐次读取与分支
+        self._stream_key = config.usage_queue_stream_key
+        maxlen = config.usage_queue_stream_maxlen
+        self._xadd_kwargs: dict[str, Any] = (
+            {"maxlen": maxlen, "approximate": True} if maxlen > 0 else {}
+        )
 
     @property
     def include_headers(self) -> bool:
@@ -113,17 +238,13 @@ class QueueTelemetryWriter(TelemetryWriter):
             request_id=self.request_id,
             data=data,
         )
-        maxlen = config.usage_queue_stream_maxlen
         try:
-            if maxlen > 0:
-                await redis_client.xadd(
-                    config.usage_queue_stream_key,
-                    event.to_stream_fields(),
-                    maxlen=maxlen,
-                    approximate=True,
-                )
-            else:
-                await redis_client.xadd(config.usage_queue_stream_key, event.to_stream_fields())
+            await _xadd_batcher.xadd(
+                redis_client,
+                self._stream_key,
+                event.to_stream_fields(compress=config.usage_queue_compress_payload),
+                self._xadd_kwargs,
+            )
         except Exception as exc:
             logger.error(f"[usage-queue] XADD failed: {exc}")
             raise
@@ -132,7 +253,7 @@ class QueueTelemetryWriter(TelemetryWriter):
         """Mask sensitive headers before putting them into Redis."""
         if not isinstance(headers, dict) or not headers:
             return headers
-        sensitive = {h.lower() for h in self._sensitive_headers if isinstance(h, str) and h}
+        sensitive = self._sensitive_lower
         if not sensitive:
             return headers
         out: dict[str, Any] = {}
@@ -183,81 +304,19 @@ class QueueTelemetryWriter(TelemetryWriter):
 
         # 可选字段 - 只添加非 None/非默认值，减少 payload 大小
         # 注意：消费者端需要处理缺失字段的默认值
-        if kwargs.get("provider"):
-            data["provider"] = kwargs["provider"]
-        if kwargs.get("model"):
-            data["model"] = kwargs["model"]
-        if kwargs.get("target_model"):
-            data["target_model"] = kwargs["target_model"]
-
-        # Token 计数 - 0 是常见值，但仍需传递
-        input_tokens = kwargs.get("input_tokens", 0)
-        output_tokens = kwargs.get("output_tokens", 0)
-        if input_tokens:
-            data["input_tokens"] = input_tokens
-        if output_tokens:
-            data["output_tokens"] = output_tokens
-
-        # 缓存 token（cache_creation_tokens -> cache_creation_input_tokens 映射）
-        cache_creation = kwargs.get("cache_creation_tokens", 0)
-        cache_read = kwargs.get("cache_read_tokens", 0)
-        if cache_creation:
-            data["cache_creation_input_tokens"] = cache_creation
-        if cache_read:
-            data["cache_read_input_tokens"] = cache_read
-
-        # 缓存 5m/1h 细分
-        cache_creation_5m = kwargs.get("cache_creation_tokens_5m", 0)
-        cache_creation_1h = kwargs.get("cache_creation_tokens_1h", 0)
-        if cache_creation_5m:
-            data["cache_creation_input_tokens_5m"] = cache_creation_5m
-        if cache_creation_1h:
-            data["cache_creation_input_tokens_1h"] = cache_creation_1h
-
-        # 时间指标
-        if kwargs.get("response_time_ms") is not None:
-            data["response_time_ms"] = kwargs["response_time_ms"]
-        if kwargs.get("first_byte_time_ms") is not None:
-            data["first_byte_time_ms"] = kwargs["first_byte_time_ms"]
-
-        # 状态信息
-        status_code = kwargs.get("status_code", 200)
-        if status_code != 200:
-            data["status_code"] = status_code
-        if kwargs.get("error_message"):
-            data["error_message"] = kwargs["error_message"]
-
-        # 格式信息
-        request_type = kwargs.get("request_type", "chat")
-        if request_type != "chat":
-            data["request_type"] = request_type
-        if kwargs.get("api_format"):
-            data["api_format"] = kwargs["api_format"]
-        if kwargs.get("api_family"):
-            data["api_family"] = kwargs["api_family"]
-        if kwargs.get("endpoint_kind"):
-            data["endpoint_kind"] = kwargs["endpoint_kind"]
-        if kwargs.get("endpoint_api_format"):
-            data["endpoint_api_format"] = kwargs["endpoint_api_format"]
-        if kwargs.get("has_format_conversion"):
+        get = kwargs.get
+        for src, dst, default, keep in _EVENT_FIELD_SPECS:
+            value = get(src, default)
+            if keep(value):
+                data[dst] = value
+
+        if get("has_format_conversion"):
             data["has_format_conversion"] = True
 
         # 流式标记 - 默认 True，只记录 False
-        if not kwargs.get("is_stream", True):
+        if not get("is_stream", True):
             data["is_stream"] = False
 
-        # Provider 追踪
-        if kwargs.get("provider_id"):
-            data["provider_id"] = kwargs["provider_id"]
-        if kwargs.get("provider_endpoint_id"):
-            data["provider_endpoint_id"] = kwargs["provider_endpoint_id"]
-        if kwargs.get("provider_api_key_id"):
-            data["provider_api_key_id"] = kwargs["provider_api_key_id"]
-
-        # 元数据
-        if kwargs.get("metadata"):
-            data["metadata"] = kwargs["metadata"]
-
         # Optional: Headers (masked)
         if self.include_headers:
             for _hdr_key in (
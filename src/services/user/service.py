@@ -8,7 +8,7 @@ import asyncio
 from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import and_, func
+from sqlalchemy import and_, bindparam, func, select
 from sqlalchemy.orm import Session
 
 from src.core.logger import logger
@@ -17,6 +17,9 @@ from src.models.database import ApiKey, GlobalModel, Model, Provider, Usage, Use
 from src.services.cache.user_cache import UserCacheService
 from src.utils.transaction_manager import retry_on_database_error, transactional
 
+# 按主键查询用户的预构建语句，进程内只编译一次（认证依赖每个请求都会调用）
+_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
 
 class UserService:
     """用户管理服务"""
@@ -141,8 +144,7 @@ class UserService:
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                user = db.query(User).filter(User.id == user_id).first()
-                return user
+                return db.execute(_USER_BY_ID, {"user_id": user_id}).scalar_one_or_none()
             except Exception as e:
                 if attempt < max_retries - 1:
                     # 添加随机延迟避免并发冲突
@@ -5,23 +5,42 @@
 """
 
 import asyncio
+import atexit
 from collections.abc import Callable, Coroutine
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial, wraps
 from typing import Any, TypeVar
 
+from src.config.settings import config
+
 T = TypeVar("T")
 
+# 专用 I/O 线程池（按需创建），不与事件循环默认 executor 的其他使用方争用线程
+_io_executor: ThreadPoolExecutor | None = None
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=config.io_thread_pool_size, thread_name_prefix="aether-io"
+        )
+        atexit.register(_io_executor.shutdown, wait=False)
+    return _io_executor
+
 
 async def run_in_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
     """
-    在线程池中运行同步函数，避免阻塞事件循环。
+    在专用 I/O 线程池中运行同步函数，避免阻塞事件循环。
 
     用法:
         result = await run_in_executor(some_sync_function, arg1, arg2)
     """
     loop = asyncio.get_running_loop()
-    bound = partial(func, *args, **kwargs)
-    return await loop.run_in_executor(None, bound)
+    if not kwargs:
+        # 无关键字参数时直接传位置参数，省去 partial 对象
+        return await loop.run_in_executor(_get_io_executor(), func, *args)
+    return await loop.run_in_executor(_get_io_executor(), partial(func, *args, **kwargs))
 
 
 def async_wrap_sync(func: Callable[..., T]) -> Callable[..., Coroutine[Any, Any, T]]:
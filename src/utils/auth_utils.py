@@ -6,6 +6,7 @@
 from __future__ import annotations
 
 import hashlib
+from functools import lru_cache
 from typing import Any
 
 from fastapi import Depends, Header, HTTPException, status
@@ -22,8 +23,14 @@ from ..models.database import User, UserRole
 security = HTTPBearer()
 
 
+def _token_fingerprint(token: str) -> str:
+    """Token 指纹（仅用于日志定位，不泄露原文）"""
+    return hashlib.sha256(token.encode()).digest()[:6].hex()
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
 ) -> User:
     """
     获取当前登录用户
@@ -47,17 +54,15 @@ async def get_current_user(
             payload = await AuthService.verify_token(token, token_type="access")
         except HTTPException as token_error:
             # 保持原始的HTTP状态码（如401 Unauthorized），不要转换为403
-            token_fp = hashlib.sha256(token.encode()).hexdigest()[:12]
             logger.error(
                 "Token验证失败: {}: {}, token_fp={}",
                 token_error.status_code,
                 token_error.detail,
-                token_fp,
+                _token_fingerprint(token),
             )
             raise  # 重新抛出原始异常，保持状态码
         except Exception as token_error:
-            token_fp = hashlib.sha256(token.encode()).hexdigest()[:12]
-            logger.error("Token验证失败: {}, token_fp={}", token_error, token_fp)
+            logger.error("Token验证失败: {}, token_fp={}", token_error, _token_fingerprint(token))
             raise ForbiddenException("无效的Token")
 
         user_id = payload.get("user_id")
@@ -68,8 +73,6 @@ async def get_current_user(
 
         # 兼容旧 token：email 字段可能存在；新 token 不再包含 email（支持无邮箱用户）
 
-        token_fp = hashlib.sha256(token.encode()).hexdigest()[:12]
-
         # 确保user_id是字符串格式（UUID）
         if not isinstance(user_id, str):
             logger.error("Token中user_id格式错误: {} - {}", type(user_id), user_id)
@@ -100,7 +103,9 @@ async def get_current_user(
             raise ForbiddenException("用户不存在或已禁用")
 
         if not AuthService.token_identity_matches_user(payload, user):
-            logger.error("Token身份校验失败: user_id={}, token_fp={}", user_id, token_fp)
+            logger.error(
+                "Token身份校验失败: user_id={}, token_fp={}", user_id, _token_fingerprint(token)
+            )
             raise ForbiddenException("身份验证失败")
 
         return user
@@ -134,7 +139,8 @@ async def get_current_user_from_header(
     if not authorization or not authorization.startswith("Bearer "):
         raise ForbiddenException("未提供认证令牌")
 
-    token = authorization.replace("Bearer ", "")
+    # 只去掉前缀；replace 会扫描整个 token 并删除所有出现的 "Bearer "
+    token = authorization[7:]
 
     try:
         payload = await AuthService.verify_token(token, token_type="access")
@@ -143,7 +149,7 @@ async def get_current_user_from_header(
         if not user_id:
             raise ForbiddenException("无效的认证凭据")
 
-        user = db.query(User).filter(User.id == user_id).first()
+        user = db.get(User, user_id)
         if not user:
             raise ForbiddenException("用户不存在")
 
@@ -183,10 +189,13 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
+@lru_cache(maxsize=None)
 def require_role(required_role: UserRole) -> Any:
     """
     要求特定角色权限的装饰器工厂
 
+    同一角色返回同一个依赖函数，FastAPI 可在一次请求内复用其解析结果
+
     Args:
         required_role: 需要的用户角色
 
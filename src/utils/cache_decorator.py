@@ -2,27 +2,92 @@
 
 import functools
 import hashlib
+import inspect
 import json
 from collections.abc import Callable
+from datetime import date, datetime
+from decimal import Decimal
 from typing import Any
+from uuid import UUID
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 
 from src.clients.redis_client import get_redis_client_sync
 from src.core.logger import logger
 
+# ApiAdapter 类引用，首次成功导入后缓存，避免每次调用都走 import 语句
+_adapter_cls: type | None = None
+
 
 def _is_adapter_instance(obj: Any) -> bool:
     """检查对象是否是 ApiAdapter 的实例（延迟导入避免循环依赖）"""
-    try:
-        from src.api.base.adapter import ApiAdapter
+    global _adapter_cls
+    if _adapter_cls is None:
+        try:
+            from src.api.base.adapter import ApiAdapter
+        except ImportError:
+            return False
+        _adapter_cls = ApiAdapter
+    return isinstance(obj, _adapter_cls)
+
+
+# getattr 缺省哨兵，一次查找同时判断属性是否存在并取值
+_MISSING = object()
 
-        return isinstance(obj, ApiAdapter)
-    except ImportError:
-        return False
+# 未指定 vary_by 时追加到缓存键的适配器属性（兼容旧行为）
+_SUFFIX_ATTRS = ("days", "limit")
+
+# 各适配器类型实际具备的后缀属性，首次遇到该类型时探测一次
+_suffix_attrs_by_type: dict[type, tuple[str, ...]] = {}
+
+
+def _adapter_key_suffix(adapter_self: Any) -> str:
+    """按适配器类型缓存的属性列表拼接缓存键后缀"""
+    adapter_type = type(adapter_self)
+    attrs = _suffix_attrs_by_type.get(adapter_type)
+    if attrs is None:
+        attrs = tuple(name for name in _SUFFIX_ATTRS if hasattr(adapter_self, name))
+        _suffix_attrs_by_type[adapter_type] = attrs
+    return "".join(f":{name}:{getattr(adapter_self, name)}" for name in attrs)
 
 
 def _is_api_context(obj: Any) -> bool:
-    """检查对象是否是 ApiRequestContext（通过 duck typing）"""
-    return hasattr(obj, "user") and hasattr(obj, "db")
+    """检查对象是否是请求上下文（ApiRequestContext / WarmupContext 的类级标记）"""
+    return getattr(type(obj), "__api_context__", False)
+
+
+@functools.singledispatch
+def _json_default(value: Any) -> Any:
+    """json.dumps 的兜底序列化：按类型分派，未注册的类型退化为 str()"""
+    return str(value)
+
+
+@_json_default.register(datetime)
+@_json_default.register(date)
+def _(value: date) -> str:
+    return value.isoformat()
+
+
+@_json_default.register
+def _(value: UUID) -> str:
+    return str(value)
+
+
+@_json_default.register
+def _(value: Decimal) -> float:
+    return float(value)
+
+
+def _json_response(result: Any) -> Response:
+    """raw_json 模式下未经缓存的结果同样包装为 JSON Response，保证各路径返回类型一致"""
+    try:
+        serialized = json.dumps(result, ensure_ascii=False, default=_json_default)
+    except (TypeError, ValueError):
+        # 自定义序列化失败时交给 FastAPI 的通用编码
+        return JSONResponse(content=jsonable_encoder(result))
+    return Response(content=serialized, media_type="application/json")
 
 
 def _hash_vary(vary: dict[str, Any]) -> str:
@@ -34,104 +99,143 @@ def _hash_vary(vary: dict[str, Any]) -> str:
     return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
 
 
+async def _load(redis_client: Any, cache_key: str) -> Any:
+    """读取缓存，Redis 出错时视为未命中"""
+    try:
+        return await redis_client.get(cache_key)
+    except Exception as e:
+        logger.warning(f"读取缓存失败: {cache_key}, 错误: {e}")
+        return None
+
+
+async def _store(redis_client: Any, cache_key: str, ttl: int, value: str) -> None:
+    """写入缓存，Redis 出错只记录日志"""
+    try:
+        await redis_client.setex(cache_key, ttl, value)
+        logger.trace(f"缓存已保存: {cache_key}, TTL: {ttl}s")
+    except Exception as e:
+        logger.warning(f"保存缓存失败: {e}")
+
+
 def cache_result(
     key_prefix: str,
     ttl: int = 60,
     user_specific: bool = True,
     *,
     vary_by: list[str] | None = None,
+    raw_json: bool = False,
 ) -> Callable:
     """
     缓存函数结果的装饰器
 
     Args:
         key_prefix: 缓存键前缀
-        ttl: 缓存过期时间（秒）
+        ttl: 缓存过期时间（秒），<= 0 时不缓存，直接返回原函数
         user_specific: 是否针对用户缓存（从 context.user.id 获取）
+        raw_json: 直接以缓存的 JSON 文本构造 Response 返回，省去命中时的反序列化与再序列化；
+            开启后所有路径（包括 Redis 不可用、跳过缓存）都返回 JSON Response
+
+    调用时传入 _bypass_cache=True 可跳过本次缓存读写。
     """
 
+    vary_attrs = tuple(vary_by) if vary_by else ()
+
     def decorator(func: Callable) -> Callable:
+        if ttl <= 0:
+            return func
+        if not inspect.iscoroutinefunction(func):
+            # Redis 客户端是异步的，同步函数无法缓存，保持原函数避免额外包装
+            logger.warning(f"cache_result 仅支持异步函数，已跳过缓存: {func.__qualname__}")
+            return func
+
+        def build_cache_key(args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+            # 从 args 中获取 context
+            # 对于实例方法，args[0] 是 self，args[1] 才是 context
+            # 对于普通函数，args[0] 是 context
+            context = None
+            adapter_self = None
+
+            if len(args) >= 2 and _is_adapter_instance(args[0]) and _is_api_context(args[1]):
+                # 实例方法: handle(self, context)
+                adapter_self = args[0]
+                context = args[1]
+            elif len(args) >= 1 and _is_api_context(args[0]):
+                # 普通函数或 context 在第一个位置
+                context = args[0]
+            elif len(args) >= 1 and _is_adapter_instance(args[0]):
+                # 实例方法但 context 可能在 kwargs 中
+                adapter_self = args[0]
+                context = kwargs.get("context")
+
+            user = getattr(context, "user", None) if user_specific else None
+            if user:
+                cache_key = f"{key_prefix}:user:{user.id}"
+            else:
+                cache_key = f"{key_prefix}:global"
+
+            # If there are extra parameters, include them into the key.
+            # - When vary_by is provided: hash the selected attributes to keep key short.
+            # - Otherwise keep backward-compatible "days/limit" suffix behavior.
+            if adapter_self and hasattr(adapter_self, "__dict__"):
+                if vary_attrs:
+                    vary: dict[str, Any] = {}
+                    for attr_name in vary_attrs:
+                        attr_value = getattr(adapter_self, attr_name, _MISSING)
+                        if attr_value is not _MISSING:
+                            vary[attr_name] = attr_value
+                    if vary:
+                        cache_key += f":v:{_hash_vary(vary)}"
+                else:
+                    cache_key += _adapter_key_suffix(adapter_self)
+            return cache_key
+
+        async def call_uncached(args: tuple[Any, ...], kwargs: dict[str, Any]) -> Any:
+            result = await func(*args, **kwargs)
+            return _json_response(result) if raw_json else result
+
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if kwargs.pop("_bypass_cache", False):
+                return await call_uncached(args, kwargs)
+
             redis_client = get_redis_client_sync()
 
             # 如果 Redis 不可用，直接执行原函数
             if redis_client is None:
-                return await func(*args, **kwargs)
+                return await call_uncached(args, kwargs)
 
-            # 构建缓存键
             try:
-                # 从 args 中获取 context
-                # 对于实例方法，args[0] 是 self，args[1] 才是 context
-                # 对于普通函数，args[0] 是 context
-                context = None
-                adapter_self = None
-
-                if len(args) >= 2 and _is_adapter_instance(args[0]) and _is_api_context(args[1]):
-                    # 实例方法: handle(self, context)
-                    adapter_self = args[0]
-                    context = args[1]
-                elif len(args) >= 1 and _is_api_context(args[0]):
-                    # 普通函数或 context 在第一个位置
-                    context = args[0]
-                elif len(args) >= 1 and _is_adapter_instance(args[0]):
-                    # 实例方法但 context 可能在 kwargs 中
-                    adapter_self = args[0]
-                    context = kwargs.get("context")
-
-                if user_specific and context and hasattr(context, "user") and context.user:
-                    cache_key = f"{key_prefix}:user:{context.user.id}"
-                else:
-                    cache_key = f"{key_prefix}:global"
-
-                # If there are extra parameters, include them into the key.
-                # - When vary_by is provided: hash the selected attributes to keep key short.
-                # - Otherwise keep backward-compatible "days/limit" suffix behavior.
-                if adapter_self and hasattr(adapter_self, "__dict__"):
-                    if vary_by:
-                        vary: dict[str, Any] = {}
-                        for attr_name in vary_by:
-                            if hasattr(adapter_self, attr_name):
-                                vary[attr_name] = getattr(adapter_self, attr_name)
-                        if vary:
-                            cache_key += f":v:{_hash_vary(vary)}"
-                    else:
-                        for attr_name in ["days", "limit"]:
-                            if hasattr(adapter_self, attr_name):
-                                attr_value = getattr(adapter_self, attr_name)
-                                cache_key += f":{attr_name}:{attr_value}"
-
-                # 尝试从缓存获取
-                cached = await redis_client.get(cache_key)
-                if cached:
-                    try:
-                        result = json.loads(cached)
-                        logger.trace(f"缓存命中: {cache_key}")
-                        return result
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"缓存解析失败，删除损坏缓存: {cache_key}, 错误: {e}")
-                        try:
-                            await redis_client.delete(cache_key)
-                        except Exception:
-                            pass
-
-                # 执行原函数
-                result = await func(*args, **kwargs)
-
-                # 保存到缓存
+                cache_key = build_cache_key(args, kwargs)
+            except Exception as e:
+                logger.warning(f"构建缓存键出错: {e}, 直接执行原函数")
+                return await call_uncached(args, kwargs)
+
+            cached = await _load(redis_client, cache_key)
+            if cached and raw_json:
+                logger.trace(f"缓存命中: {cache_key}")
+                return Response(content=cached, media_type="application/json")
+            if cached:
                 try:
-                    await redis_client.setex(
-                        cache_key, ttl, json.dumps(result, ensure_ascii=False, default=str)
-                    )
-                    logger.trace(f"缓存已保存: {cache_key}, TTL: {ttl}s")
-                except Exception as e:
-                    logger.warning(f"保存缓存失败: {e}")
+                    result = json.loads(cached)
+                    logger.trace(f"缓存命中: {cache_key}")
+                    return result
+                except json.JSONDecodeError as e:
+                    # 损坏的缓存由下方 SETEX 直接覆盖，无需额外一次 DELETE 往返
+                    logger.warning(f"缓存解析失败，覆盖损坏缓存: {cache_key}, 错误: {e}")
 
-                return result
+            # 执行原函数（其异常直接向上抛出，不会被当作缓存错误而重复执行）
+            result = await func(*args, **kwargs)
 
-            except Exception as e:
-                logger.warning(f"缓存处理出错: {e}, 直接执行原函数")
-                return await func(*args, **kwargs)
+            try:
+                serialized = json.dumps(result, ensure_ascii=False, default=_json_default)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"缓存序列化失败: {cache_key}, 错误: {e}")
+                return JSONResponse(content=jsonable_encoder(result)) if raw_json else result
+            await _store(redis_client, cache_key, ttl, serialized)
+
+            if raw_json:
+                return Response(content=serialized, media_type="application/json")
+            return result
 
         return wrapper
 
@@ -4,6 +4,7 @@ SSL 工具函数
 """
 
 import ssl
+from functools import lru_cache
 
 from loguru import logger
 
@@ -17,26 +18,25 @@ def _create_default_ssl_context() -> ssl.SSLContext:
         return ssl.create_default_context()
 
 
-try:
-    _SSL_CONTEXT = _create_default_ssl_context()
-except Exception:
-    _SSL_CONTEXT = ssl.create_default_context()
-
 _PROXY_SSL_CONTEXT: ssl.SSLContext | None = None
 _PROFILE_SSL_CONTEXTS: dict[str, ssl.SSLContext] = {}
 
 
+@lru_cache(maxsize=1)
 def get_ssl_context() -> ssl.SSLContext:
     """
     获取 SSL 上下文
 
     优先使用 certifi 证书包，如果未安装则使用系统默认证书。
-    返回模块级缓存的 SSL 上下文实例。
+    首次调用时创建（导入模块不再加载证书），之后复用同一实例。
 
     Returns:
         ssl.SSLContext: SSL 上下文
     """
-    return _SSL_CONTEXT
+    try:
+        return _create_default_ssl_context()
+    except Exception:
+        return ssl.create_default_context()
 
 
 def get_proxy_ssl_context(expected_fingerprint: str | None = None) -> ssl.SSLContext:
@@ -7,23 +7,86 @@ API Pipeline 测试
 - 审计日志记录
 """
 
+import time
 from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import jwt
 import pytest
 from fastapi import HTTPException
 
-from src.api.base.pipeline import ApiRequestPipeline
+from src.api.base.pipeline import _AUDIT_SUCCESS_METHODS, ApiRequestPipeline, _parse_bearer
+from src.config.settings import AUDIT_TRAIL_LEVELS, Config
 from src.core.enums import UserRole
+from src.services.auth.service import AuthService
+from src.services.system.audit import AuditService
+from src.services.system.audit_writer import AuditLogWriter
+
+
+def _ctx(**kwargs: Any) -> SimpleNamespace:
+    return SimpleNamespace(**kwargs)
+
+
+def _audit_context(**overrides: Any) -> SimpleNamespace:
+    """审计测试只读取上下文属性，用 SimpleNamespace 代替层层嵌套的 MagicMock"""
+    fields: dict[str, Any] = {
+        "db": object(),
+        "user": _ctx(id="user-123"),
+        "api_key": _ctx(id="key-123"),
+        "request_id": "req-123",
+        "client_ip": "127.0.0.1",
+        "user_agent": "test-agent",
+        "request": _ctx(method="POST", url=_ctx(path="/v1/messages"), headers={}, path_params={}),
+        "start_time": 1000.0,
+        "mode": "standard",
+        "api_format_hint": None,
+        "query_params": {},
+        "raw_body": None,
+        "quota_remaining": None,
+        "audit_metadata": {},
+    }
+    fields.update(overrides)
+    return _ctx(**fields)
+
+
+def _audit_adapter(**overrides: Any) -> SimpleNamespace:
+    fields: dict[str, Any] = {
+        "name": "test-adapter",
+        "mode": "standard",
+        "audit_log_enabled": True,
+        "audit_success_event": None,
+        "audit_failure_event": None,
+        "get_audit_metadata": lambda *_args, **_kwargs: None,
+    }
+    fields.update(overrides)
+    return _ctx(**fields)
+
+
+@pytest.fixture(scope="module")
+def pipeline() -> ApiRequestPipeline:
+    # Pipeline 本身无状态（测试通过 patch.object 临时替换依赖），整个模块共享一个实例
+    return ApiRequestPipeline()
+
+
+def _stub_db_get(user: Any) -> MagicMock:
+    """认证按主键加载用户（db.get），返回固定用户的 Session 桩"""
+    db = MagicMock()
+    db.get.return_value = user
+    return db
+
+
+@pytest.fixture
+def frozen_time(monkeypatch: pytest.MonkeyPatch) -> float:
+    # 审计耗时按 time.time() - start_time 计算，固定为 1001.0（start_time=1000.0）
+    monkeypatch.setattr(time, "time", lambda: 1001.0)
+    return 1001.0
 
 
 class TestPipelineQuotaCalculation:
     """测试 Pipeline 配额计算"""
 
-    @pytest.fixture
-    def pipeline(self) -> ApiRequestPipeline:
-        return ApiRequestPipeline()
-
     def test_calculate_quota_remaining_with_quota(self, pipeline: ApiRequestPipeline) -> None:
         """测试有配额限制时计算剩余配额"""
         mock_user = MagicMock()
@@ -64,9 +127,15 @@ class TestPipelineQuotaCalculation:
 
         assert remaining == 0.0
 
-    def test_calculate_quota_remaining_none_user(self, pipeline: ApiRequestPipeline) -> None:
+    def test_calculate_quota_remaining_zero_quota(self) -> None:
+        """测试配额为 0 时剩余 0 而非不限额"""
+        user = SimpleNamespace(quota_usd=0, used_usd=0.0)
+
+        assert ApiRequestPipeline._calculate_quota_remaining(user) == 0.0
+
+    def test_calculate_quota_remaining_none_user(self) -> None:
         """测试用户为 None 时返回 None"""
-        remaining = pipeline._calculate_quota_remaining(None)
+        remaining = ApiRequestPipeline._calculate_quota_remaining(None)
 
         assert remaining is None
 
@@ -74,80 +143,42 @@ class TestPipelineQuotaCalculation:
 class TestPipelineAuditLogging:
     """测试 Pipeline 审计日志"""
 
-    @pytest.fixture
-    def pipeline(self) -> ApiRequestPipeline:
-        return ApiRequestPipeline()
-
+    @pytest.mark.usefixtures("frozen_time")
     def test_record_audit_event_success(self, pipeline: ApiRequestPipeline) -> None:
         """测试记录成功的审计事件"""
-        mock_context = MagicMock()
-        mock_context.db = MagicMock()
-        mock_context.user = MagicMock()
-        mock_context.user.id = "user-123"
-        mock_context.api_key = MagicMock()
-        mock_context.api_key.id = "key-123"
-        mock_context.request_id = "req-123"
-        mock_context.client_ip = "127.0.0.1"
-        mock_context.user_agent = "test-agent"
-        mock_context.request = MagicMock()
-        mock_context.request.method = "POST"
-        mock_context.request.url.path = "/v1/messages"
-        mock_context.start_time = 1000.0
+        mock_context = _audit_context()
 
-        mock_adapter = MagicMock()
-        mock_adapter.name = "test-adapter"
-        mock_adapter.audit_log_enabled = True
-        mock_adapter.audit_success_event = None
-        mock_adapter.audit_failure_event = None
+        mock_adapter = _audit_adapter()
 
         with patch.object(
             pipeline.audit_service,
             "log_event",
         ) as mock_log:
-            with patch("time.time", return_value=1001.0):
-                pipeline._record_audit_event(
-                    mock_context, mock_adapter, success=True, status_code=200
-                )
+            pipeline._record_audit_event(mock_context, mock_adapter, success=True, status_code=200)
 
             mock_log.assert_called_once()
             call_kwargs = mock_log.call_args[1]
             assert call_kwargs["user_id"] == "user-123"
             assert call_kwargs["status_code"] == 200
 
+    @pytest.mark.usefixtures("frozen_time")
     def test_record_audit_event_failure(self, pipeline: ApiRequestPipeline) -> None:
         """测试记录失败的审计事件"""
-        mock_context = MagicMock()
-        mock_context.db = MagicMock()
-        mock_context.user = MagicMock()
-        mock_context.user.id = "user-123"
-        mock_context.api_key = MagicMock()
-        mock_context.api_key.id = "key-123"
-        mock_context.request_id = "req-123"
-        mock_context.client_ip = "127.0.0.1"
-        mock_context.user_agent = "test-agent"
-        mock_context.request = MagicMock()
-        mock_context.request.method = "POST"
-        mock_context.request.url.path = "/v1/messages"
-        mock_context.start_time = 1000.0
+        mock_context = _audit_context()
 
-        mock_adapter = MagicMock()
-        mock_adapter.name = "test-adapter"
-        mock_adapter.audit_log_enabled = True
-        mock_adapter.audit_success_event = None
-        mock_adapter.audit_failure_event = None
+        mock_adapter = _audit_adapter()
 
         with patch.object(
             pipeline.audit_service,
             "log_event",
         ) as mock_log:
-            with patch("time.time", return_value=1001.0):
-                pipeline._record_audit_event(
-                    mock_context,
-                    mock_adapter,
-                    success=False,
-                    status_code=500,
-                    error="Internal error",
-                )
+            pipeline._record_audit_event(
+                mock_context,
+                mock_adapter,
+                success=False,
+                status_code=500,
+                error="Internal error",
+            )
 
             mock_log.assert_called_once()
             call_kwargs = mock_log.call_args[1]
@@ -156,11 +187,9 @@ class TestPipelineAuditLogging:
 
     def test_record_audit_event_no_db(self, pipeline: ApiRequestPipeline) -> None:
         """测试没有数据库会话时跳过审计"""
-        mock_context = MagicMock()
-        mock_context.db = None
+        mock_context = _audit_context(db=None)
 
-        mock_adapter = MagicMock()
-        mock_adapter.audit_log_enabled = True
+        mock_adapter = _audit_adapter()
 
         with patch.object(
             pipeline.audit_service,
@@ -174,11 +203,9 @@ class TestPipelineAuditLogging:
 
     def test_record_audit_event_disabled(self, pipeline: ApiRequestPipeline) -> None:
         """测试审计日志被禁用时跳过"""
-        mock_context = MagicMock()
-        mock_context.db = MagicMock()
+        mock_context = _audit_context()
 
-        mock_adapter = MagicMock()
-        mock_adapter.audit_log_enabled = False
+        mock_adapter = _audit_adapter(audit_log_enabled=False)
 
         with patch.object(
             pipeline.audit_service,
@@ -188,44 +215,144 @@ class TestPipelineAuditLogging:
 
             mock_log.assert_not_called()
 
+    @pytest.mark.usefixtures("frozen_time")
     def test_record_audit_event_exception_handling(self, pipeline: ApiRequestPipeline) -> None:
         """测试审计日志异常不影响主流程"""
-        mock_context = MagicMock()
-        mock_context.db = MagicMock()
-        mock_context.user = MagicMock()
-        mock_context.user.id = "user-123"
-        mock_context.api_key = MagicMock()
-        mock_context.api_key.id = "key-123"
-        mock_context.request_id = "req-123"
-        mock_context.client_ip = "127.0.0.1"
-        mock_context.user_agent = "test-agent"
-        mock_context.request = MagicMock()
-        mock_context.request.method = "POST"
-        mock_context.request.url.path = "/v1/messages"
-        mock_context.start_time = 1000.0
+        mock_context = _audit_context()
 
-        mock_adapter = MagicMock()
-        mock_adapter.name = "test-adapter"
-        mock_adapter.audit_log_enabled = True
-        mock_adapter.audit_success_event = None
+        mock_adapter = _audit_adapter()
 
         with patch.object(
             pipeline.audit_service,
             "log_event",
             side_effect=Exception("DB error"),
         ):
-            with patch("time.time", return_value=1001.0):
-                # 不应该抛出异常
-                pipeline._record_audit_event(mock_context, mock_adapter, success=True)
+            # 不应该抛出异常
+            pipeline._record_audit_event(mock_context, mock_adapter, success=True)
+
+    @pytest.mark.asyncio
+    async def test_record_audit_event_burst_is_written_in_one_bulk(
+        self, pipeline: ApiRequestPipeline
+    ) -> None:
+        """写入器运行时，一批审计事件只触发一次批量写入"""
+        writer = AuditLogWriter(flush_interval_seconds=60)
+        bg_db = MagicMock()
+        bg_db.info = {}
+
+        with (
+            patch("src.api.base.pipeline.get_audit_log_writer", return_value=writer),
+            patch("src.services.system.audit_writer.create_session", return_value=bg_db),
+            patch.object(AuditService, "log_events_bulk") as mock_bulk,
+            patch.object(pipeline.audit_service, "log_event") as mock_log,
+        ):
+            await writer.start()
+            try:
+                for _ in range(10):
+                    pipeline._record_audit_event(
+                        _audit_context(), _audit_adapter(), success=True, status_code=200
+                    )
+                assert await pipeline.flush_audit() == 10
+            finally:
+                await writer.stop()
+
+        mock_log.assert_not_called()
+        mock_bulk.assert_called_once()
+        events = mock_bulk.call_args.args[1]
+        assert len(events) == 10
+        assert events[0]["user_id"] == "user-123"
+        bg_db.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_record_audit_event_failure_bypasses_buffer(
+        self, pipeline: ApiRequestPipeline
+    ) -> None:
+        """失败/安全类事件即使写入器运行也在请求会话上同步写入"""
+        writer = AuditLogWriter(flush_interval_seconds=60)
+        context = _audit_context()
+
+        with (
+            patch("src.api.base.pipeline.get_audit_log_writer", return_value=writer),
+            patch.object(pipeline.audit_service, "log_event") as mock_log,
+        ):
+            await writer.start()
+            try:
+                pipeline._record_audit_event(
+                    context, _audit_adapter(), success=False, status_code=401
+                )
+                assert writer._pending == []
+            finally:
+                await writer.stop()
+
+        mock_log.assert_called_once()
+        assert mock_log.call_args.kwargs["db"] is context.db
+
+    @pytest.mark.parametrize(
+        "level,method,success,expected",
+        [
+            ("all", "GET", True, True),
+            ("writes_only", "GET", True, False),
+            ("writes_only", "POST", True, True),
+            ("mutations_only", "POST", True, False),
+            ("mutations_only", "PATCH", True, True),
+            ("deletes_only", "PUT", True, False),
+            ("deletes_only", "DELETE", True, True),
+            ("failures_only", "DELETE", True, False),
+            # 失败请求不受级别限制
+            ("failures_only", "GET", False, True),
+            ("deletes_only", "GET", False, True),
+            # 未知级别按 all 处理（Config 加载时已回退并告警）
+            ("bogus", "GET", True, True),
+        ],
+    )
+    def test_record_audit_event_trail_level(
+        self,
+        pipeline: ApiRequestPipeline,
+        monkeypatch: pytest.MonkeyPatch,
+        level: str,
+        method: str,
+        success: bool,
+        expected: bool,
+    ) -> None:
+        """审计级别在构建审计数据之前过滤请求"""
+        monkeypatch.setattr("src.api.base.pipeline.config.audit_trail_level", level)
+        context = _audit_context(
+            request=_ctx(method=method, url=_ctx(path="/v1/x"), headers={}, path_params={})
+        )
+
+        with (
+            patch.object(pipeline, "_build_audit_metadata", return_value={}) as mock_build,
+            patch.object(pipeline.audit_service, "log_event") as mock_log,
+        ):
+            pipeline._record_audit_event(context, _audit_adapter(), success=success)
+
+        assert mock_log.called is expected
+        assert mock_build.called is expected
+
+    def test_audit_trail_level_unknown_value_falls_back_with_warning(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """拼写错误的 AUDIT_TRAIL_LEVEL 回退为 all，并在启动时告警"""
+        monkeypatch.setenv("ADMIN_PASSWORD", "test-password")
+        monkeypatch.setenv("AUDIT_TRAIL_LEVEL", " Writes ")
+        cfg = Config()
+
+        assert cfg.audit_trail_level == "all"
+        with patch("src.core.logger.logger") as mock_logger:
+            cfg.log_startup_warnings()
+        warnings = [str(call.args[0]) for call in mock_logger.warning.call_args_list]
+        assert any("AUDIT_TRAIL_LEVEL='writes'" in w for w in warnings)
+
+        monkeypatch.setenv("AUDIT_TRAIL_LEVEL", "Deletes_Only")
+        assert Config().audit_trail_level == "deletes_only"
+
+    def test_audit_trail_levels_match_pipeline_filters(self) -> None:
+        """配置允许的级别与 Pipeline 的过滤表保持一致"""
+        assert set(AUDIT_TRAIL_LEVELS) == set(_AUDIT_SUCCESS_METHODS)
 
 
 class TestPipelineAuthentication:
     """测试 Pipeline 认证相关逻辑"""
 
-    @pytest.fixture
-    def pipeline(self) -> ApiRequestPipeline:
-        return ApiRequestPipeline()
-
     def test_authenticate_client_missing_key(self, pipeline: ApiRequestPipeline) -> None:
         """测试缺少 API Key 时抛出异常"""
         mock_request = MagicMock()
@@ -303,13 +430,26 @@ class TestPipelineAuthentication:
                     pipeline._authenticate_client(mock_request, mock_db, mock_adapter)
 
 
+@pytest.mark.parametrize(
+    "header,expected",
+    [
+        ("Bearer abc", "abc"),
+        ("bearer abc ", "abc"),
+        ("BEARER abc", "abc"),
+        ("Bearer ", None),
+        ("Bearer    ", None),
+        ("Basic abc", None),
+        ("", None),
+        (None, None),
+    ],
+)
+def test_parse_bearer(header: str | None, expected: str | None) -> None:
+    assert _parse_bearer(header) == expected
+
+
 class TestPipelineAdminAuth:
     """测试管理员认证"""
 
-    @pytest.fixture
-    def pipeline(self) -> ApiRequestPipeline:
-        return ApiRequestPipeline()
-
     @pytest.mark.asyncio
     async def test_authenticate_admin_missing_token(self, pipeline: ApiRequestPipeline) -> None:
         """测试缺少管理员令牌"""
@@ -359,8 +499,7 @@ class TestPipelineAdminAuth:
         mock_request.headers = {"authorization": "Bearer valid-token"}
         mock_request.state = MagicMock()
 
-        mock_db = MagicMock()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        mock_db = _stub_db_get(mock_user)
 
         with patch.object(
             pipeline.auth_service,
@@ -391,8 +530,7 @@ class TestPipelineAdminAuth:
         mock_request.headers = {"authorization": "bearer valid-token"}
         mock_request.state = MagicMock()
 
-        mock_db = MagicMock()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        mock_db = _stub_db_get(mock_user)
 
         with patch.object(
             pipeline.auth_service,
@@ -406,14 +544,43 @@ class TestPipelineAdminAuth:
         assert user == mock_user
         assert management_token is None
 
+    @pytest.mark.asyncio
+    async def test_authenticate_admin_reuses_decoded_token(
+        self, pipeline: ApiRequestPipeline
+    ) -> None:
+        """同一令牌的重复请求不再重复验签，但用户每次从当前 Session 加载"""
+        token = AuthService.create_access_token({"user_id": "admin-cached"})
+
+        mock_user = MagicMock(id="admin-cached", is_active=True, is_deleted=False)
+        mock_user.role = UserRole.ADMIN
+        mock_db = _stub_db_get(mock_user)
+
+        def _request() -> MagicMock:
+            request = MagicMock()
+            request.headers = {"authorization": f"Bearer {token}"}
+            return request
+
+        with (
+            patch(
+                "src.services.auth.service.JWTBlacklistService.is_blacklisted",
+                new_callable=AsyncMock,
+                return_value=False,
+            ) as blacklist,
+            patch("src.services.auth.service.jwt.decode", wraps=jwt.decode) as decode,
+            patch.object(pipeline.auth_service, "token_identity_matches_user", return_value=True),
+        ):
+            for _ in range(2):
+                user, _token = await pipeline._authenticate_admin(_request(), mock_db)
+                assert user is mock_user
+
+        assert decode.call_count == 1
+        assert blacklist.await_count == 2
+        assert mock_db.get.call_count == 2
+
 
 class TestPipelineUserAuth:
     """测试普通用户 JWT 认证"""
 
-    @pytest.fixture
-    def pipeline(self) -> ApiRequestPipeline:
-        return ApiRequestPipeline()
-
     @pytest.mark.asyncio
     async def test_authenticate_user_lowercase_bearer(self, pipeline: ApiRequestPipeline) -> None:
         """测试 bearer (小写) 前缀也能正确解析"""
@@ -430,8 +597,7 @@ class TestPipelineUserAuth:
         mock_request.headers = {"authorization": "bearer valid-token"}
         mock_request.state = MagicMock()
 
-        mock_db = MagicMock()
-        mock_db.query.return_value.filter.return_value.first.return_value = mock_user
+        mock_db = _stub_db_get(mock_user)
 
         with patch.object(
             pipeline.auth_service,
@@ -10,6 +10,8 @@ from __future__ import annotations
 
 from typing import Any, cast
 
+import pytest
+
 from src.core.api_format.conversion.internal import ErrorType, InternalError
 from src.core.api_format.conversion.normalizers.claude import ClaudeNormalizer
 from src.core.api_format.conversion.normalizers.gemini import GeminiNormalizer
@@ -19,7 +21,9 @@ from src.core.api_format.conversion.stream_events import ErrorEvent
 from src.core.api_format.conversion.stream_state import StreamState
 
 
-def _make_registry() -> FormatConversionRegistry:
+@pytest.fixture(scope="module")
+def registry() -> FormatConversionRegistry:
+    # 测试只读使用 registry，整个模块共享一个实例
     reg = FormatConversionRegistry()
     reg.register(OpenAINormalizer())
     reg.register(ClaudeNormalizer())
@@ -27,24 +31,20 @@ def _make_registry() -> FormatConversionRegistry:
     return reg
 
 
-def test_error_conversion_openai_to_claude() -> None:
-    reg = _make_registry()
-
+def test_error_conversion_openai_to_claude(registry: FormatConversionRegistry) -> None:
     openai_error = {
         "error": {"message": "bad request", "type": "invalid_request_error", "code": "bad_request"}
     }
 
-    out = reg.convert_error_response(openai_error, "openai:chat", "claude:chat")
+    out = registry.convert_error_response(openai_error, "openai:chat", "claude:chat")
     assert out.get("type") == "error"
     assert isinstance(out.get("error"), dict)
     assert out["error"]["message"] == "bad request"
 
 
-def test_error_conversion_claude_to_openai() -> None:
-    reg = _make_registry()
-
+def test_error_conversion_claude_to_openai(registry: FormatConversionRegistry) -> None:
     claude_error = {"type": "error", "error": {"type": "invalid_request_error", "message": "nope"}}
-    out = reg.convert_error_response(claude_error, "claude:chat", "openai:chat")
+    out = registry.convert_error_response(claude_error, "claude:chat", "openai:chat")
     assert isinstance(out.get("error"), dict)
     assert out["error"]["message"] == "nope"
 
@@ -58,12 +58,12 @@ def test_error_event_stream_output_openai() -> None:
     assert events == [{"error": {"message": "bad", "type": "invalid_request_error"}}]
 
 
-def test_error_event_stream_openai_to_claude_via_registry() -> None:
-    reg = _make_registry()
-
+def test_error_event_stream_openai_to_claude_via_registry(
+    registry: FormatConversionRegistry,
+) -> None:
     # OpenAI 流式错误块
     chunk = {"error": {"message": "bad", "type": "invalid_request_error"}}
-    out = reg.convert_stream_chunk(chunk, "openai:chat", "claude:chat", state=StreamState())
+    out = registry.convert_stream_chunk(chunk, "openai:chat", "claude:chat", state=StreamState())
     assert isinstance(out, list) and out
     evt0 = cast(dict[str, Any], out[0])
     assert evt0.get("type") == "error"
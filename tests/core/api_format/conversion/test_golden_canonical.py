@@ -9,9 +9,13 @@ Golden tests（Canonical）
 from __future__ import annotations
 
 import json
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Any
 
+import pytest
+
 from src.core.api_format.conversion.normalizers.claude import ClaudeNormalizer
 from src.core.api_format.conversion.normalizers.gemini import GeminiNormalizer
 from src.core.api_format.conversion.normalizers.openai import OpenAINormalizer
@@ -23,23 +27,38 @@ INPUT_DIR = GOLDEN_DIR / "inputs"
 EXPECTED_DIR = GOLDEN_DIR / "expected"
 
 
+def _drop_key(key: str, value: Any) -> bool:
+    return key == "created" or (key == "system_fingerprint" and value is None)
+
+
 def _scrub(obj: Any) -> Any:
+    """去掉不稳定字段；写时复制，无需清理的子树原样返回（不修改入参）"""
     if isinstance(obj, list):
-        return [_scrub(x) for x in obj]
+        items: list[Any] | None = None
+        for idx, x in enumerate(obj):
+            scrubbed = _scrub(x)
+            if items is None and scrubbed is not x:
+                items = obj[:idx]
+            if items is not None:
+                items.append(scrubbed)
+        return obj if items is None else items
     if isinstance(obj, dict):
-        out: dict[str, Any] = {}
-        for k, v in obj.items():
-            if k in {"created"}:
-                continue
-            if k == "system_fingerprint" and v is None:
-                continue
-            out[k] = _scrub(v)
-        return out
+        out: dict[str, Any] | None = None
+        for idx, (k, v) in enumerate(obj.items()):
+            drop = _drop_key(k, v)
+            scrubbed = None if drop else _scrub(v)
+            if out is None and (drop or scrubbed is not v):
+                out = dict(islice(obj.items(), idx))
+            if out is not None and not drop:
+                out[k] = scrubbed
+        return obj if out is None else out
     return obj
 
 
+@lru_cache(maxsize=None)
 def _load_json(path: Path) -> Any:
-    return json.loads(path.read_text(encoding="utf-8"))
+    # 同一输入会被多个 pair 复用，按路径缓存解析结果；调用方只读不改
+    return json.loads(path.read_bytes())
 
 
 def _sanitize_format(fmt: str) -> str:
@@ -47,7 +66,9 @@ def _sanitize_format(fmt: str) -> str:
     return fmt.replace(":", "_")
 
 
-def _make_registry() -> FormatConversionRegistry:
+@pytest.fixture(scope="module")
+def registry() -> FormatConversionRegistry:
+    # 测试只读使用 registry，整个模块共享一个实例
     reg = FormatConversionRegistry()
     reg.register(OpenAINormalizer())
     reg.register(ClaudeNormalizer())
@@ -55,69 +76,40 @@ def _make_registry() -> FormatConversionRegistry:
     return reg
 
 
-def test_golden_requests() -> None:
-    reg = _make_registry()
-    formats = ["openai:chat", "claude:chat", "gemini:chat"]
-
-    inputs = {
-        "openai:chat": _load_json(INPUT_DIR / "request_openai.json"),
-        "claude:chat": _load_json(INPUT_DIR / "request_claude.json"),
-        "gemini:chat": _load_json(INPUT_DIR / "request_gemini.json"),
-    }
-
-    for source in formats:
-        for target in formats:
-            if source == target:
-                continue
-            fname = f"request_{_sanitize_format(source)}_to_{_sanitize_format(target)}.json"
-            expected = _load_json(EXPECTED_DIR / fname)
-            actual = reg.convert_request(inputs[source], source, target)
-            assert _scrub(actual) == expected
-
-
-def test_golden_responses() -> None:
-    reg = _make_registry()
-    formats = ["openai:chat", "claude:chat", "gemini:chat"]
-
-    inputs = {
-        "openai:chat": _load_json(INPUT_DIR / "response_openai.json"),
-        "claude:chat": _load_json(INPUT_DIR / "response_claude.json"),
-        "gemini:chat": _load_json(INPUT_DIR / "response_gemini.json"),
-    }
-
-    for source in formats:
-        for target in formats:
-            if source == target:
-                continue
-            fname = f"response_{_sanitize_format(source)}_to_{_sanitize_format(target)}.json"
-            expected = _load_json(EXPECTED_DIR / fname)
-            actual = reg.convert_response(inputs[source], source, target)
-            assert _scrub(actual) == expected
-
-
-def test_golden_streams() -> None:
-    reg = _make_registry()
-    formats = ["openai:chat", "claude:chat", "gemini:chat"]
-
-    inputs: dict[str, list[dict[str, Any]]] = {
-        "openai:chat": _load_json(INPUT_DIR / "stream_openai.json"),
-        "claude:chat": _load_json(INPUT_DIR / "stream_claude.json"),
-        "gemini:chat": _load_json(INPUT_DIR / "stream_gemini.json"),
-    }
-
-    for source in formats:
-        for target in formats:
-            if source == target:
-                continue
-            fname = f"stream_{_sanitize_format(source)}_to_{_sanitize_format(target)}.json"
-            expected = _load_json(EXPECTED_DIR / fname)
-
-            state = StreamState()
-            if source == "gemini:chat":
-                state.message_id = "gemini_1"
-
-            out: list[dict[str, Any]] = []
-            for chunk in inputs[source]:
-                out.extend(reg.convert_stream_chunk(chunk, source, target, state=state))
-
-            assert _scrub(out) == expected
+FORMATS = ("openai:chat", "claude:chat", "gemini:chat")
+PAIRS = [(source, target) for source in FORMATS for target in FORMATS if source != target]
+
+
+def _load_input(kind: str, fmt: str) -> Any:
+    # 输入文件名只使用族名：request_openai.json / stream_gemini.json
+    return _load_json(INPUT_DIR / f"{kind}_{fmt.split(':', 1)[0]}.json")
+
+
+def _load_expected(kind: str, source: str, target: str) -> Any:
+    fname = f"{kind}_{_sanitize_format(source)}_to_{_sanitize_format(target)}.json"
+    return _load_json(EXPECTED_DIR / fname)
+
+
+@pytest.mark.parametrize("source,target", PAIRS)
+def test_golden_request(registry: FormatConversionRegistry, source: str, target: str) -> None:
+    actual = registry.convert_request(_load_input("request", source), source, target)
+    assert _scrub(actual) == _load_expected("request", source, target)
+
+
+@pytest.mark.parametrize("source,target", PAIRS)
+def test_golden_response(registry: FormatConversionRegistry, source: str, target: str) -> None:
+    actual = registry.convert_response(_load_input("response", source), source, target)
+    assert _scrub(actual) == _load_expected("response", source, target)
+
+
+@pytest.mark.parametrize("source,target", PAIRS)
+def test_golden_stream(registry: FormatConversionRegistry, source: str, target: str) -> None:
+    state = StreamState()
+    if source == "gemini:chat":
+        state.message_id = "gemini_1"
+
+    out: list[dict[str, Any]] = []
+    for chunk in _load_input("stream", source):
+        out.extend(registry.convert_stream_chunk(chunk, source, target, state=state))
+
+    assert _scrub(out) == _load_expected("stream", source, target)
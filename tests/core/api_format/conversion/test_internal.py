@@ -16,6 +16,7 @@ from typing import get_args
 import pytest
 
 from src.core.api_format.conversion.internal import (
+    EMPTY_FEATURES,
     ContentBlock,
     ContentType,
     ErrorType,
@@ -39,6 +40,12 @@ from src.core.api_format.conversion.internal import (
 )
 from src.core.api_format.conversion.stream_state import StreamState
 
+# ContentBlock 联合类型的成员元组，模块加载时解析一次
+_BLOCK_TYPES: tuple[type, ...] = get_args(ContentBlock)
+_STOP_REASONS = list(StopReason)
+_ERROR_TYPES = list(ErrorType)
+
+
 # ============================================================================
 # Enum 类型测试
 # ============================================================================
@@ -107,14 +114,13 @@ class TestToolChoiceTypeEnum:
 
 
 def test_content_block_runtime_check() -> None:
-    block_types = get_args(ContentBlock)
-    assert block_types, "typing.get_args(ContentBlock) 应返回可用的类型列表"
+    assert _BLOCK_TYPES, "typing.get_args(ContentBlock) 应返回可用的类型列表"
 
-    assert isinstance(TextBlock(text="hi"), block_types)
-    assert isinstance(ImageBlock(url="https://example.com/a.png"), block_types)
-    assert isinstance(ToolUseBlock(tool_id="t1", tool_name="x"), block_types)
-    assert isinstance(ToolResultBlock(tool_use_id="t1", output={"ok": True}), block_types)
-    assert isinstance(UnknownBlock(raw_type="weird", payload={"x": 1}), block_types)
+    assert isinstance(TextBlock(text="hi"), _BLOCK_TYPES)
+    assert isinstance(ImageBlock(url="https://example.com/a.png"), _BLOCK_TYPES)
+    assert isinstance(ToolUseBlock(tool_id="t1", tool_name="x"), _BLOCK_TYPES)
+    assert isinstance(ToolResultBlock(tool_use_id="t1", output={"ok": True}), _BLOCK_TYPES)
+    assert isinstance(UnknownBlock(raw_type="weird", payload={"x": 1}), _BLOCK_TYPES)
 
 
 def test_internal_error_to_debug_dict() -> None:
@@ -452,7 +458,7 @@ class TestFormatCapabilities:
         assert caps.supports_error_conversion is True
         assert caps.supports_tools is True
         assert caps.supports_images is False
-        assert caps.supported_features == frozenset()
+        assert caps.supported_features is EMPTY_FEATURES
 
     def test_custom_values(self) -> None:
         caps = FormatCapabilities(
@@ -557,16 +563,10 @@ class TestInternalResponse:
         d = resp.to_debug_dict()
         assert d["usage"] is None
 
-    def test_to_debug_dict_with_all_stop_reasons(self) -> None:
-        for reason in StopReason:
-            resp = InternalResponse(
-                id="r1",
-                model="m",
-                content=[],
-                stop_reason=reason,
-            )
-            d = resp.to_debug_dict()
-            assert d["stop_reason"] == reason.value
+    @pytest.mark.parametrize("reason", _STOP_REASONS, ids=lambda r: r.value)
+    def test_to_debug_dict_with_all_stop_reasons(self, reason: StopReason) -> None:
+        resp = InternalResponse(id="r1", model="m", content=[], stop_reason=reason)
+        assert resp.to_debug_dict()["stop_reason"] == reason.value
 
 
 # ============================================================================
@@ -592,11 +592,10 @@ class TestInternalError:
         assert err.type == ErrorType.RATE_LIMIT
         assert err.retryable is True
 
-    def test_all_error_types_in_debug_dict(self) -> None:
-        for err_type in ErrorType:
-            err = InternalError(type=err_type, message="test")
-            d = err.to_debug_dict()
-            assert d["type"] == err_type.value
+    @pytest.mark.parametrize("err_type", _ERROR_TYPES, ids=lambda t: t.value)
+    def test_all_error_types_in_debug_dict(self, err_type: ErrorType) -> None:
+        err = InternalError(type=err_type, message="test")
+        assert err.to_debug_dict()["type"] == err_type.value
 
 
 # ============================================================================
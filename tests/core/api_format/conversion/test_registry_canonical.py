@@ -10,6 +10,8 @@ from __future__ import annotations
 
 from typing import Any, cast
 
+import pytest
+
 from src.core.api_format.conversion.normalizers.claude import ClaudeNormalizer
 from src.core.api_format.conversion.normalizers.gemini import GeminiNormalizer
 from src.core.api_format.conversion.normalizers.openai import OpenAINormalizer
@@ -17,7 +19,9 @@ from src.core.api_format.conversion.registry import FormatConversionRegistry
 from src.core.api_format.conversion.stream_state import StreamState
 
 
-def _make_registry() -> FormatConversionRegistry:
+@pytest.fixture(scope="module")
+def registry() -> FormatConversionRegistry:
+    # 测试只读使用 registry，整个模块共享一个实例
     reg = FormatConversionRegistry()
     reg.register(OpenAINormalizer())
     reg.register(ClaudeNormalizer())
@@ -35,16 +39,13 @@ def _first_openai_choice_message(resp: dict[str, Any]) -> dict[str, Any]:
     return cast(dict[str, Any], msg)
 
 
-def test_registry_canonical_can_convert_full_stream() -> None:
-    reg = _make_registry()
-    assert reg.can_convert_full("openai:chat", "claude:chat", require_stream=True) is True
-    assert reg.can_convert_full("openai:chat", "gemini:chat", require_stream=True) is True
-    assert reg.can_convert_full("claude:chat", "gemini:chat", require_stream=True) is True
-
+def test_registry_canonical_can_convert_full_stream(registry: FormatConversionRegistry) -> None:
+    assert registry.can_convert_full("openai:chat", "claude:chat", require_stream=True) is True
+    assert registry.can_convert_full("openai:chat", "gemini:chat", require_stream=True) is True
+    assert registry.can_convert_full("claude:chat", "gemini:chat", require_stream=True) is True
 
-def test_registry_canonical_request_openai_to_claude() -> None:
-    reg = _make_registry()
 
+def test_registry_canonical_request_openai_to_claude(registry: FormatConversionRegistry) -> None:
     openai_req = {
         "model": "gpt-4o-mini",
         "messages": [
@@ -57,7 +58,7 @@ def test_registry_canonical_request_openai_to_claude() -> None:
         "stream": True,
     }
 
-    claude_req = reg.convert_request(openai_req, "openai:chat", "claude:chat")
+    claude_req = registry.convert_request(openai_req, "openai:chat", "claude:chat")
     assert claude_req["model"] == "gpt-4o-mini"
     assert claude_req["system"] == "sys\n\ndev"
     assert claude_req["stream"] is True
@@ -66,9 +67,7 @@ def test_registry_canonical_request_openai_to_claude() -> None:
     assert claude_req["messages"][0]["content"] == "hi"
 
 
-def test_registry_canonical_response_claude_to_openai() -> None:
-    reg = _make_registry()
-
+def test_registry_canonical_response_claude_to_openai(registry: FormatConversionRegistry) -> None:
     claude_resp = {
         "id": "msg_1",
         "type": "message",
@@ -79,16 +78,14 @@ def test_registry_canonical_response_claude_to_openai() -> None:
         "usage": {"input_tokens": 5, "output_tokens": 7},
     }
 
-    openai_resp = reg.convert_response(claude_resp, "claude:chat", "openai:chat")
+    openai_resp = registry.convert_response(claude_resp, "claude:chat", "openai:chat")
     assert openai_resp["object"] == "chat.completion"
     msg = _first_openai_choice_message(openai_resp)
     assert msg["role"] == "assistant"
     assert msg["content"] == "hello"
 
 
-def test_registry_canonical_stream_openai_to_claude() -> None:
-    reg = _make_registry()
-
+def test_registry_canonical_stream_openai_to_claude(registry: FormatConversionRegistry) -> None:
     chunk = {
         "id": "chatcmpl_1",
         "object": "chat.completion.chunk",
@@ -100,7 +97,7 @@ def test_registry_canonical_stream_openai_to_claude() -> None:
     }
 
     state = StreamState()
-    out_events = reg.convert_stream_chunk(chunk, "openai:chat", "claude:chat", state=state)
+    out_events = registry.convert_stream_chunk(chunk, "openai:chat", "claude:chat", state=state)
     assert isinstance(out_events, list) and out_events
 
     types = [cast(dict[str, Any], e).get("type") for e in cast(list[dict[str, Any]], out_events)]
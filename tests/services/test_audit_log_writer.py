@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from src.models.database import AuditEventType, AuditLog
+from src.services.system.audit import AuditService
+from src.services.system.audit_writer import AuditLogWriter
+
+
+def _event(request_id: str = "r1") -> dict:
+    return {
+        "event_type": AuditEventType.REQUEST_SUCCESS,
+        "description": "POST /v1/messages via test",
+        "request_id": request_id,
+        "metadata": {"quiet_logging": True},
+    }
+
+
+def _bg_db() -> MagicMock:
+    db = MagicMock()
+    db.info = {}
+    return db
+
+
+def test_enqueue_rejected_when_not_running() -> None:
+    assert AuditLogWriter().enqueue(_event()) is False
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_triggers_flush() -> None:
+    writer = AuditLogWriter(flush_interval_seconds=60, max_batch_size=3)
+    bg_db = _bg_db()
+
+    with (
+        patch("src.services.system.audit_writer.create_session", return_value=bg_db),
+        patch.object(AuditService, "log_events_bulk") as mock_bulk,
+    ):
+        await writer.start()
+        try:
+            for i in range(3):
+                assert writer.enqueue(_event(f"r{i}"))
+            for _ in range(50):
+                if mock_bulk.called:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await writer.stop()
+
+    mock_bulk.assert_called_once()
+    assert [e["request_id"] for e in mock_bulk.call_args.args[1]] == ["r0", "r1", "r2"]
+    assert bg_db.info["managed_by_middleware"] is True
+    bg_db.close.assert_called()
+
+
+def test_bulk_failure_falls_back_to_per_event_writes() -> None:
+    writer = AuditLogWriter()
+    bg_db = _bg_db()
+
+    with (
+        patch("src.services.system.audit_writer.create_session", return_value=bg_db),
+        patch.object(AuditService, "log_events_bulk", side_effect=RuntimeError("fk")),
+        patch.object(AuditService, "log_event", side_effect=[RuntimeError("fk"), None]) as mock_log,
+        patch("src.services.system.audit_writer.logger") as mock_logger,
+    ):
+        failed = writer._flush_batch_sync([(_event("r1"), 0), (_event("r2"), 0)])
+
+    assert failed == 1
+    assert mock_log.call_count == 2
+    assert bg_db.rollback.call_count == 2
+    bg_db.commit.assert_called_once()
+    # 写入器未运行时失败事件直接写入死信日志
+    dead_letter = mock_logger.error.call_args.args
+    assert "[audit-dlq]" in dead_letter[0]
+    assert '"request_id": "r1"' in dead_letter[2]
+
+
+@pytest.mark.asyncio
+async def test_failed_events_are_requeued_until_max_attempts() -> None:
+    writer = AuditLogWriter(flush_interval_seconds=60)
+    bg_db = _bg_db()
+
+    with (
+        patch("src.services.system.audit_writer.create_session", return_value=bg_db),
+        patch.object(AuditService, "log_events_bulk", side_effect=RuntimeError("db down")),
+        patch.object(AuditService, "log_event", side_effect=RuntimeError("db down")),
+        patch("src.services.system.audit_writer.logger") as mock_logger,
+    ):
+        await writer.start()
+        try:
+            assert writer.enqueue(_event("r1"))
+            await writer.flush()
+            assert writer._pending == [(_event("r1"), 1)]
+
+            await writer.flush()
+            await writer.flush()
+            assert writer._pending == []
+            mock_logger.error.assert_called_once()
+        finally:
+            await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_in_flight_batch() -> None:
+    writer = AuditLogWriter(flush_interval_seconds=60)
+    bg_db = _bg_db()
+    written: list[str] = []
+
+    def slow_bulk(_db, events) -> None:
+        time.sleep(0.05)
+        written.extend(e["request_id"] for e in events)
+
+    with (
+        patch("src.services.system.audit_writer.create_session", return_value=bg_db),
+        patch.object(AuditService, "log_events_bulk", side_effect=slow_bulk),
+    ):
+        await writer.start()
+        assert writer.enqueue(_event("r1"))
+        flush_task = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0.01)
+        flush_task.cancel()
+        await writer.stop()
+
+    assert written == ["r1"]
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_events() -> None:
+    writer = AuditLogWriter(flush_interval_seconds=60)
+    bg_db = _bg_db()
+
+    with (
+        patch("src.services.system.audit_writer.create_session", return_value=bg_db),
+        patch.object(AuditService, "log_events_bulk") as mock_bulk,
+    ):
+        await writer.start()
+        assert writer.enqueue(_event())
+        await asyncio.sleep(0)
+        await writer.stop()
+
+    mock_bulk.assert_called_once()
+    assert not writer.enqueue(_event())
+
+
+def test_log_events_bulk_adds_all_rows_with_single_flush() -> None:
+    engine = create_engine("sqlite://")
+    AuditLog.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        with patch.object(db, "flush", wraps=db.flush) as flush:
+            AuditService.log_events_bulk(db, [_event("r1"), _event("r2")])
+        db.commit()
+
+        assert flush.call_count == 1
+        rows = db.scalars(select(AuditLog.request_id).order_by(AuditLog.request_id)).all()
+        assert rows == ["r1", "r2"]
+    finally:
+        db.close()
+        engine.dispose()
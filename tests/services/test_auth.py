@@ -158,6 +158,28 @@ class TestJWTTokenVerification:
         assert exc_info.value.status_code == 401
         assert "撤销" in exc_info.value.detail
 
+    @pytest.mark.asyncio
+    async def test_verify_token_caches_decoded_payload_but_rechecks_blacklist(self) -> None:
+        """测试重复验证同一令牌时跳过解码，但仍检查黑名单"""
+        from fastapi import HTTPException
+
+        token = AuthService.create_access_token({"sub": "cached-user"})
+        blacklist = AsyncMock(side_effect=[False, False, True])
+
+        with (
+            patch("src.services.auth.service.JWTBlacklistService.is_blacklisted", blacklist),
+            patch("src.services.auth.service.jwt.decode", wraps=jwt.decode) as decode,
+        ):
+            first = await AuthService.verify_token(token, token_type="access")
+            first["sub"] = "mutated"
+            second = await AuthService.verify_token(token, token_type="access")
+            with pytest.raises(HTTPException):
+                await AuthService.verify_token(token, token_type="access")
+
+        assert decode.call_count == 1
+        assert second["sub"] == "cached-user"
+        assert blacklist.await_count == 3
+
 
 class TestUserAuthentication:
     """测试用户登录认证"""
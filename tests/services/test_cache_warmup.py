@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.models.database import UserRole
+from src.services.system import cache_warmup
+from src.services.system.cache_warmup import CacheWarmupService, WarmupContext
+from src.services.system.warmup_profile import WarmupProfileRecorder
+
+
+@pytest.fixture
+def admin_user() -> object:
+    return object()
+
+
+@pytest.fixture(autouse=True)
+def profile_recorder(monkeypatch, tmp_path) -> WarmupProfileRecorder:
+    recorder = WarmupProfileRecorder(str(tmp_path / "warmup_profile.json"), max_entries=10)
+    monkeypatch.setattr(cache_warmup, "get_warmup_profile_recorder", lambda: recorder)
+    return recorder
+
+
+@pytest.mark.asyncio
+async def test_warmup_all_runs_tasks_sequentially_with_stagger(monkeypatch, admin_user):
+    calls: list[str] = []
+    sleeps: list[float] = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        await real_sleep(0)
+
+    def make_task(name: str):
+        async def _task(*_args) -> bool:
+            calls.append(name)
+            return True
+
+        return _task
+
+    monkeypatch.setattr("src.services.system.cache_warmup.asyncio.sleep", fake_sleep)
+    monkeypatch.setattr(CacheWarmupService, "_load_admin_user", classmethod(lambda cls: admin_user))
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_dashboard_stats", make_task("dashboard"))
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_heatmap", make_task("heatmap"))
+    monkeypatch.setattr(CacheWarmupService, "_warmup_daily_stats", make_task("daily"))
+
+    await CacheWarmupService.warmup_all(delay_seconds=0, stagger_seconds=0.25)
+
+    assert calls == ["dashboard", "heatmap", "daily"]
+    # 启动延迟 + 两次任务间隔
+    assert sleeps == [0, 0.25, 0.25]
+
+
+@pytest.mark.asyncio
+async def test_warmup_all_continues_after_task_failure(monkeypatch, admin_user):
+    calls: list[str] = []
+
+    async def failing(*_args) -> bool:
+        calls.append("dashboard")
+        raise RuntimeError("boom")
+
+    async def ok_heatmap() -> bool:
+        calls.append("heatmap")
+        return True
+
+    async def ok_daily(_admin_user) -> bool:
+        calls.append("daily")
+        return True
+
+    monkeypatch.setattr(CacheWarmupService, "_load_admin_user", classmethod(lambda cls: admin_user))
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_dashboard_stats", failing)
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_heatmap", ok_heatmap)
+    monkeypatch.setattr(CacheWarmupService, "_warmup_daily_stats", ok_daily)
+
+    await CacheWarmupService.warmup_all(delay_seconds=0, stagger_seconds=0)
+
+    assert calls == ["dashboard", "heatmap", "daily"]
+
+
+def test_profile_recorder_round_trip(profile_recorder):
+    for _ in range(3):
+        profile_recorder.record("heatmap", {"user_id": "u1", "include_actual_cost": False})
+    profile_recorder.record("heatmap", {"user_id": "u2", "include_actual_cost": False})
+
+    profile_recorder.dump()
+
+    loaded = profile_recorder.load()
+    assert [e["params"]["user_id"] for e in loaded] == ["u1", "u2"]
+    assert loaded[0]["hits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_profile_recorder_flush_snapshots_on_loop(monkeypatch, tmp_path):
+    recorder = WarmupProfileRecorder(str(tmp_path / "profile.json"), max_entries=2)
+    for user_id, hits in (("u1", 3), ("u2", 2), ("u3", 1)):
+        for _ in range(hits):
+            recorder.record("heatmap", {"user_id": user_id, "include_actual_cost": False})
+
+    written: list[list[dict]] = []
+
+    async def fake_run_in_executor(func, *args):
+        # 线程池只收到已生成的快照，不再触碰计数器
+        assert func == recorder.write
+        written.append(args[0])
+        func(*args)
+
+    monkeypatch.setattr("src.services.system.warmup_profile.run_in_executor", fake_run_in_executor)
+
+    await recorder.flush()
+
+    assert [e["params"]["user_id"] for e in written[0]] == ["u1", "u2"]
+    # 计数器未超出容量，保留全部条目供新热点继续积累
+    assert len(recorder._hits) == 3
+    assert [e["params"]["user_id"] for e in recorder.load()] == ["u1", "u2"]
+
+
+def test_profile_recorder_decays_counter_over_capacity(tmp_path):
+    recorder = WarmupProfileRecorder(str(tmp_path / "profile.json"), max_entries=1)
+    for _ in range(10):
+        recorder.record("heatmap", {"user_id": "old", "include_actual_cost": False})
+    for i in range(10):
+        recorder.record("heatmap", {"user_id": f"new-{i}", "include_actual_cost": False})
+
+    recorder.snapshot()
+
+    # 超出容量（max_entries * 10）时整体减半，只命中一次的条目被淘汰
+    assert [(e["params"]["user_id"], e["hits"]) for e in recorder.top(5)] == [("old", 5)]
+
+
+def test_profile_recorder_load_ignores_corrupt_file(profile_recorder):
+    profile_recorder.path.write_text("{not json", encoding="utf-8")
+
+    assert profile_recorder.load() == []
+
+
+@pytest.mark.asyncio
+async def test_replay_profile_skips_global_heatmap(monkeypatch, profile_recorder):
+    profile_recorder.record("heatmap", {"user_id": None, "include_actual_cost": True})
+    profile_recorder.record("heatmap", {"user_id": "u1", "include_actual_cost": False})
+    profile_recorder.record("unknown", {"foo": "bar"})
+    profile_recorder.dump()
+
+    replayed: list[tuple[str | None, bool]] = []
+
+    async def fake_replay(user_id, include_actual_cost) -> None:
+        replayed.append((user_id, include_actual_cost))
+
+    monkeypatch.setattr(CacheWarmupService, "_replay_heatmap", fake_replay)
+
+    count = await CacheWarmupService._replay_profile()
+
+    assert count == 1
+    assert replayed == [("u1", False)]
+
+
+@pytest.mark.asyncio
+async def test_warmup_all_ready_before_profile_replay(monkeypatch, admin_user, profile_recorder):
+    async def ok(*_args) -> bool:
+        return True
+
+    release = asyncio.Event()
+    replayed: list[str | None] = []
+
+    async def slow_replay(user_id, include_actual_cost) -> None:
+        await release.wait()
+        # 重放流量不计入画像
+        profile_recorder.record(
+            "heatmap", {"user_id": user_id, "include_actual_cost": include_actual_cost}
+        )
+        replayed.append(user_id)
+
+    profile_recorder.record("heatmap", {"user_id": "u1", "include_actual_cost": False})
+    profile_recorder.dump()
+    hits_before = dict(profile_recorder._hits)
+
+    monkeypatch.setattr(cache_warmup, "WARMUP_READY", asyncio.Event())
+    monkeypatch.setattr(cache_warmup, "REPLAY_PROGRESS", {"done": 0, "total": 0})
+    monkeypatch.setattr(CacheWarmupService, "_load_admin_user", classmethod(lambda cls: admin_user))
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_dashboard_stats", ok)
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_heatmap", ok)
+    monkeypatch.setattr(CacheWarmupService, "_warmup_daily_stats", ok)
+    monkeypatch.setattr(CacheWarmupService, "_replay_heatmap", slow_replay)
+
+    await CacheWarmupService.warmup_all(delay_seconds=0, stagger_seconds=0)
+    replay_task = CacheWarmupService._replay_task
+    await asyncio.sleep(0)
+
+    assert cache_warmup.WARMUP_READY.is_set()
+    assert cache_warmup.REPLAY_PROGRESS == {"done": 0, "total": 1}
+
+    release.set()
+    assert await replay_task == 1
+    assert replayed == ["u1"]
+    assert cache_warmup.REPLAY_PROGRESS == {"done": 1, "total": 1}
+    assert dict(profile_recorder._hits) == hits_before
+
+
+def test_get_admin_user_caches_primary_key(monkeypatch):
+    monkeypatch.setattr(CacheWarmupService, "_admin_user_id", None)
+    admin = MagicMock(id="admin-1", role=UserRole.ADMIN)
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = admin
+    db.get.return_value = admin
+
+    assert CacheWarmupService._get_admin_user(db) is admin
+    assert CacheWarmupService._admin_user_id == "admin-1"
+    assert not db.get.called
+
+    db.query.reset_mock()
+    assert CacheWarmupService._get_admin_user(db) is admin
+    db.get.assert_called_once()
+    assert not db.query.called
+
+
+def test_get_admin_user_falls_back_when_cached_user_demoted(monkeypatch):
+    monkeypatch.setattr(CacheWarmupService, "_admin_user_id", "old-admin")
+    other_admin = MagicMock(id="admin-2", role=UserRole.ADMIN)
+    db = MagicMock()
+    db.get.return_value = MagicMock(id="old-admin", role=UserRole.USER)
+    db.query.return_value.filter.return_value.first.return_value = other_admin
+
+    assert CacheWarmupService._get_admin_user(db) is other_admin
+    assert CacheWarmupService._admin_user_id == "admin-2"
+
+
+def test_warmup_context_creates_audit_metadata_lazily():
+    context = WarmupContext(db=MagicMock(), user=None)
+    assert context.audit_metadata is None
+
+    context.add_audit_metadata(action="dashboard")
+    context.add_audit_metadata(days=7)
+
+    assert context.audit_metadata == {"action": "dashboard", "days": 7}
+
+
+@pytest.mark.asyncio
+async def test_warmup_all_sets_ready_event_and_progress(monkeypatch, admin_user):
+    async def failing(*_args) -> bool:
+        raise RuntimeError("boom")
+
+    async def ok(*_args) -> bool:
+        return True
+
+    monkeypatch.setattr(cache_warmup, "WARMUP_READY", asyncio.Event())
+    monkeypatch.setattr(cache_warmup, "WARMUP_PROGRESS", {"done": 0, "total": 0})
+    monkeypatch.setattr(CacheWarmupService, "_load_admin_user", classmethod(lambda cls: admin_user))
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_dashboard_stats", failing)
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_heatmap", ok)
+    monkeypatch.setattr(CacheWarmupService, "_warmup_daily_stats", ok)
+
+    assert not cache_warmup.WARMUP_READY.is_set()
+    await CacheWarmupService.warmup_all(delay_seconds=0, stagger_seconds=0)
+
+    assert cache_warmup.WARMUP_READY.is_set()
+    assert cache_warmup.WARMUP_PROGRESS == {"done": 3, "total": 3}
+
+
+@pytest.mark.asyncio
+async def test_warmup_session_released_on_cancellation(monkeypatch):
+    from src.services.usage.service import UsageService
+
+    session = MagicMock()
+    session.__enter__.return_value = session
+    monkeypatch.setattr(cache_warmup, "create_session", lambda: session)
+
+    async def cancelled(**_kwargs) -> None:
+        raise asyncio.CancelledError
+
+    monkeypatch.setattr(UsageService, "get_cached_heatmap", cancelled)
+
+    with pytest.raises(asyncio.CancelledError):
+        await CacheWarmupService._warmup_admin_heatmap()
+
+    session.__exit__.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_warmup_all_records_task_metrics(monkeypatch, admin_user):
+    from prometheus_client import REGISTRY
+
+    def sample(name: str, task: str) -> float:
+        return REGISTRY.get_sample_value(name, {"task": task}) or 0.0
+
+    async def failing(*_args) -> bool:
+        return False
+
+    async def ok(*_args) -> bool:
+        return True
+
+    monkeypatch.setattr(CacheWarmupService, "_load_admin_user", classmethod(lambda cls: admin_user))
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_dashboard_stats", failing)
+    monkeypatch.setattr(CacheWarmupService, "_warmup_admin_heatmap", ok)
+    monkeypatch.setattr(CacheWarmupService, "_warmup_daily_stats", ok)
+
+    failures_before = sample("cache_warmup_failures_total", "dashboard_stats")
+    heatmap_failures_before = sample("cache_warmup_failures_total", "admin_heatmap")
+    observed_before = sample("cache_warmup_duration_seconds_count", "admin_heatmap")
+
+    await CacheWarmupService.warmup_all(delay_seconds=0, stagger_seconds=0)
+
+    assert sample("cache_warmup_failures_total", "dashboard_stats") == failures_before + 1
+    assert sample("cache_warmup_failures_total", "admin_heatmap") == heatmap_failures_before
+    assert sample("cache_warmup_duration_seconds_count", "admin_heatmap") == observed_before + 1
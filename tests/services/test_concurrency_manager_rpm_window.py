@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.core.exceptions import ConcurrencyLimitError
+from src.services.rate_limit.concurrency_manager import (
+    RPM_WINDOW_ACQUIRE_LUA,
+    ConcurrencyManager,
+)
+
+
+@pytest.fixture
+def manager(monkeypatch) -> ConcurrencyManager:
+    monkeypatch.setattr(ConcurrencyManager, "_instance", None)
+    mgr = ConcurrencyManager()
+    mgr._redis = None
+    mgr._rpm_window_script = None
+    return mgr
+
+
+class _FakeScript:
+    def __init__(self, result: list[int]) -> None:
+        self.result = result
+        self.calls: list[dict[str, Any]] = []
+
+    async def __call__(self, keys: list[str], args: list[Any]) -> list[int]:
+        self.calls.append({"keys": keys, "args": args})
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_memory_guard_yields_admitted_count(manager):
+    async with manager.rpm_guard("k1", key_rpm_limit=10, is_cached_user=True) as count:
+        assert count == 1
+    async with manager.rpm_guard("k1", key_rpm_limit=10, is_cached_user=True) as count:
+        assert count == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_guard_rejects_new_user_over_reserved_share(manager):
+    async with manager.rpm_guard("k1", key_rpm_limit=2, cache_reservation_ratio=0.5):
+        pass
+
+    with pytest.raises(ConcurrencyLimitError):
+        async with manager.rpm_guard("k1", key_rpm_limit=2, cache_reservation_ratio=0.5):
+            pass
+
+    # 缓存用户仍可使用预留槽位
+    async with manager.rpm_guard(
+        "k1", key_rpm_limit=2, is_cached_user=True, cache_reservation_ratio=0.5
+    ) as count:
+        assert count == 2
+
+
+@pytest.mark.asyncio
+async def test_redis_acquire_uses_rolling_window_script(manager):
+    script = _FakeScript([1, 7])
+    redis = MagicMock()
+    redis.register_script.return_value = script
+    manager._redis = redis
+
+    acquired, count = await manager._acquire_rpm_slot_with_count(
+        "k1", key_rpm_limit=10, is_cached_user=False, cache_reservation_ratio=0.2
+    )
+
+    assert acquired is True
+    assert count == 7
+    redis.register_script.assert_called_once_with(RPM_WINDOW_ACQUIRE_LUA)
+    call = script.calls[0]
+    assert call["keys"] == ["rpm:key:k1:window"]
+    _now_ms, window_ms, limit, is_cached, ratio, member = call["args"]
+    assert window_ms == manager._key_rpm_bucket_seconds * 1000
+    assert (limit, is_cached, ratio) == (10, 0, 0.2)
+    assert member
+
+
+@pytest.mark.asyncio
+async def test_redis_rejection_raises_without_extra_count_query(manager):
+    redis = MagicMock()
+    redis.zcount = AsyncMock(return_value=0)
+    manager._redis = redis
+    manager._rpm_window_script = _FakeScript([0, 10])
+
+    with pytest.raises(ConcurrencyLimitError):
+        async with manager.rpm_guard("k1", key_rpm_limit=10, is_cached_user=True):
+            pass
+
+    redis.zcount.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_redis_get_key_rpm_count_counts_window(manager):
+    redis = MagicMock()
+    redis.zcount = AsyncMock(return_value=3)
+    manager._redis = redis
+
+    assert await manager.get_key_rpm_count("k1") == 3
+    key, lower, upper = redis.zcount.call_args.args
+    assert key == "rpm:key:k1:window"
+    assert lower.startswith("(")
+    assert upper == "+inf"
+
+
+@pytest.mark.asyncio
+async def test_unlimited_key_skips_window_write(manager):
+    script = _FakeScript([1, 1])
+    manager._redis = MagicMock()
+    manager._rpm_window_script = script
+
+    async with manager.rpm_guard("k1", key_rpm_limit=-1) as count:
+        assert count is None
+
+    assert script.calls == []
+
+
+@pytest.mark.asyncio
+async def test_adaptive_key_without_limit_still_counts(manager):
+    script = _FakeScript([1, 4])
+    manager._redis = MagicMock()
+    manager._rpm_window_script = script
+
+    async with manager.rpm_guard("k1", key_rpm_limit=None) as count:
+        assert count == 4
+
+    assert script.calls[0]["args"][2] == -1
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.services.request.stats_writer import (
+    ExecutionStatsWriter,
+    MarkCandidateStreaming,
+    MarkCandidateSuccess,
+    RecordHealthSuccess,
+)
+
+
+def _success_op(candidate_id: str = "c1") -> MarkCandidateSuccess:
+    return MarkCandidateSuccess(
+        candidate_id=candidate_id,
+        status_code=200,
+        latency_ms=10,
+        concurrent_requests=1,
+        extra_data=None,
+    )
+
+
+def test_submit_falls_back_to_sync_when_not_running() -> None:
+    writer = ExecutionStatsWriter()
+    db = MagicMock()
+
+    with (
+        patch("src.services.request.stats_writer.health_monitor.record_success") as record_success,
+        patch(
+            "src.services.request.stats_writer.RequestCandidateService.mark_candidate_success"
+        ) as mark_success,
+    ):
+        writer.submit(
+            db,
+            RecordHealthSuccess(key_id="k1", api_format="openai:chat", response_time_ms=10),
+            _success_op(),
+        )
+
+    assert record_success.call_args.kwargs["db"] is db
+    assert mark_success.call_args.kwargs["db"] is db
+    # 同步路径不附加状态保护，行为与直接调用一致
+    assert mark_success.call_args.kwargs["only_if_status"] is None
+
+
+@pytest.mark.asyncio
+async def test_enqueued_ops_are_flushed_in_order_with_status_guard() -> None:
+    writer = ExecutionStatsWriter(flush_interval_seconds=0)
+    bg_db = MagicMock()
+    bg_db.info = {}
+    applied: list[str] = []
+
+    def fake_streaming(**kwargs):
+        applied.append(f"streaming:{kwargs['candidate_id']}")
+        assert kwargs["only_if_status"] == frozenset({"pending"})
+
+    def fake_success(**kwargs):
+        applied.append(f"success:{kwargs['candidate_id']}")
+
+    with (
+        patch("src.services.request.stats_writer.create_session", return_value=bg_db),
+        patch(
+            "src.services.request.stats_writer.RequestCandidateService.mark_candidate_streaming",
+            side_effect=fake_streaming,
+        ),
+        patch(
+            "src.services.request.stats_writer.RequestCandidateService.mark_candidate_success",
+            side_effect=fake_success,
+        ),
+    ):
+        await writer.start()
+        try:
+            assert writer.enqueue(
+                MarkCandidateStreaming(candidate_id="c1", status_code=200, concurrent_requests=1),
+                _success_op("c2"),
+            )
+            for _ in range(50):
+                if len(applied) == 2:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await writer.stop()
+
+    assert applied == ["streaming:c1", "success:c2"]
+    assert bg_db.commit.call_count == 2
+    assert bg_db.info["managed_by_middleware"] is True
+    bg_db.close.assert_called()
+
+
+@pytest.mark.asyncio
+async def test_flush_continues_after_failed_op() -> None:
+    writer = ExecutionStatsWriter()
+    bg_db = MagicMock()
+    bg_db.info = {}
+
+    with (
+        patch("src.services.request.stats_writer.create_session", return_value=bg_db),
+        patch(
+            "src.services.request.stats_writer.RequestCandidateService.mark_candidate_success",
+            side_effect=[RuntimeError("boom"), None],
+        ),
+    ):
+        failed = writer._flush_batch_sync([_success_op("c1"), _success_op("c2")])
+
+    assert failed == 1
+    bg_db.rollback.assert_called_once()
+    bg_db.commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_ops() -> None:
+    writer = ExecutionStatsWriter(flush_interval_seconds=60)
+    bg_db = MagicMock()
+    bg_db.info = {}
+
+    with (
+        patch("src.services.request.stats_writer.create_session", return_value=bg_db),
+        patch(
+            "src.services.request.stats_writer.RequestCandidateService.mark_candidate_success"
+        ) as mark_success,
+    ):
+        await writer.start()
+        assert writer.enqueue(_success_op())
+        await asyncio.sleep(0)
+        await writer.stop()
+
+    mark_success.assert_called_once()
+    assert not writer.enqueue(_success_op())
+
+
+@pytest.mark.asyncio
+async def test_submit_keeps_candidate_status_synchronous_while_running() -> None:
+    writer = ExecutionStatsWriter(flush_interval_seconds=60)
+    db = MagicMock()
+    health = RecordHealthSuccess(key_id="k1", api_format="openai:chat", response_time_ms=10)
+
+    with patch(
+        "src.services.request.stats_writer.RequestCandidateService.mark_candidate_success"
+    ) as mark_success:
+        await writer.start()
+        try:
+            writer.submit(db, health, _success_op())
+            # 候选终态在请求会话上立即写入，健康度记录进入异步队列
+            assert mark_success.call_args.kwargs["db"] is db
+            assert writer._pending == [health]
+        finally:
+            writer._drain_pending(None)
+            await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_rejected_when_queue_full() -> None:
+    writer = ExecutionStatsWriter(flush_interval_seconds=60, max_pending=1)
+    health = RecordHealthSuccess(key_id="k1", api_format="openai:chat", response_time_ms=10)
+
+    await writer.start()
+    try:
+        assert not writer.enqueue(health, health)
+        assert writer.enqueue(health)
+        assert not writer.enqueue(health)
+    finally:
+        writer._drain_pending(None)
+        await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_stop_drain_timeout_counts_dropped_ops() -> None:
+    writer = ExecutionStatsWriter(flush_interval_seconds=60, shutdown_timeout_seconds=0)
+    bg_db = MagicMock()
+    bg_db.info = {}
+
+    with (
+        patch("src.services.request.stats_writer.create_session", return_value=bg_db),
+        patch(
+            "src.services.request.stats_writer.RequestCandidateService.mark_candidate_success"
+        ) as mark_success,
+    ):
+        await writer.start()
+        assert writer.enqueue(_success_op("c1"), _success_op("c2"))
+        await writer.stop()
+
+    mark_success.assert_not_called()
+    assert writer.dropped_ops == 2
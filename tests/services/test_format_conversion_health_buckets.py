@@ -57,7 +57,7 @@ async def test_executor_records_health_by_provider_format() -> None:
         patch("src.services.request.executor.RequestCandidateService.mark_candidate_started"),
         patch("src.services.request.executor.RequestCandidateService.mark_candidate_success"),
         patch("src.services.request.executor.get_adaptive_reservation_manager") as mock_res_mgr,
-        patch("src.services.request.executor.health_monitor.record_success") as record_success,
+        patch("src.services.request.stats_writer.health_monitor.record_success") as record_success,
     ):
         mock_res_mgr.return_value.calculate_reservation.return_value = MagicMock(
             ratio=0.0, phase="stable", confidence=1.0
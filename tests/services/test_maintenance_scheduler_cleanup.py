@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.database import AuditLog, Usage
+from src.services.system.maintenance_scheduler import MaintenanceScheduler, _cleanup_backoff
+
+
+@pytest.fixture
+def session_factory(monkeypatch) -> sessionmaker:
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Usage.__table__.create(engine)
+    AuditLog.__table__.create(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    monkeypatch.setattr("src.services.system.maintenance_scheduler.create_session", factory)
+    monkeypatch.setattr("src.services.system.maintenance_scheduler.asyncio.sleep", _no_sleep)
+    yield factory
+    engine.dispose()
+
+
+async def _no_sleep(_seconds: float) -> None:
+    return None
+
+
+def _patch_config(monkeypatch, values: dict) -> None:
+    def fake_get_config(cls, db, key, default=None):
+        return values.get(key, default)
+
+    def fake_get_configs(cls, db, keys):
+        return {key: values.get(key, cls.DEFAULT_CONFIGS.get(key, {}).get("value")) for key in keys}
+
+    monkeypatch.setattr(
+        "src.services.system.maintenance_scheduler.SystemConfigService.get_config",
+        classmethod(fake_get_config),
+    )
+    monkeypatch.setattr(
+        "src.services.system.maintenance_scheduler.SystemConfigService.get_configs",
+        classmethod(fake_get_configs),
+    )
+
+
+def _add_usage(db: Session, created_at: datetime, **fields) -> str:
+    usage_id = str(uuid.uuid4())
+    db.add(
+        Usage(
+            id=usage_id,
+            request_id=usage_id,
+            provider_name="p",
+            model="m",
+            created_at=created_at,
+            **fields,
+        )
+    )
+    return usage_id
+
+
+@pytest.mark.asyncio
+async def test_delete_old_records_batches_until_exhausted(session_factory):
+    now = datetime.now(timezone.utc)
+    with session_factory() as db:
+        for _ in range(5):
+            _add_usage(db, now - timedelta(days=400))
+        kept = _add_usage(db, now)
+        db.commit()
+
+        deleted = await MaintenanceScheduler()._delete_old_records(
+            db, now - timedelta(days=365), batch_size=2
+        )
+
+        assert deleted == 5
+        assert [u.id for u in db.query(Usage).all()] == [kept]
+
+
+@pytest.mark.asyncio
+async def test_delete_old_records_bypasses_orm_execute(session_factory):
+    now = datetime.now(timezone.utc)
+    with session_factory() as db:
+        _add_usage(db, now - timedelta(days=400))
+        db.commit()
+
+        orm_statements: list[str] = []
+        event.listen(
+            db, "do_orm_execute", lambda state: orm_statements.append(str(state.statement))
+        )
+        deleted = await MaintenanceScheduler()._delete_old_records(
+            db, now - timedelta(days=365), batch_size=10
+        )
+
+    assert deleted == 1
+    assert not any(stmt.startswith("DELETE") for stmt in orm_statements)
+
+
+@pytest.mark.asyncio
+async def test_time_chunked_batches_run_off_event_loop_thread(session_factory):
+    import threading
+
+    from src.services.system.maintenance_scheduler import _build_batch_delete
+
+    now = datetime.now(timezone.utc)
+    threads: list[bool] = []
+    with session_factory() as db:
+        _add_usage(db, now - timedelta(days=400))
+        db.commit()
+
+        def build(conditions, limit):
+            threads.append(threading.current_thread() is threading.main_thread())
+            return _build_batch_delete(db, Usage, *conditions, batch_size=limit)
+
+        deleted = await MaintenanceScheduler()._run_time_chunked(
+            db, Usage.created_at, now, (), 10, build
+        )
+
+    assert deleted == 1
+    assert threads and not any(threads)
+
+
+@pytest.mark.asyncio
+async def test_audit_cleanup_deletes_only_expired_logs(monkeypatch, session_factory):
+    _patch_config(monkeypatch, {"audit_log_retention_days": 30, "cleanup_batch_size": 2})
+    now = datetime.now(timezone.utc)
+    with session_factory() as db:
+        for i in range(3):
+            db.add(
+                AuditLog(
+                    event_type="t", description=f"old-{i}", created_at=now - timedelta(days=40)
+                )
+            )
+        db.add(AuditLog(event_type="t", description="new", created_at=now))
+        db.commit()
+
+    await MaintenanceScheduler()._perform_audit_cleanup()
+
+    with session_factory() as db:
+        assert [log.description for log in db.query(AuditLog).all()] == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_header_cleanup_walks_hour_windows_in_batch_size_chunks(monkeypatch, session_factory):
+    from src.services.system import maintenance_scheduler
+
+    limits: list[int] = []
+    original_run = maintenance_scheduler.run_in_executor
+
+    async def recording_run(func, *args, **kwargs):
+        if func.__name__ == "run_batch":
+            limits.append(args[1])
+        return await original_run(func, *args, **kwargs)
+
+    monkeypatch.setattr(maintenance_scheduler, "run_in_executor", recording_run)
+    base = datetime(2024, 1, 1, 10, 15, tzinfo=timezone.utc)
+    with session_factory() as db:
+        # 同一小时内 5 条，相隔数天的另一小时 1 条
+        for i in range(5):
+            _add_usage(db, base + timedelta(minutes=i), request_headers={"a": i})
+        _add_usage(db, base + timedelta(days=3), response_headers={"b": 1})
+        recent = _add_usage(db, base + timedelta(days=30), request_headers={"c": 1})
+        db.commit()
+
+    with session_factory() as db:
+        cleaned = await MaintenanceScheduler()._cleanup_expired_fields(
+            db, base - timedelta(days=1), base + timedelta(days=10), batch_size=2
+        )
+
+    assert cleaned == 6
+    # 每一批（包括窗口内的第一批）都受 batch_size 约束
+    assert limits and set(limits) == {2}
+    with session_factory() as db:
+        remaining = db.query(Usage.id).filter(Usage.request_headers.isnot(None)).all()
+        assert [r.id for r in remaining] == [recent]
+
+
+@pytest.mark.asyncio
+async def test_expired_fields_cleanup_nulls_columns_per_row_cutoff(session_factory):
+    from src.utils.compression import compress_json
+
+    now = datetime.now(timezone.utc)
+    with session_factory() as db:
+        # 同时超过两个保留期：压缩字段、未压缩的原始 body 与 header 均置空
+        very_old = _add_usage(
+            db,
+            now - timedelta(days=100),
+            request_body={"raw": True},
+            response_body_compressed=compress_json({"old": True}),
+            request_headers={"h": 1},
+        )
+        # 仅超过 header 保留期：header 置空，压缩字段保留
+        header_only = _add_usage(
+            db,
+            now - timedelta(days=40),
+            response_body_compressed=compress_json({"keep": True}),
+            response_headers={"h": 2},
+        )
+        db.commit()
+
+        cleaned = await MaintenanceScheduler()._cleanup_expired_fields(
+            db, now - timedelta(days=90), now - timedelta(days=30), batch_size=10
+        )
+
+    assert cleaned == 2
+    with session_factory() as db:
+        row = db.get(Usage, very_old)
+        assert row.request_body is None
+        assert row.response_body_compressed is None
+        assert row.request_headers is None
+        row = db.get(Usage, header_only)
+        assert row.response_body_compressed is not None
+        assert row.response_headers is None
+
+
+@pytest.mark.asyncio
+async def test_body_cleanup_clears_already_compressed_rows_in_bulk(monkeypatch, session_factory):
+    from src.utils.compression import compress_json, decompress_json
+
+    compress_calls: list[object] = []
+
+    def tracking_compress(value):
+        compress_calls.append(value)
+        return compress_json(value)
+
+    monkeypatch.setattr(
+        "src.services.system.maintenance_scheduler.compress_json", tracking_compress
+    )
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    with session_factory() as db:
+        stale = _add_usage(
+            db,
+            old,
+            request_body={"stale": True},
+            request_body_compressed=compress_json({"kept": True}),
+        )
+        fresh = _add_usage(db, old, response_body={"answer": 42})
+        db.commit()
+
+    with session_factory() as db:
+        processed = await MaintenanceScheduler()._cleanup_body_fields(
+            db, datetime.now(timezone.utc) - timedelta(days=7), batch_size=10
+        )
+
+    assert processed == 2
+    assert compress_calls == [{"answer": 42}]
+    with session_factory() as db:
+        stale_row = db.get(Usage, stale)
+        fresh_row = db.get(Usage, fresh)
+        assert stale_row.request_body is None
+        assert decompress_json(stale_row.request_body_compressed) == {"kept": True}
+        assert fresh_row.response_body is None
+        assert decompress_json(fresh_row.response_body_compressed) == {"answer": 42}
+
+
+@pytest.mark.asyncio
+async def test_field_cleanups_skip_when_nothing_pending(monkeypatch, session_factory):
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    with session_factory() as db:
+        _add_usage(db, old)
+        db.commit()
+
+    opened: list[object] = []
+
+    def tracking_factory():
+        opened.append(object())
+        return session_factory()
+
+    monkeypatch.setattr(
+        "src.services.system.maintenance_scheduler.create_session", tracking_factory
+    )
+    scheduler = MaintenanceScheduler()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+    with session_factory() as db:
+        assert await scheduler._cleanup_body_fields(db, cutoff, batch_size=10) == 0
+        assert await scheduler._cleanup_expired_fields(db, cutoff, cutoff, batch_size=10) == 0
+
+    assert opened == []
+
+
+@pytest.mark.asyncio
+async def test_perform_cleanup_runs_key_cleanup_alongside_usage(monkeypatch, session_factory):
+    import threading
+
+    _patch_config(monkeypatch, {"log_retention_days": 30, "auto_delete_expired_keys": True})
+    key_calls: list[tuple[bool, bool]] = []
+
+    def fake_cleanup_expired_keys(db, auto_delete=False):
+        key_calls.append((auto_delete, threading.current_thread() is threading.main_thread()))
+        return 2
+
+    monkeypatch.setattr(
+        "src.services.system.maintenance_scheduler.ApiKeyService.cleanup_expired_keys",
+        fake_cleanup_expired_keys,
+    )
+    now = datetime.now(timezone.utc)
+    with session_factory() as db:
+        _add_usage(db, now - timedelta(days=60))
+        kept = _add_usage(db, now)
+        db.commit()
+
+    await MaintenanceScheduler()._perform_cleanup()
+
+    assert key_calls == [(True, False)]
+    with session_factory() as db:
+        assert [u.id for u in db.query(Usage).all()] == [kept]
+
+
+@pytest.mark.asyncio
+async def test_body_cleanup_row_fallback_isolates_failing_row(session_factory):
+    from sqlalchemy import text
+
+    old = datetime.now(timezone.utc) - timedelta(days=30)
+    with session_factory() as db:
+        good = [_add_usage(db, old, request_body={"n": i}) for i in range(3)]
+        bad = _add_usage(db, old, request_body={"bad": True})
+        db.commit()
+        # 让坏行的更新失败：批量 executemany 整体失败后回退逐条更新
+        db.execute(
+            text(
+                "CREATE TRIGGER fail_bad BEFORE UPDATE ON usage "
+                f"WHEN old.id = '{bad}' BEGIN SELECT RAISE(ABORT, 'boom'); END"
+            )
+        )
+        db.commit()
+
+        await MaintenanceScheduler()._cleanup_body_fields(
+            db, datetime.now(timezone.utc) - timedelta(days=7), batch_size=10
+        )
+
+    with session_factory() as db:
+        assert all(db.get(Usage, usage_id).request_body is None for usage_id in good)
+        assert db.get(Usage, bad).request_body == {"bad": True}
+
+
+@pytest.mark.asyncio
+async def test_compress_body_rows_preserves_order_across_workers(monkeypatch):
+    from types import SimpleNamespace
+
+    from src.services.system import maintenance_scheduler
+    from src.utils.compression import decompress_json
+
+    monkeypatch.setattr(maintenance_scheduler, "_COMPRESS_WORKERS", 3)
+    records = [
+        SimpleNamespace(
+            id=f"u{i}",
+            request_body={"i": i},
+            response_body=None,
+            provider_request_body=None,
+            client_response_body=None,
+        )
+        for i in range(7)
+    ]
+
+    rows = await maintenance_scheduler._compress_body_rows(records)
+
+    assert [row["pk"] for row in rows] == [f"u{i}" for i in range(7)]
+    assert decompress_json(rows[4]["p_request_body_compressed"]) == {"i": 4}
+    # 空 body 传 None，由 UPDATE 中的 COALESCE 保留已有压缩字段
+    assert rows[0]["p_response_body_compressed"] is None
+
+
+@pytest.mark.asyncio
+async def test_stats_aggregation_skips_when_already_running(monkeypatch):
+    scheduler = MaintenanceScheduler()
+    sessions: list[object] = []
+    monkeypatch.setattr(
+        "src.services.system.maintenance_scheduler.create_session",
+        lambda: sessions.append(object()),
+    )
+
+    async with scheduler._stats_aggregation_lock:
+        await scheduler._perform_stats_aggregation()
+
+    # 正在运行时直接跳过，不排队、不创建会话
+    assert sessions == []
+    assert not scheduler._stats_aggregation_lock.locked()
+
+
+def test_get_existing_stats_dates_uses_single_union_query():
+    from datetime import date
+
+    from src.models.database import StatsDaily, StatsDailyModel, StatsDailyProvider
+
+    engine = create_engine("sqlite://")
+    for model in (StatsDaily, StatsDailyModel, StatsDailyProvider):
+        model.__table__.create(engine)
+    day1 = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    day2 = datetime(2024, 5, 2, tzinfo=timezone.utc)
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(
+            [
+                StatsDaily(id="d1", date=day1),
+                StatsDailyModel(id="m1", date=day1, model="a"),
+                StatsDailyModel(id="m2", date=day1, model="b"),
+                StatsDailyModel(id="m3", date=day2, model="a"),
+                StatsDailyProvider(id="p1", date=day2, provider_name="x"),
+            ]
+        )
+        db.commit()
+        statements.clear()
+
+        existing = MaintenanceScheduler._get_existing_stats_dates(db, day1)
+
+    assert len(statements) == 1
+    assert existing == {
+        "daily": {date(2024, 5, 1)},
+        "model": {date(2024, 5, 1), date(2024, 5, 2)},
+        "provider": {date(2024, 5, 2)},
+    }
+    engine.dispose()
+
+
+def test_cleanup_backoff_scales_with_batch_latency():
+    assert _cleanup_backoff(0.004, 0.05) == 0.002
+    assert _cleanup_backoff(2.0, 0.05) == 0.05
@@ -725,3 +725,28 @@ class TestAccessRestrictionsIsModelAllowed:
         restrictions = AccessRestrictions(allowed_models=[])
 
         assert restrictions.is_model_allowed("claude-3-opus", "provider-a") is False
+
+
+class TestModelInfoCacheSerialization:
+    """模型列表缓存序列化"""
+
+    def test_model_info_to_dict_matches_asdict_and_round_trips(self) -> None:
+        from dataclasses import asdict
+
+        from src.api.base.models_service import ModelInfo, _model_info_to_dict
+
+        info = ModelInfo(
+            id="claude-3-opus",
+            display_name="Claude 3 Opus",
+            description=None,
+            created_at="2024-01-01T00:00:00",
+            created_timestamp=1704067200,
+            provider_name="anthropic",
+            vision=True,
+            input_modalities=["text", "image"],
+        )
+
+        data = _model_info_to_dict(info)
+
+        assert data == asdict(info)
+        assert ModelInfo(**data) == info
@@ -0,0 +1,31 @@
+from src.core.exceptions import ConcurrencyLimitError
+from src.services.request.executor import ExecutionContext, ExecutionError
+
+
+def _context() -> ExecutionContext:
+    return ExecutionContext(
+        candidate_id="c1",
+        candidate_index=0,
+        provider_id="p1",
+        endpoint_id="e1",
+        key_id="k1",
+        user_id=None,
+        api_key_id=None,
+        is_cached_user=False,
+    )
+
+
+def test_execution_error_message_comes_from_cause() -> None:
+    cause = ValueError("upstream exploded")
+    err = ExecutionError(cause, _context())
+
+    assert str(err) == "upstream exploded"
+    assert err.cause is cause
+    assert err.context.candidate_id == "c1"
+
+
+def test_execution_error_repr_does_not_format_cause() -> None:
+    cause = ConcurrencyLimitError("too many")
+    err = ExecutionError(cause, _context())
+
+    assert repr(err) == "ExecutionError(ConcurrencyLimitError)"
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.models.database import StatsUserDaily, Usage
+from src.services.system.stats_aggregator import StatsAggregatorService
+
+
+@pytest.fixture
+def db() -> Session:
+    engine = create_engine("sqlite://")
+    Usage.__table__.create(engine)
+    StatsUserDaily.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _add_usage(db: Session, user_id: str, created_at: datetime, **fields) -> None:
+    db.add(
+        Usage(
+            id=str(uuid.uuid4()),
+            request_id=str(uuid.uuid4()),
+            user_id=user_id,
+            provider_name="p",
+            model="m",
+            created_at=created_at,
+            **fields,
+        )
+    )
+
+
+def test_aggregate_users_daily_stats_groups_by_user(db: Session) -> None:
+    day = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    _add_usage(db, "u1", day + timedelta(hours=1), input_tokens=10, total_cost_usd=1.0)
+    _add_usage(db, "u1", day + timedelta(hours=2), input_tokens=5, status_code=500)
+    _add_usage(db, "u2", day + timedelta(hours=3), input_tokens=7)
+    _add_usage(db, "u1", day + timedelta(days=1), input_tokens=100)
+    # 已有记录应被更新而不是重复插入
+    db.add(StatsUserDaily(id="existing", user_id="u2", date=day, total_requests=99))
+    db.commit()
+
+    StatsAggregatorService.aggregate_users_daily_stats(db, ["u1", "u2", "u3"], day)
+
+    rows = {r.user_id: r for r in db.query(StatsUserDaily).all()}
+    assert set(rows) == {"u1", "u2", "u3"}
+    assert (rows["u1"].total_requests, rows["u1"].error_requests) == (2, 1)
+    assert rows["u1"].input_tokens == 15
+    assert rows["u1"].total_cost == pytest.approx(1.0)
+    assert rows["u2"].id == "existing"
+    assert rows["u2"].total_requests == 1
+    assert rows["u3"].total_requests == 0
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.models.database import SystemConfig
+from src.services.system import config as config_module
+from src.services.system.config import RequestRecordLevel, SystemConfigService
+
+
+@pytest.fixture
+def db(monkeypatch) -> Session:
+    monkeypatch.setattr(config_module, "_config_cache", {})
+    monkeypatch.setattr(config_module, "_last_prefetch_at", float("-inf"))
+    engine = create_engine("sqlite://")
+    SystemConfig.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _count_selects(db: Session) -> list[str]:
+    statements: list[str] = []
+
+    def before_execute(_conn, _cursor, statement, *_args) -> None:
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", before_execute)
+    return statements
+
+
+def test_get_configs_reads_misses_in_one_query_and_caches(db: Session) -> None:
+    db.add(SystemConfig(key="log_retention_days", value=30))
+    db.commit()
+    selects = _count_selects(db)
+
+    keys = ["log_retention_days", "cleanup_batch_size", "unknown_key"]
+    first = SystemConfigService.get_configs(db, keys)
+    second = SystemConfigService.get_configs(db, keys[:2])
+
+    assert first == {"log_retention_days": 30, "cleanup_batch_size": 1000, "unknown_key": None}
+    assert second == {"log_retention_days": 30, "cleanup_batch_size": 1000}
+    assert len(selects) == 1
+    # 与 get_config 共享进程内缓存
+    assert SystemConfigService.get_config(db, "log_retention_days") == 30
+    assert len(selects) == 1
+
+
+def test_mask_sensitive_headers_caches_lowercase_set_until_invalidated(db: Session) -> None:
+    SystemConfigService.set_config(db, "sensitive_headers", ["Authorization"])
+    assert SystemConfigService.mask_sensitive_headers(
+        db, {"authorization": "Bearer sk-123456"}
+    ) == {"authorization": "Bear****3456"}
+    selects = _count_selects(db)
+    SystemConfigService.mask_sensitive_headers(db, {"X-Api-Key": "k"})
+    assert selects == []
+
+    SystemConfigService.set_config(db, "sensitive_headers", ["X-Api-Key"])
+    assert SystemConfigService.mask_sensitive_headers(
+        db, {"x-api-key": "k", "Authorization": "a"}
+    ) == {"x-api-key": "****", "Authorization": "a"}
+
+
+def test_config_cache_is_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(config_module, "_config_cache", {})
+    monkeypatch.setattr(config_module, "_CONFIG_CACHE_MAX_SIZE", 3)
+    config_module._config_cache["expired"] = ("v", 0.0)
+
+    for i in range(4):
+        config_module._set_cached_config(f"k{i}", i)
+
+    assert list(config_module._config_cache) == ["k1", "k2", "k3"]
+    assert config_module._get_cached_config("k3") == (True, 3)
+
+
+def test_get_config_miss_prefetches_whole_table_once(db: Session) -> None:
+    db.add(SystemConfig(key="log_retention_days", value=30))
+    db.add(SystemConfig(key="custom_key", value="x"))
+    db.commit()
+    selects = _count_selects(db)
+
+    assert SystemConfigService.get_config(db, "log_retention_days") == 30
+    assert SystemConfigService.get_config(db, "custom_key") == "x"
+    assert SystemConfigService.get_config(db, "cleanup_batch_size") == 1000
+    assert len(selects) == 1
+
+    # 预取周期内仍未命中的键回退为单键查询
+    assert SystemConfigService.get_config(db, "absent_key", "fallback") == "fallback"
+    assert len(selects) == 2
+
+
+def test_get_log_flags_reads_level_once(db: Session) -> None:
+    db.add(SystemConfig(key="request_record_level", value="headers"))
+    db.commit()
+    selects = _count_selects(db)
+
+    level, log_headers, log_body = SystemConfigService.get_log_flags(db)
+
+    assert level is RequestRecordLevel.HEADERS
+    assert (log_headers, log_body) == (True, False)
+    assert len(selects) == 1
@@ -58,6 +58,26 @@ async def test_usage_event_roundtrip() -> None:
     assert restored.data["foo"] == "bar"
 
 
+def test_usage_event_large_payload_is_compressed() -> None:
+    body = {"messages": [{"role": "user", "content": "hello " * 500}]}
+    event = build_usage_event(
+        event_type=UsageEventType.COMPLETED,
+        request_id="req-big",
+        data={"request_body": body},
+    )
+
+    # 默认不压缩，保持旧消费者可解析的纯 JSON payload
+    plain = event.to_stream_fields()
+    assert "enc" not in plain
+    assert json.loads(plain["payload"])["data"]["request_body"] == body
+
+    fields = event.to_stream_fields(compress=True)
+
+    assert fields["enc"] == "gzip+b64"
+    assert len(fields["payload"]) < len(json.dumps(body))
+    assert UsageEvent.from_stream_fields(fields).data["request_body"] == body
+
+
 @pytest.mark.asyncio
 async def test_queue_writer_publishes_event(monkeypatch: Any) -> None:
     dummy = DummyRedis()
@@ -94,6 +114,7 @@ async def test_queue_writer_publishes_event(monkeypatch: Any) -> None:
     assert dummy.calls
     key, fields, _, _ = dummy.calls[0]
     assert key == "usage:events:test"
+    assert "enc" not in fields
     event = UsageEvent.from_stream_fields(fields)
     assert event.data["user_id"] == "user-1"
     assert event.data["api_key_id"] == "key-1"
@@ -139,6 +160,21 @@ async def test_usage_event_missing_payload() -> None:
         UsageEvent.from_stream_fields({})
 
 
+def test_usage_event_falls_back_to_sanitize_for_unserializable_data() -> None:
+    """测试 data 含不可 JSON 序列化的值时回退到 sanitize_payload"""
+    from decimal import Decimal
+
+    event = build_usage_event(
+        event_type=UsageEventType.COMPLETED,
+        request_id="req-decimal",
+        data={"cost": Decimal("1.5"), "nested": {"ok": [1, 2]}},
+    )
+    restored = UsageEvent.from_stream_fields(event.to_stream_fields())
+    assert restored.data == {"cost": "1.5", "nested": {"ok": [1, 2]}}
+    # 原始 data 不被修改
+    assert event.data["cost"] == Decimal("1.5")
+
+
 def test_sanitize_payload_nested() -> None:
     """测试 sanitize_payload 处理嵌套结构"""
     data = {
@@ -198,6 +234,31 @@ def test_parse_body_truncated_string() -> None:
 # ============ telemetry_writer.py 测试 ============
 
 
+def test_queue_writer_build_event_data_skips_defaults_and_maps_fields() -> None:
+    """测试事件字段只写入非默认值，并完成字段名映射"""
+    writer = QueueTelemetryWriter(request_id="r1", user_id="u1", api_key_id="k1")
+
+    assert writer._build_event_data(
+        provider="p", input_tokens=0, status_code=200, request_type="chat", is_stream=True
+    ) == {"request_id": "r1", "user_id": "u1", "api_key_id": "k1", "provider": "p"}
+
+    data = writer._build_event_data(
+        cache_creation_tokens=3,
+        cache_read_tokens_missing=1,
+        response_time_ms=0,
+        status_code=500,
+        request_type="video",
+        has_format_conversion="yes",
+        is_stream=False,
+    )
+    assert data["cache_creation_input_tokens"] == 3
+    assert data["response_time_ms"] == 0
+    assert (data["status_code"], data["request_type"]) == (500, "video")
+    assert data["has_format_conversion"] is True
+    assert data["is_stream"] is False
+    assert "cache_read_input_tokens" not in data
+
+
 @pytest.mark.asyncio
 async def test_db_telemetry_writer_filters_kwargs() -> None:
     """测试 DbTelemetryWriter 过滤不支持的参数"""
@@ -221,6 +282,7 @@ async def test_db_telemetry_writer_filters_kwargs() -> None:
     call_kwargs = mock_telemetry.record_success.call_args.kwargs
     assert "request_type" not in call_kwargs
     assert "metadata" not in call_kwargs
+    assert call_kwargs["request_metadata"] == {"foo": "bar"}
     assert call_kwargs["provider"] == "test"
     assert call_kwargs["input_tokens"] == 100
 
@@ -281,6 +343,26 @@ async def test_queue_writer_record_failure(monkeypatch: Any) -> None:
     assert event.data["error_message"] == "something went wrong"
 
 
+@pytest.mark.asyncio
+async def test_queue_writer_binds_stream_config_at_construction(monkeypatch: Any) -> None:
+    dummy = DummyRedis()
+
+    async def _get_redis_client(require_redis: bool = False) -> Any:
+        return dummy
+
+    monkeypatch.setattr("src.services.usage.telemetry_writer.get_redis_client", _get_redis_client)
+    monkeypatch.setattr(config, "usage_queue_stream_key", "usage:events:bound")
+    monkeypatch.setattr(config, "usage_queue_stream_maxlen", 0)
+    writer = QueueTelemetryWriter(request_id="req-bound", user_id="user-1", api_key_id="key-1")
+
+    monkeypatch.setattr(config, "usage_queue_stream_key", "usage:events:other")
+    monkeypatch.setattr(config, "usage_queue_stream_maxlen", 100)
+    await writer.record_success(provider="test")
+
+    assert dummy.calls[0][0] == "usage:events:bound"
+    assert dummy.calls[0][2:] == (None, None)
+
+
 @pytest.mark.asyncio
 async def test_queue_writer_record_cancelled(monkeypatch: Any) -> None:
     """测试 QueueTelemetryWriter.record_cancelled"""
@@ -468,6 +550,64 @@ async def test_queue_writer_xadd_error(monkeypatch: Any) -> None:
         await writer.record_success(provider="test", model="model")
 
 
+class PipelineRedis(DummyRedis):
+    """支持 pipeline 的 DummyRedis，记录每次 pipeline 执行的命令数"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.pipeline_sizes: list[int] = []
+
+    def pipeline(self, transaction: bool = True) -> Any:
+        parent = self
+        commands: list[tuple[str, dict[str, str], dict[str, Any]]] = []
+
+        class _Pipe:
+            def xadd(self, key: str, fields: dict[str, str], **kwargs: Any) -> Any:
+                commands.append((key, fields, kwargs))
+                return self
+
+            async def execute(self, raise_on_error: bool = True) -> list[Any]:
+                parent.pipeline_sizes.append(len(commands))
+                results: list[Any] = []
+                for key, fields, kwargs in commands:
+                    if "bad" in fields["payload"]:
+                        results.append(ResponseError("rejected"))
+                        continue
+                    parent.calls.append(
+                        (key, fields, kwargs.get("maxlen"), kwargs.get("approximate"))
+                    )
+                    results.append("1-0")
+                return results
+
+        return _Pipe()
+
+
+@pytest.mark.asyncio
+async def test_queue_writer_pipelines_concurrent_xadds(monkeypatch: Any) -> None:
+    """测试并发发布的事件合并为 pipeline，且单条失败只影响对应调用方"""
+    dummy = PipelineRedis()
+
+    async def _get_redis_client(require_redis: bool = False) -> Any:
+        return dummy
+
+    monkeypatch.setattr("src.services.usage.telemetry_writer.get_redis_client", _get_redis_client)
+
+    writers = [
+        QueueTelemetryWriter(request_id=f"req-{i}", user_id="u", api_key_id="k") for i in range(4)
+    ]
+    results = await asyncio.gather(
+        writers[0].record_success(provider="p"),
+        writers[1].record_success(provider="p"),
+        writers[2].record_success(provider="bad"),
+        writers[3].record_success(provider="p"),
+        return_exceptions=True,
+    )
+
+    assert dummy.pipeline_sizes == [4]
+    assert len(dummy.calls) == 3
+    assert [isinstance(r, ResponseError) for r in results] == [False, False, True, False]
+
+
 # ============ consumer_streams.py 测试 ============
 
 
@@ -1441,3 +1581,16 @@ async def test_record_usage_batch_uses_bulk_insert_mappings_for_new_records(
     assert mappings[0].get("finalized_at") is not None
 
     assert result and result[0] is inserted
+
+
+def test_queue_writer_masks_headers_case_insensitively() -> None:
+    writer = QueueTelemetryWriter(
+        request_id="req-mask",
+        user_id="user-1",
+        api_key_id="key-1",
+        sensitive_headers=["Authorization"],
+    )
+
+    masked = writer._mask_headers({"AUTHORIZATION": "Bearer secret-token", "x-trace": "t"})
+
+    assert masked == {"AUTHORIZATION": "Bear****oken", "x-trace": "t"}
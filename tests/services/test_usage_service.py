@@ -11,6 +11,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from src.services.system.config import LogFlags, RequestRecordLevel
 from src.services.usage.service import UsageService
 
 
@@ -328,12 +329,8 @@ class TestUsageStatusUpdate:
 
         with (
             patch(
-                "src.services.system.config.SystemConfigService.should_log_headers",
-                return_value=True,
-            ),
-            patch(
-                "src.services.system.config.SystemConfigService.should_log_body",
-                return_value=True,
+                "src.services.system.config.SystemConfigService.get_log_flags",
+                return_value=LogFlags(RequestRecordLevel.FULL, True, True),
             ),
             patch(
                 "src.services.system.config.SystemConfigService.mask_sensitive_headers",
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from src.utils.async_utils import async_wrap_sync, run_in_executor
+
+
+@pytest.mark.asyncio
+async def test_run_in_executor_uses_dedicated_io_pool() -> None:
+    def current_thread_name(prefix: str, *, suffix: str = "") -> str:
+        return prefix + threading.current_thread().name + suffix
+
+    name = await run_in_executor(current_thread_name, ">", suffix="<")
+
+    assert name.startswith(">aether-io")
+    assert name.endswith("<")
+
+
+@pytest.mark.asyncio
+async def test_run_in_executor_passes_positional_args_without_kwargs() -> None:
+    assert await run_in_executor(divmod, 7, 3) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_async_wrap_sync_runs_off_event_loop_thread() -> None:
+    @async_wrap_sync
+    def is_main_thread() -> bool:
+        return threading.current_thread() is threading.main_thread()
+
+    assert await is_main_thread() is False
+
+
+@pytest.mark.asyncio
+async def test_async_wrap_sync_forwards_args_and_kwargs() -> None:
+    @async_wrap_sync
+    def join(a: str, b: str, *, sep: str = "") -> str:
+        return a + sep + b
+
+    assert join.__name__ == "join"
+    assert await join("x", "y", sep="-") == "x-y"
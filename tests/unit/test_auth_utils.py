@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import hashlib
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.exceptions import ForbiddenException
+from src.database import get_db
+from src.models.database import User, UserRole
+from src.services.auth.service import AuthService
+from src.services.user.service import UserService
+from src.utils import auth_utils
+from src.utils.auth_utils import get_current_user, get_current_user_from_header, require_role
+
+
+def _credentials(token: str = "tok") -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.fixture
+def active_user(monkeypatch) -> SimpleNamespace:
+    user = SimpleNamespace(id="u1", is_active=True, is_deleted=False, role=UserRole.USER)
+    monkeypatch.setattr(
+        AuthService, "verify_token", AsyncMock(return_value={"user_id": "u1", "type": "access"})
+    )
+    monkeypatch.setattr(AuthService, "token_identity_matches_user", lambda _payload, _user: True)
+    monkeypatch.setattr(UserService, "get_user", lambda _db, _user_id: user)
+    return user
+
+
+def test_require_role_returns_same_dependency_per_role() -> None:
+    assert require_role(UserRole.ADMIN) is require_role(UserRole.ADMIN)
+    assert require_role(UserRole.ADMIN) is not require_role(UserRole.USER)
+
+
+def test_require_role_rejects_other_roles() -> None:
+    check_admin = require_role(UserRole.ADMIN)
+    admin = SimpleNamespace(role=UserRole.ADMIN)
+
+    assert check_admin(admin) is admin
+    with pytest.raises(ForbiddenException):
+        check_admin(SimpleNamespace(role=UserRole.USER))
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_skips_fingerprint_on_success(monkeypatch, active_user) -> None:
+    fingerprint = MagicMock(return_value="fp")
+    monkeypatch.setattr(auth_utils, "_token_fingerprint", fingerprint)
+
+    assert await get_current_user(_credentials(), MagicMock()) is active_user
+    fingerprint.assert_not_called()
+
+    monkeypatch.setattr(AuthService, "token_identity_matches_user", lambda _payload, _user: False)
+    with pytest.raises(ForbiddenException):
+        await get_current_user(_credentials(), MagicMock())
+    fingerprint.assert_called_once_with("tok")
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_from_header_loads_user_by_primary_key(active_user) -> None:
+    db = MagicMock()
+    db.get.return_value = active_user
+
+    assert await get_current_user_from_header("Bearer tok", db) is active_user
+    db.get.assert_called_once_with(User, "u1")
+    db.query.assert_not_called()
+
+
+def test_get_current_user_resolved_once_per_request_across_dependencies(active_user) -> None:
+    """require_role 与路由同时依赖 get_current_user 时，由 FastAPI 依赖缓存只解析一次"""
+    app = FastAPI()
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    @app.get("/me")
+    def me(
+        user: Any = Depends(get_current_user),
+        _checked: Any = Depends(require_role(UserRole.USER)),
+    ) -> dict[str, str]:
+        return {"id": user.id}
+
+    response = TestClient(app).get("/me", headers={"Authorization": "Bearer tok"})
+
+    assert response.json() == {"id": "u1"}
+    AuthService.verify_token.assert_awaited_once()
+
+
+def test_token_fingerprint_keeps_twelve_hex_prefix() -> None:
+    token = "header.payload.signature"
+
+    assert auth_utils._token_fingerprint(token) == hashlib.sha256(token.encode()).hexdigest()[:12]
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_from_header_strips_only_the_prefix(active_user) -> None:
+    db = MagicMock()
+    db.get.return_value = active_user
+
+    await get_current_user_from_header("Bearer abcBearer xyz", db)
+
+    AuthService.verify_token.assert_awaited_once_with("abcBearer xyz", token_type="access")
+
+    with pytest.raises(ForbiddenException):
+        await get_current_user_from_header("Basic abc", db)
+
+
+def test_user_service_get_user_uses_prebuilt_statement() -> None:
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        db.add(User(id="u1", username="alice", password_hash="x", email_verified=False))
+        db.commit()
+
+        assert UserService.get_user(db, "u1").username == "alice"
+        assert UserService.get_user(db, "missing") is None
+    finally:
+        db.close()
+        engine.dispose()
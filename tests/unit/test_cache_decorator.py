@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any
+from uuid import UUID
+
+import pytest
+from fastapi import Response
+
+from src.api.base.adapter import ApiAdapter
+from src.utils import cache_decorator
+from src.utils.cache_decorator import cache_result
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, Any] = {}
+
+    async def get(self, key: str) -> Any:
+        return self.store.get(key)
+
+    async def setex(self, key: str, ttl: int, value: Any) -> None:
+        self.store[key] = value
+
+    async def delete(self, key: str) -> None:
+        self.store.pop(key, None)
+
+
+class StatsAdapter(ApiAdapter):
+    def __init__(self, days: int) -> None:
+        self.days = days
+        self.calls = 0
+
+    @cache_result("stats", ttl=60)
+    async def handle(self, context: Any) -> dict[str, Any]:
+        self.calls += 1
+        return {"days": self.days}
+
+
+@pytest.fixture
+def redis(monkeypatch) -> FakeRedis:
+    client = FakeRedis()
+    monkeypatch.setattr(cache_decorator, "get_redis_client_sync", lambda: client)
+    return client
+
+
+class FakeContext(SimpleNamespace):
+    __api_context__ = True
+
+
+def _context(user_id: str = "u1") -> FakeContext:
+    return FakeContext(user=SimpleNamespace(id=user_id), db=None)
+
+
+@pytest.mark.asyncio
+async def test_adapter_method_result_is_cached_per_user_and_days(redis) -> None:
+    adapter = StatsAdapter(days=7)
+
+    assert await adapter.handle(_context()) == {"days": 7}
+    assert await adapter.handle(_context()) == {"days": 7}
+
+    assert adapter.calls == 1
+    assert list(redis.store) == ["stats:user:u1:days:7"]
+
+
+class ProviderStatusAdapter(ApiAdapter):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @cache_result("status", ttl=60, user_specific=False, raw_json=True)
+    async def handle(self, context: Any) -> dict[str, Any]:
+        self.calls += 1
+        return {"providers": ["中文"]}
+
+
+@pytest.mark.asyncio
+async def test_raw_json_returns_cached_text_as_response(redis) -> None:
+    adapter = ProviderStatusAdapter()
+
+    first = await adapter.handle(_context())
+    second = await adapter.handle(_context())
+
+    assert adapter.calls == 1
+    assert first.body == second.body == '{"providers": ["中文"]}'.encode()
+    assert second.media_type == "application/json"
+
+
+@pytest.mark.asyncio
+async def test_raw_json_returns_response_when_redis_unavailable(monkeypatch) -> None:
+    monkeypatch.setattr(cache_decorator, "get_redis_client_sync", lambda: None)
+    adapter = ProviderStatusAdapter()
+
+    response = await adapter.handle(_context())
+    bypassed = await adapter.handle(_context(), _bypass_cache=True)
+
+    assert adapter.calls == 2
+    for result in (response, bypassed):
+        assert isinstance(result, Response)
+        assert result.media_type == "application/json"
+        assert result.body == '{"providers": ["中文"]}'.encode()
+
+
+def test_adapter_key_suffix_probes_each_type_once(monkeypatch) -> None:
+    monkeypatch.setattr(cache_decorator, "_suffix_attrs_by_type", {})
+
+    assert cache_decorator._adapter_key_suffix(StatsAdapter(days=7)) == ":days:7"
+    assert cache_decorator._adapter_key_suffix(StatsAdapter(days=30)) == ":days:30"
+    assert cache_decorator._suffix_attrs_by_type == {StatsAdapter: ("days",)}
+
+
+@pytest.mark.asyncio
+async def test_corrupt_cache_entry_is_overwritten_without_delete(redis, monkeypatch) -> None:
+    adapter = StatsAdapter(days=1)
+    redis.store["stats:user:u1:days:1"] = "{not json"
+
+    async def fail_delete(key: str) -> None:
+        raise AssertionError("unexpected DELETE")
+
+    monkeypatch.setattr(redis, "delete", fail_delete)
+
+    assert await adapter.handle(_context()) == {"days": 1}
+    assert redis.store["stats:user:u1:days:1"] == '{"days": 1}'
+
+
+def test_json_default_matches_api_encoding() -> None:
+    value = {
+        "at": datetime(2024, 1, 2, 3, 4, tzinfo=timezone.utc),
+        "id": UUID(int=1),
+        "cost": Decimal("1.50"),
+    }
+
+    assert json.loads(json.dumps(value, default=cache_decorator._json_default)) == {
+        "at": "2024-01-02T03:04:00+00:00",
+        "id": "00000000-0000-0000-0000-000000000001",
+        "cost": 1.5,
+    }
+
+
+def test_is_api_context_requires_marker() -> None:
+    assert cache_decorator._is_api_context(_context())
+    assert not cache_decorator._is_api_context(SimpleNamespace(user=None, db=None))
+
+
+@pytest.mark.asyncio
+async def test_non_positive_ttl_and_bypass_skip_cache(redis) -> None:
+    async def compute(context: Any) -> int:
+        return 1
+
+    assert cache_result("noop", ttl=0)(compute) is compute
+
+    adapter = StatsAdapter(days=3)
+    assert await adapter.handle(_context(), _bypass_cache=True) == {"days": 3}
+    assert redis.store == {}
+
+
+def test_sync_function_is_returned_unwrapped() -> None:
+    def compute() -> int:
+        return 1
+
+    assert cache_result("sync", ttl=60)(compute) is compute
+
+
+@pytest.mark.asyncio
+async def test_function_error_is_not_retried_and_redis_errors_fall_through(
+    redis, monkeypatch
+) -> None:
+    calls = 0
+
+    @cache_result("boom", ttl=60, user_specific=False)
+    async def boom(context: Any) -> None:
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await boom(_context())
+    assert calls == 1
+
+    async def broken_get(key: str) -> Any:
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(redis, "get", broken_get)
+    adapter = StatsAdapter(days=2)
+    assert await adapter.handle(_context()) == {"days": 2}
+    assert redis.store["stats:user:u1:days:2"] == '{"days": 2}'
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.models.database import RequestCandidate
+from src.services.request.candidate import RequestCandidateService
+
+
+@pytest.fixture
+def db() -> Session:
+    engine = create_engine("sqlite://")
+    RequestCandidate.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _create(db: Session) -> str:
+    candidate = RequestCandidateService.create_candidate(
+        db=db, request_id="r1", candidate_index=0, extra_data={"needs_conversion": True}
+    )
+    db.commit()
+    return candidate.id
+
+
+def test_mark_started_streaming_success_flow(db: Session) -> None:
+    candidate_id = _create(db)
+
+    RequestCandidateService.mark_candidate_started(db, candidate_id)
+    row = db.get(RequestCandidate, candidate_id)
+    assert row.status == "pending"
+    assert row.started_at is not None
+
+    RequestCandidateService.mark_candidate_streaming(
+        db, candidate_id, status_code=200, concurrent_requests=3
+    )
+    row = db.get(RequestCandidate, candidate_id)
+    assert (row.status, row.status_code, row.concurrent_requests) == ("streaming", 200, 3)
+
+    RequestCandidateService.mark_candidate_success(
+        db,
+        candidate_id,
+        status_code=200,
+        latency_ms=42,
+        extra_data={"model_name": "m"},
+    )
+    row = db.get(RequestCandidate, candidate_id)
+    assert row.status == "success"
+    assert row.latency_ms == 42
+    assert row.finished_at is not None
+    assert row.extra_data == {"needs_conversion": True, "model_name": "m"}
+
+
+def test_mark_success_clears_previous_error(db: Session) -> None:
+    candidate_id = _create(db)
+    row = db.get(RequestCandidate, candidate_id)
+    row.error_type = "rectified"
+    row.error_message = "retry"
+    db.commit()
+
+    RequestCandidateService.mark_candidate_success(db, candidate_id, status_code=200, latency_ms=1)
+
+    row = db.get(RequestCandidate, candidate_id)
+    assert row.error_type is None
+    assert row.error_message is None
+
+
+def test_status_guard_skips_when_candidate_moved_on(db: Session) -> None:
+    candidate_id = _create(db)
+    RequestCandidateService.mark_candidate_started(db, candidate_id)
+    RequestCandidateService.mark_candidate_success(db, candidate_id, status_code=200, latency_ms=5)
+
+    RequestCandidateService.mark_candidate_streaming(
+        db, candidate_id, status_code=200, only_if_status={"pending"}
+    )
+
+    assert db.get(RequestCandidate, candidate_id).status == "success"
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import ssl
+
+from src.utils import ssl_utils
+
+
+def test_get_ssl_context_is_created_lazily_and_reused(monkeypatch) -> None:
+    created: list[ssl.SSLContext] = []
+
+    def create() -> ssl.SSLContext:
+        created.append(ssl.create_default_context())
+        return created[-1]
+
+    monkeypatch.setattr(ssl_utils, "_create_default_ssl_context", create)
+    ssl_utils.get_ssl_context.cache_clear()
+    try:
+        assert created == []
+        assert ssl_utils.get_ssl_context() is ssl_utils.get_ssl_context()
+        assert len(created) == 1
+    finally:
+        ssl_utils.get_ssl_context.cache_clear()